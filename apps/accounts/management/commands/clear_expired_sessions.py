@@ -0,0 +1,81 @@
+"""
+Delete expired sessions in small batches.
+
+Django's clearsessions removes every expired row in one DELETE, which
+holds SQLite's write lock for as long as it takes on a large table.
+This command deletes BATCH_SIZE rows per transaction (expire_date is
+indexed) and pauses between batches so requests can write in between.
+
+Run it as a scheduled task, e.g. daily:
+    python manage.py clear_expired_sessions
+
+Usage:
+    python manage.py clear_expired_sessions
+    python manage.py clear_expired_sessions --batch-size 500 --pause 0.2
+    python manage.py clear_expired_sessions --dry-run
+"""
+
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Sessions deleted per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.1,
+            help='Seconds to wait between batches (default: 0.1)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count expired sessions',
+        )
+
+    def handle(self, *args, **options):
+        engine = import_module(settings.SESSION_ENGINE)
+        if not issubclass(engine.SessionStore, DBStore):
+            # Signed cookies expire client-side; file sessions have their own cleanup
+            try:
+                engine.SessionStore.clear_expired()
+            except NotImplementedError:
+                self.stdout.write(f'{settings.SESSION_ENGINE} keeps no sessions to clean up')
+            return
+
+        sessions = engine.SessionStore.get_model_class().objects
+        started = time.monotonic()
+        if options['dry_run']:
+            count = sessions.filter(expire_date__lt=timezone.now()).count()
+            self.stdout.write(f'{count} expired sessions ({sessions.count()} total)')
+            return
+
+        deleted = 0
+        while True:
+            keys = list(
+                sessions.filter(expire_date__lt=timezone.now())
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not keys:
+                break
+            deleted += sessions.filter(pk__in=keys).delete()[0]
+            if len(keys) < options['batch_size']:
+                break
+            time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} expired sessions in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,42 @@
+"""
+Session middleware with throttled expiry refresh.
+
+Django's SESSION_SAVE_EVERY_REQUEST writes the session on every request
+to push its expiry forward - on SQLite that is a write transaction per
+page view and HTMX poll. ThrottledSessionMiddleware replaces it: the
+session is re-saved (new expiry, new cookie) only once
+SESSION_REFRESH_FRACTION of its lifetime has passed since the last
+save. With a 30-day SESSION_COOKIE_AGE and the default 0.1 that is at
+most one write every 3 days per session, and an active session still
+never has less than 27 days left.
+
+Sessions that were modified anyway are stamped on the same save.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+
+
+# Session key holding the time of the last save (epoch seconds)
+REFRESHED_AT_KEY = '_refreshed_at'
+
+
+class ThrottledSessionMiddleware(SessionMiddleware):
+    """SessionMiddleware extending the session expiry at most once per refresh interval."""
+
+    def process_response(self, request, response):
+        session = getattr(request, 'session', None)
+        if session is not None and (session.modified or settings.SESSION_COOKIE_NAME in request.COOKIES):
+            self._stamp_if_due(session)
+        return super().process_response(request, response)
+
+    def _stamp_if_due(self, session):
+        refreshed_at = session.get(REFRESHED_AT_KEY)
+        if session.is_empty():
+            return  # Flushed, or the cookie pointed at an expired session
+        now = int(time.time())
+        due = refreshed_at is None or now - refreshed_at >= session.get_expiry_age() * settings.SESSION_REFRESH_FRACTION
+        if due or session.modified:
+            session[REFRESHED_AT_KEY] = now
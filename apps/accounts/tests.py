@@ -1,3 +1,103 @@
-from django.test import TestCase
+import io
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .middleware import REFRESHED_AT_KEY
+from .models import User
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db', SESSION_REFRESH_FRACTION=0.1)
+class ThrottledSessionMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('planner', password='pw'))
+        self.get()  # The first response stamps the session
+
+    def get(self, at=None):
+        with mock.patch('apps.accounts.middleware.time.time', return_value=at or time.time()):
+            return self.client.get(reverse('planning:event_list'))  # Login required
+
+    def session_writes(self, at=None):
+        with CaptureQueriesContext(connection) as queries:
+            self.get(at)
+        return [
+            query['sql'] for query in queries
+            if 'django_session' in query['sql'] and query['sql'].startswith(('INSERT', 'UPDATE'))
+        ]
+
+    def session(self):
+        return Session.objects.get(session_key=self.client.cookies[settings.SESSION_COOKIE_NAME].value)
+
+    def test_no_write_within_refresh_window(self):
+        stamped = self.client.session[REFRESHED_AT_KEY]
+        expire_date = self.session().expire_date
+
+        writes = self.session_writes(at=stamped + settings.SESSION_COOKIE_AGE * 0.1 - 60)
+
+        self.assertEqual(writes, [])
+        self.assertEqual(self.session().expire_date, expire_date)
+
+    def test_write_once_refresh_fraction_passed(self):
+        stamped = self.client.session[REFRESHED_AT_KEY]
+        later = stamped + int(settings.SESSION_COOKIE_AGE * 0.1) + 1
+        expire_date = self.session().expire_date
+
+        self.assertEqual(len(self.session_writes(at=later)), 1)
+
+        self.assertEqual(self.client.session[REFRESHED_AT_KEY], later)
+        self.assertGreater(self.session().expire_date, expire_date)
+        self.assertEqual(self.session_writes(at=later + 60), [])
+
+    def test_flushed_session_not_recreated(self):
+        self.client.post(reverse('accounts:logout'))
+
+        self.assertFalse(Session.objects.exists())
+        self.get(at=time.time() + settings.SESSION_COOKIE_AGE)
+        self.assertFalse(Session.objects.exists())
+
+    def test_expired_session_not_recreated(self):
+        Session.objects.update(expire_date=timezone.now() - timedelta(days=1))
+
+        writes = self.session_writes(at=time.time() + settings.SESSION_COOKIE_AGE)
+
+        self.assertEqual(writes, [])  # Logged out: redirected to the login page
+        self.assertEqual(Session.objects.filter(expire_date__gt=timezone.now()).count(), 0)
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+class ClearExpiredSessionsTests(TestCase):
+
+    def setUp(self):
+        now = timezone.now()
+        for n in range(5):
+            Session.objects.create(session_key=f'expired{n}', session_data='', expire_date=now - timedelta(days=n + 1))
+        for n in range(2):
+            Session.objects.create(session_key=f'active{n}', session_data='', expire_date=now + timedelta(days=1))
+
+    def clear(self, **options):
+        out = io.StringIO()
+        call_command('clear_expired_sessions', pause=0, stdout=out, **options)
+        return out.getvalue()
+
+    def test_deletes_expired_in_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            output = self.clear(batch_size=2)
+
+        self.assertIn('Deleted 5 expired sessions', output)
+        self.assertEqual(set(Session.objects.values_list('session_key', flat=True)), {'active0', 'active1'})
+        deletes = [query for query in queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)  # 2 + 2 + 1
+
+    def test_dry_run_only_counts(self):
+        self.assertIn('5 expired sessions (7 total)', self.clear(dry_run=True))
+        self.assertEqual(Session.objects.count(), 7)
@@ -3,21 +3,42 @@ Admin configuration for assets app.
 """
 
 from django.contrib import admin
+from django.template.defaultfilters import filesizeformat
 from django.utils.html import format_html
 
-from .models import Asset
+from .models import Asset, StorageUsage
+
+
+class SpecCheckFilter(admin.SimpleListFilter):
+    """Filter assets by whether they match their deliverable template spec."""
+    
+    title = 'spec check'
+    parameter_name = 'spec'
+    
+    def lookups(self, request, model_admin):
+        return (('mismatch', 'Does not match spec'),)
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'mismatch':
+            return queryset.spec_mismatches()
+        return queryset
 
 
 @admin.register(Asset)
 class AssetAdmin(admin.ModelAdmin):
     """Admin interface for Asset with preview."""
     
-    list_display = ('thumbnail_preview', 'original_filename', 'file_type', 'deliverable_link', 'file_size_display', 'is_approved', 'created_at')
-    list_filter = ('file_type', 'is_approved', 'created_at')
+    list_display = ('thumbnail_preview', 'original_filename', 'version_display', 'file_type', 'deliverable_link', 'file_size_display', 'is_approved', 'created_at')
+    list_filter = ('file_type', 'is_approved', SpecCheckFilter, 'created_at')
     search_fields = ('original_filename', 'deliverable__event__name', 'deliverable__template__name')
     ordering = ('-created_at',)
     
-    readonly_fields = ('file_size', 'file_type', 'original_filename', 'created_at', 'updated_at', 'asset_preview')
+    readonly_fields = (
+        'file_size', 'file_type', 'original_filename', 'version',
+        'width', 'height', 'duration', 'codec', 'media_format', 'perceptual_hash',
+        'original_file', 'original_file_size', 'optimization_policy', 'savings_display',
+        'created_at', 'updated_at', 'asset_preview',
+    )
     
     fieldsets = (
         (None, {
@@ -29,8 +50,15 @@ class AssetAdmin(admin.ModelAdmin):
         ('Metadata', {
             'fields': ('notes', 'uploaded_by'),
         }),
+        ('Optimization', {
+            'fields': ('optimization_policy', 'original_file', 'original_file_size', 'savings_display'),
+            'classes': ('collapse',)
+        }),
         ('Auto-detected', {
-            'fields': ('original_filename', 'file_type', 'file_size'),
+            'fields': (
+                'original_filename', 'version', 'file_type', 'file_size',
+                'width', 'height', 'duration', 'codec', 'media_format', 'perceptual_hash',
+            ),
             'classes': ('collapse',)
         }),
     )
@@ -76,6 +104,14 @@ class AssetAdmin(admin.ModelAdmin):
         return format_html('<a href="{}" target="_blank">Download</a>', obj.file.url)
     asset_preview.short_description = 'Preview'
     
+    def savings_display(self, obj):
+        """Show bytes saved by ingest optimization."""
+        if not obj.bytes_saved:
+            return '-'
+        percent = round(obj.bytes_saved * 100 / obj.original_file_size)
+        return f"{filesizeformat(obj.bytes_saved)} ({percent}%)"
+    savings_display.short_description = 'Saved'
+    
     def deliverable_link(self, obj):
         """Link to deliverable."""
         if obj.deliverable:
@@ -91,3 +127,23 @@ class AssetAdmin(admin.ModelAdmin):
         if not obj.uploaded_by:
             obj.uploaded_by = request.user
         super().save_model(request, obj, form, change)
+
+
+@admin.register(StorageUsage)
+class StorageUsageAdmin(admin.ModelAdmin):
+    """Read-only view of the storage counters (rebuilt by management command)."""
+    
+    list_display = ('scope', 'key', 'file_count', 'size_display', 'updated_at')
+    list_filter = ('scope',)
+    search_fields = ('key',)
+    
+    def size_display(self, obj):
+        """Human-readable total size."""
+        return filesizeformat(obj.total_bytes)
+    size_display.short_description = 'Size'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,75 @@
+"""
+Print-sized image derivatives for PDF exports.
+
+Event sheets show images in a box of PDF_IMAGE_BOX points (1/72 inch).
+Embedding the full upload (often 20+ MP) makes xhtml2pdf slow and the PDF
+huge, so each image is resized once to that box at PDF_IMAGE_DPI and
+stored as a JPEG under MEDIA_ROOT/derivatives/pdf/<dpi>/. Asset files
+never change after upload, so the asset id and DPI are enough as a key.
+"""
+
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+DERIVATIVE_DIR = 'derivatives/pdf'
+
+# Matches .asset-image max-width/max-height in planning/event_pdf.html
+PDF_IMAGE_BOX = (200, 150)
+
+JPEG_QUALITY = 85
+
+
+def _pixel_box(dpi):
+    return tuple(round(points * dpi / 72) for points in PDF_IMAGE_BOX)
+
+
+def pdf_image_name(asset, dpi=None):
+    """Storage name of an asset's PDF derivative."""
+    dpi = dpi or settings.PDF_IMAGE_DPI
+    return f'{DERIVATIVE_DIR}/{dpi}/{asset.pk}.jpg'
+
+
+def pdf_image_path(asset, dpi=None):
+    """
+    Return a local path to a print-sized JPEG of an image asset.
+
+    The derivative is created on first use. Falls back to the original
+    file when the image can't be decoded, and returns it as-is when it
+    is already small enough.
+    """
+    dpi = dpi or settings.PDF_IMAGE_DPI
+    name = pdf_image_name(asset, dpi)
+    if default_storage.exists(name):
+        return default_storage.path(name)
+
+    box = _pixel_box(dpi)
+    if asset.width and asset.height and asset.width <= box[0] and asset.height <= box[1] \
+            and asset.media_format == 'jpeg':
+        return asset.file.path
+
+    try:
+        with asset.file.open('rb') as f, Image.open(f) as img:
+            img.draft('RGB', box)
+            img = ImageOps.exif_transpose(img)
+            if img.mode in ('RGBA', 'LA', 'P'):
+                # JPEG has no alpha: flatten onto the white page background
+                img = img.convert('RGBA')
+                background = Image.new('RGB', img.size, 'white')
+                background.paste(img, mask=img.getchannel('A'))
+                img = background
+            else:
+                img = img.convert('RGB')
+            img.thumbnail(box, Image.Resampling.LANCZOS)
+            out = BytesIO()
+            img.save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+    except (FileNotFoundError, UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return asset.file.path
+
+    default_storage.delete(name)
+    default_storage.save(name, ContentFile(out.getvalue()))
+    return default_storage.path(name)
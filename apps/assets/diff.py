@@ -0,0 +1,138 @@
+"""
+Visual diff between two image versions of the same deliverable.
+
+Both versions are decoded at a reduced size, scaled onto the same pixel
+grid and compared with NumPy. The result is a derivative PNG (the new
+version dimmed, changed pixels in red, changed region boxed) plus the
+numbers shown next to it, stored under MEDIA_ROOT/derivatives/diffs/
+and keyed by both asset ids. Asset files never change after upload,
+so a cached diff never goes stale.
+"""
+
+import json
+from io import BytesIO
+
+import numpy as np
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageDraw, ImageOps, UnidentifiedImageError
+
+
+DIFF_DIR = 'derivatives/diffs'
+
+# Longest side of the comparison grid
+DIFF_MAX_SIZE = 1024
+
+# Per-channel difference (0-255) below which a pixel counts as unchanged,
+# so JPEG re-encoding noise doesn't light up the whole mask
+DIFF_THRESHOLD = 32
+
+HIGHLIGHT = (239, 68, 68)
+
+
+class DiffError(Exception):
+    """Raised when a diff can't be produced (unreadable image, etc.)."""
+
+
+def _cache_paths(old, new):
+    base = f'{DIFF_DIR}/{old.pk}_{new.pk}'
+    return f'{base}.png', f'{base}.json'
+
+
+def _load(asset, size=None):
+    """Decode an asset image as an RGB array, optionally resized to `size`."""
+    try:
+        with asset.file.open('rb') as f, Image.open(f) as img:
+            img.draft('RGB', size or (DIFF_MAX_SIZE, DIFF_MAX_SIZE))
+            img = ImageOps.exif_transpose(img).convert('RGB')
+            if size is None:
+                img.thumbnail((DIFF_MAX_SIZE, DIFF_MAX_SIZE), Image.Resampling.LANCZOS)
+            elif img.size != size:
+                img = img.resize(size, Image.Resampling.LANCZOS)
+            return np.asarray(img, dtype=np.int16)
+    except (FileNotFoundError, UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError) as e:
+        raise DiffError(f'Cannot read {asset.original_filename}: {e}') from e
+
+
+def _render(new_pixels, mask, box):
+    """Dimmed grayscale of the new version with changes painted in."""
+    gray = new_pixels.mean(axis=2, keepdims=True) * 0.35 + 40
+    out = np.repeat(gray, 3, axis=2)
+    out[mask] = HIGHLIGHT
+    img = Image.fromarray(out.astype(np.uint8), 'RGB')
+    if box:
+        ImageDraw.Draw(img).rectangle(box, outline=HIGHLIGHT, width=2)
+    buffer = BytesIO()
+    img.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def compute_diff(old, new):
+    """
+    Compare two image assets pixel by pixel.
+
+    The new version's aspect ratio defines the grid; the old version is
+    stretched onto it, so a reframed or resized upload still aligns.
+
+    Returns:
+        (png_bytes, info) where info has changed_percent, bbox (in the new
+        version's full-resolution pixels, or None when nothing changed),
+        aspect_changed and the grid size.
+    """
+    new_pixels = _load(new)
+    height, width = new_pixels.shape[:2]
+    old_pixels = _load(old, size=(width, height))
+
+    mask = np.abs(new_pixels - old_pixels).max(axis=2) > DIFF_THRESHOLD
+
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    box = None
+    bbox = None
+    if rows.size:
+        box = (int(cols[0]), int(rows[0]), int(cols[-1]), int(rows[-1]))
+        # Scale the box back to the new version's real resolution
+        sx = (new.width or width) / width
+        sy = (new.height or height) / height
+        bbox = {
+            'x': round(box[0] * sx),
+            'y': round(box[1] * sy),
+            'width': round((box[2] - box[0] + 1) * sx),
+            'height': round((box[3] - box[1] + 1) * sy),
+        }
+
+    aspect_changed = bool(
+        old.width and old.height and new.width and new.height
+        and abs(old.width / old.height - new.width / new.height) > 0.01
+    )
+    info = {
+        'old': old.pk,
+        'new': new.pk,
+        'changed_percent': round(float(mask.mean()) * 100, 2),
+        'bbox': bbox,
+        'aspect_changed': aspect_changed,
+        'grid': [width, height],
+    }
+    return _render(new_pixels, mask, box), info
+
+
+def version_diff(old, new):
+    """
+    Return the cached diff of two assets, computing it on first request.
+
+    Returns:
+        info dict from compute_diff() plus 'url' of the derivative PNG.
+    """
+    image_path, info_path = _cache_paths(old, new)
+    if default_storage.exists(info_path) and default_storage.exists(image_path):
+        with default_storage.open(info_path) as f:
+            info = json.load(f)
+    else:
+        png, info = compute_diff(old, new)
+        # Storage.save() may rename on collision, so clear stale files first
+        for path in (image_path, info_path):
+            default_storage.delete(path)
+        default_storage.save(image_path, ContentFile(png))
+        default_storage.save(info_path, ContentFile(json.dumps(info).encode()))
+    info['url'] = default_storage.url(image_path)
+    return info
@@ -0,0 +1,29 @@
+"""
+Background jobs for the assets app (run by `python manage.py run_jobs`).
+"""
+
+from apps.jobs.registry import register
+from .models import Asset
+from .palette import extract_palette
+
+
+@register('assets.extract_palette')
+def extract_asset_palette(job, asset_id):
+    """
+    Store the dominant colours of an image asset.
+
+    Assets that already have a palette are skipped, so each file is
+    analysed once even if the job is queued again.
+    """
+    asset = Asset.objects.filter(pk=asset_id, palette__isnull=True).only('pk', 'file').first()
+    if asset is None:
+        return {'skipped': True}
+
+    try:
+        with asset.file.open('rb') as f:
+            palette = extract_palette(f)
+    except (FileNotFoundError, OSError):
+        palette = []
+
+    Asset.objects.filter(pk=asset_id).update(palette=palette)
+    return {'colors': len(palette)}
@@ -0,0 +1,52 @@
+"""
+Backfill perceptual hashes for image assets uploaded before hashing existed.
+
+New uploads are hashed by Asset.save(). Hashes written here also set
+perceptual_hash_updated_at, which running workers' near-duplicate
+indexes catch up on (see similarity.get_index) - no restart needed.
+
+Usage:
+    python manage.py compute_perceptual_hashes
+    python manage.py compute_perceptual_hashes --all   # re-hash every image
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.assets.models import Asset
+from apps.assets.similarity import perceptual_hash
+
+
+class Command(BaseCommand):
+    help = 'Compute perceptual hashes for image assets missing one'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-hash every image asset, not only missing ones',
+        )
+
+    def handle(self, *args, **options):
+        assets = Asset.objects.filter(file_type=Asset.FileType.IMAGE)
+        if not options['all']:
+            assets = assets.filter(perceptual_hash__isnull=True)
+
+        updated = failed = 0
+        for asset in assets.only('pk', 'file').iterator(chunk_size=500):
+            try:
+                with asset.file.open('rb') as f:
+                    value = perceptual_hash(f)
+            except (FileNotFoundError, OSError):
+                value = None
+            if value is None:
+                failed += 1
+                continue
+            Asset.objects.filter(pk=asset.pk).update(
+                perceptual_hash=value, perceptual_hash_updated_at=timezone.now()
+            )
+            updated += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Hashed {updated} images ({failed} missing or unreadable)'
+        ))
@@ -0,0 +1,47 @@
+"""
+Backfill media metadata (dimensions, duration, codec) for existing assets.
+
+New uploads are handled by Asset.save(); this command covers assets
+uploaded before metadata extraction existed.
+
+Usage:
+    python manage.py extract_media_metadata
+    python manage.py extract_media_metadata --all   # re-read every file
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.assets.media import extract_metadata
+from apps.assets.models import Asset
+
+
+class Command(BaseCommand):
+    help = 'Extract width/height/duration/codec for assets missing metadata'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-extract metadata for every asset, not only missing ones',
+        )
+
+    def handle(self, *args, **options):
+        assets = Asset.objects.exclude(file_type=Asset.FileType.OTHER)
+        if not options['all']:
+            assets = assets.filter(media_format='')
+
+        updated = missing = 0
+        for asset in assets.only('pk', 'file', 'file_type').iterator(chunk_size=500):
+            try:
+                with asset.file.open('rb') as f:
+                    meta = extract_metadata(f, asset.file_type)
+            except (FileNotFoundError, OSError):
+                missing += 1
+                continue
+            if meta:
+                Asset.objects.filter(pk=asset.pk).update(**meta)
+                updated += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {updated} assets ({missing} files missing on disk)'
+        ))
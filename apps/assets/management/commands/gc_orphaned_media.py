@@ -0,0 +1,250 @@
+"""
+Find and delete files under MEDIA_ROOT/assets/ (and the archived originals
+under MEDIA_ROOT/originals/) that no Asset row points to, and derivatives
+under MEDIA_ROOT/derivatives/ of assets that no longer exist.
+
+Deleting an Event cascades to its Asset rows but leaves the files on
+disk. This command walks the upload tree with os.scandir and checks
+paths against Asset.file in batched IN queries (both columns are
+indexed), so the Asset table is never loaded as a whole. Derivative
+names carry the asset ids they were made from (PDF images, version
+diffs), which are checked against the primary key instead.
+
+Safe to run as a scheduled task:
+- --dry-run only reports orphans, and leaves the checkpoint as it is
+- files younger than --min-age-hours are skipped (uploads in flight)
+- progress is checkpointed to --state-file after every batch;
+  --resume continues from the last checkpoint after a crash or after
+  a --max-seconds time slice ran out
+
+Usage:
+    python manage.py gc_orphaned_media --dry-run
+    python manage.py gc_orphaned_media --min-age-hours 48
+    python manage.py gc_orphaned_media --resume --max-seconds 600
+"""
+
+import json
+import os
+import re
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.template.defaultfilters import filesizeformat
+
+from apps.assets.derivatives import DERIVATIVE_DIR
+from apps.assets.diff import DIFF_DIR
+from apps.assets.models import Asset
+
+
+# Subdirectories of MEDIA_ROOT holding Asset.file and Asset.original_file
+# (see asset_upload_path / original_upload_path) and the derivatives, in
+# sorted order
+MEDIA_DIRS = ('assets', 'derivatives', 'originals')
+
+# Derivative names -> ids of the assets they belong to
+DERIVATIVE_NAMES = (
+    re.compile(rf'^{re.escape(DERIVATIVE_DIR)}/\d+/(\d+)\.jpg$'),      # pdf_image_name
+    re.compile(rf'^{re.escape(DIFF_DIR)}/(\d+)_(\d+)\.(?:png|json)$'),  # diff._cache_paths
+)
+
+
+def derivative_asset_ids(rel_path):
+    """
+    Asset ids a derivative file was made from, or None if it isn't one.
+
+    Unrecognized files under derivatives/ map to an empty set, so they
+    are never deleted.
+    """
+    if not rel_path.startswith('derivatives/'):
+        return None
+    for pattern in DERIVATIVE_NAMES:
+        match = pattern.match(rel_path)
+        if match:
+            return {int(asset_id) for asset_id in match.groups()}
+    return set()
+
+
+class Command(BaseCommand):
+    help = 'Report or delete media files that are not referenced by any Asset'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List orphaned files without deleting them',
+        )
+        parser.add_argument(
+            '--min-age-hours',
+            type=float,
+            default=24,
+            help='Ignore files modified more recently than this (default: 24)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of paths checked per database query (default: 500)',
+        )
+        parser.add_argument(
+            '--state-file',
+            default=os.path.join(settings.BASE_DIR, 'logs', 'gc_orphaned_media.json'),
+            help='Checkpoint file used by --resume',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Continue from the last checkpoint instead of starting over',
+        )
+        parser.add_argument(
+            '--max-seconds',
+            type=float,
+            default=0,
+            help='Stop (with a checkpoint) after this many seconds; 0 = no limit',
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.state_file = options['state_file']
+        self.batch_size = options['batch_size']
+        self.cutoff = time.time() - options['min_age_hours'] * 3600
+        deadline = time.monotonic() + options['max_seconds'] if options['max_seconds'] else None
+
+        self.stats = {'scanned': 0, 'orphans': 0, 'bytes': 0, 'skipped_recent': 0}
+        resume_after = None
+        if options['resume']:
+            state = self._load_state()
+            if state:
+                resume_after = tuple(state['last_dir'].split('/'))
+                self.stats.update(state['stats'])
+                self.stdout.write(f"Resuming after {state['last_dir']}")
+
+        self.pending = []  # (relative path, absolute path, size)
+        for media_dir in MEDIA_DIRS:
+            root = os.path.join(settings.MEDIA_ROOT, media_dir)
+            for rel_dir in self._walk(root, (media_dir,), resume_after):
+                if len(self.pending) >= self.batch_size:
+                    self._flush()
+                    if not self.dry_run:
+                        self._save_state(rel_dir)
+                    if deadline and time.monotonic() > deadline:
+                        self.stdout.write(self.style.WARNING(
+                            'Time limit reached - run again with --resume to continue'
+                        ))
+                        self._report()
+                        return
+        self._flush()
+
+        # Finished a full pass - next run starts from the beginning
+        if not self.dry_run and os.path.exists(self.state_file):
+            os.remove(self.state_file)
+        self._report()
+
+    def _walk(self, path, parts, resume_after):
+        """
+        Depth-first walk in sorted order, queueing files of each directory.
+
+        Yields each directory's relative path once its files are queued.
+        Sorted preorder traversal means directory order equals tuple order
+        of path components, which is what makes --resume possible.
+        """
+        if resume_after is not None and parts < resume_after[:len(parts)]:
+            # Whole subtree was finished before the checkpoint
+            return
+        skip_files = resume_after is not None and parts <= resume_after
+
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except FileNotFoundError:
+            return
+
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry)
+            elif entry.is_file(follow_symlinks=False) and not skip_files:
+                stat = entry.stat(follow_symlinks=False)
+                self.stats['scanned'] += 1
+                if stat.st_mtime > self.cutoff:
+                    self.stats['skipped_recent'] += 1
+                    continue
+                self.pending.append(('/'.join(parts + (entry.name,)), entry.path, stat.st_size))
+
+        yield '/'.join(parts)
+
+        for entry in subdirs:
+            yield from self._walk(entry.path, parts + (entry.name,), resume_after)
+
+    def _flush(self):
+        """Check queued paths against Asset.file/original_file (or Asset ids) and handle the orphans."""
+        if not self.pending:
+            return
+        paths = []
+        derivatives = {}  # relative path -> asset ids
+        for rel_path, _, _ in self.pending:
+            asset_ids = derivative_asset_ids(rel_path)
+            if asset_ids is None:
+                paths.append(rel_path)
+            else:
+                derivatives[rel_path] = asset_ids
+
+        referenced = set()
+        if paths:
+            for file_name, original_name in Asset.objects.filter(
+                Q(file__in=paths) | Q(original_file__in=paths)
+            ).values_list('file', 'original_file'):
+                referenced.update((file_name, original_name))
+        if derivatives:
+            existing = set(Asset.objects.filter(
+                pk__in=set().union(*derivatives.values())
+            ).values_list('pk', flat=True))
+            referenced.update(path for path, asset_ids in derivatives.items() if asset_ids <= existing)
+        for rel_path, abs_path, size in self.pending:
+            if rel_path in referenced:
+                continue
+            self.stats['orphans'] += 1
+            self.stats['bytes'] += size
+            if self.dry_run:
+                self.stdout.write(f'orphan: {rel_path} ({filesizeformat(size)})')
+                continue
+            try:
+                os.remove(abs_path)
+            except FileNotFoundError:
+                continue
+            self._remove_empty_parents(os.path.dirname(abs_path))
+        self.pending = []
+
+    def _remove_empty_parents(self, directory):
+        """Remove directories left empty by deletions, up to the MEDIA_DIRS roots."""
+        roots = {os.path.normpath(os.path.join(settings.MEDIA_ROOT, d)) for d in MEDIA_DIRS}
+        while os.path.normpath(directory) not in roots:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                return  # Not empty (or already gone)
+            directory = os.path.dirname(directory)
+
+    def _load_state(self):
+        try:
+            with open(self.state_file) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_state(self, last_dir):
+        """Atomically write the checkpoint (write + rename)."""
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp_path = f'{self.state_file}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'last_dir': last_dir, 'stats': self.stats}, f)
+        os.replace(tmp_path, self.state_file)
+
+    def _report(self):
+        action = 'Found' if self.dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action} {self.stats['orphans']} orphaned files "
+            f"({filesizeformat(self.stats['bytes'])}) out of {self.stats['scanned']} scanned, "
+            f"{self.stats['skipped_recent']} skipped as too recent"
+        ))
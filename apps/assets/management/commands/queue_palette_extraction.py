@@ -0,0 +1,44 @@
+"""
+Queue palette extraction for image assets that haven't been analysed yet.
+
+New uploads are queued automatically; this command covers assets uploaded
+before palettes existed. The work itself is done by run_jobs.
+
+Usage:
+    python manage.py queue_palette_extraction
+    python manage.py run_jobs --burst
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.assets.models import Asset
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Queue background palette extraction for image assets missing a palette'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Jobs inserted per query (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        asset_ids = Asset.objects.filter(
+            file_type=Asset.FileType.IMAGE, palette__isnull=True
+        ).order_by('pk').values_list('pk', flat=True)
+
+        queued = 0
+        batch = []
+        for asset_id in asset_ids.iterator(chunk_size=options['batch_size']):
+            batch.append({'asset_id': asset_id})
+            if len(batch) >= options['batch_size']:
+                queued += len(Job.enqueue_many('assets.extract_palette', batch))
+                batch = []
+        if batch:
+            queued += len(Job.enqueue_many('assets.extract_palette', batch))
+
+        self.stdout.write(self.style.SUCCESS(f'Queued {queued} palette jobs'))
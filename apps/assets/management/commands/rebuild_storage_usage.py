@@ -0,0 +1,55 @@
+"""
+Rebuild the StorageUsage counters from the Asset table.
+
+Counters are normally maintained incrementally on upload/delete, and
+migration 0008 counted the assets stored before they existed. Run this
+whenever they drift (e.g., after files were replaced in the admin or rows
+were edited by hand).
+
+Usage:
+    python manage.py rebuild_storage_usage
+"""
+
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.assets.models import Asset, StorageUsage
+
+
+class Command(BaseCommand):
+    help = 'Recompute storage usage counters by streaming the Asset table'
+
+    def handle(self, *args, **options):
+        counts = defaultdict(int)
+        sizes = defaultdict(int)
+
+        # Stream only the columns needed - never loads the whole table
+        assets = Asset.objects.only(
+            'file', 'file_size', 'original_file', 'original_file_size',
+            'file_type', 'uploaded_by_id'
+        ).order_by().iterator(chunk_size=2000)
+        for asset in assets:
+            for scope_key in StorageUsage.keys_for(asset):
+                counts[scope_key] += 1
+                sizes[scope_key] += asset.stored_bytes
+
+        with transaction.atomic():
+            # Upsert (INSERT ... ON CONFLICT DO UPDATE) stamps every current
+            # counter; rows left with an older updated_at have no assets anymore
+            rebuilt_at = timezone.now()
+            StorageUsage.objects.bulk_create(
+                [
+                    StorageUsage(scope=scope, key=key, file_count=count, total_bytes=sizes[(scope, key)])
+                    for (scope, key), count in counts.items()
+                ],
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['scope', 'key'],
+                update_fields=['file_count', 'total_bytes', 'updated_at'],
+            )
+            StorageUsage.objects.filter(updated_at__lt=rebuilt_at).delete()
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(counts)} storage counters'))
@@ -0,0 +1,187 @@
+"""
+Media metadata helpers for the assets app.
+
+- parse_specs(): turn free-text specs ("960x192 mp4") into structured fields
+- extract_metadata(): read real dimensions/duration/codec from an upload
+  (Pillow for images, a small pure-Python box parser for MP4/MOV video)
+
+Only headers are read, so extraction is cheap even for large videos.
+"""
+
+import re
+import struct
+
+from PIL import Image, UnidentifiedImageError
+
+
+# Spec keywords -> normalized format names (matches Pillow's format names)
+FORMAT_ALIASES = {
+    'jpg': 'jpeg',
+    'jpeg': 'jpeg',
+    'png': 'png',
+    'webp': 'webp',
+    'gif': 'gif',
+    'mp4': 'mp4',
+    'mov': 'mov',
+    'pdf': 'pdf',
+}
+
+_DIMENSIONS_RE = re.compile(r'(\d{2,5})\s*[x×]\s*(\d{2,5})', re.IGNORECASE)
+_FORMAT_RE = re.compile(r'\b(' + '|'.join(FORMAT_ALIASES) + r')\b', re.IGNORECASE)
+
+
+def parse_specs(specs):
+    """
+    Parse a free-text specs string into structured fields.
+
+    Examples:
+        '960x192 mp4'       -> {'spec_width': 960, 'spec_height': 192, 'spec_format': 'mp4'}
+        'A3 300dpi PDF'     -> {'spec_width': None, 'spec_height': None, 'spec_format': 'pdf'}
+    """
+    result = {'spec_width': None, 'spec_height': None, 'spec_format': ''}
+    if not specs:
+        return result
+
+    dimensions = _DIMENSIONS_RE.search(specs)
+    if dimensions:
+        result['spec_width'] = int(dimensions.group(1))
+        result['spec_height'] = int(dimensions.group(2))
+
+    file_format = _FORMAT_RE.search(specs)
+    if file_format:
+        result['spec_format'] = FORMAT_ALIASES[file_format.group(1).lower()]
+
+    return result
+
+
+# =============================================================================
+# MP4 / QuickTime box parser
+# =============================================================================
+
+# Boxes that only contain other boxes on the path to the video metadata
+_CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+
+def _iter_boxes(f, start, end):
+    """Yield (type, payload_start, box_end) for each box between start and end."""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header)
+        header_size = 8
+        if size == 1:
+            # 64-bit largesize follows the type
+            size = struct.unpack('>Q', f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            # Box extends to end of file
+            size = end - offset
+        if size < header_size:
+            return
+        yield box_type, offset + header_size, min(offset + size, end)
+        offset += size
+
+
+def _read_at(f, offset, length):
+    f.seek(offset)
+    return f.read(length)
+
+
+def _parse_track(f, start, end):
+    """Return (handler, width, height, codec) for a trak box."""
+    handler = width = height = None
+    codec = ''
+
+    for box_type, payload, box_end in _iter_boxes(f, start, end):
+        if box_type == b'tkhd':
+            version = _read_at(f, payload, 1)[0]
+            # Width/height are 16.16 fixed point after the version-dependent header
+            dims_offset = payload + (88 if version == 1 else 76)
+            raw_width, raw_height = struct.unpack('>II', _read_at(f, dims_offset, 8))
+            width, height = raw_width >> 16, raw_height >> 16
+        elif box_type in _CONTAINER_BOXES:
+            sub_handler, _, _, sub_codec = _parse_track(f, payload, box_end)
+            handler = handler or sub_handler
+            codec = codec or sub_codec
+        elif box_type == b'hdlr':
+            handler = _read_at(f, payload + 8, 4)
+        elif box_type == b'stsd':
+            # First sample entry: size(4) + format(4) after version/flags + entry_count
+            codec = _read_at(f, payload + 12, 4).decode('latin-1').strip()
+
+    return handler, width, height, codec
+
+
+def parse_mp4(f):
+    """
+    Read dimensions, duration and codec from an MP4/MOV file object.
+
+    Walks the box tree and seeks over media data, so only a few KB are
+    read regardless of file size (works whether moov is first or last).
+    """
+    if _read_at(f, 4, 4) != b'ftyp':
+        return {}
+
+    f.seek(0, 2)
+    end = f.tell()
+    meta = {}
+
+    for box_type, payload, box_end in _iter_boxes(f, 0, end):
+        if box_type == b'ftyp':
+            brand = _read_at(f, payload, 4)
+            meta['media_format'] = 'mov' if brand == b'qt  ' else 'mp4'
+        elif box_type == b'moov':
+            for child, child_payload, child_end in _iter_boxes(f, payload, box_end):
+                if child == b'mvhd':
+                    version = _read_at(f, child_payload, 1)[0]
+                    if version == 1:
+                        timescale, duration = struct.unpack('>IQ', _read_at(f, child_payload + 20, 12))
+                    else:
+                        timescale, duration = struct.unpack('>II', _read_at(f, child_payload + 12, 8))
+                    if timescale:
+                        meta['duration'] = round(duration / timescale, 3)
+                elif child == b'trak':
+                    handler, width, height, codec = _parse_track(f, child_payload, child_end)
+                    if handler == b'vide' and 'width' not in meta:
+                        meta.update(width=width, height=height, codec=codec)
+
+    return meta
+
+
+# =============================================================================
+# Extraction entry point
+# =============================================================================
+
+def extract_metadata(f, file_type):
+    """
+    Extract media metadata from an open file object.
+
+    Args:
+        f: Seekable binary file object positioned anywhere
+        file_type: Asset.FileType value ('image', 'video', ...)
+
+    Returns:
+        Dict with any of width, height, duration, codec, media_format.
+        Unreadable or unsupported files return an empty dict.
+    """
+    try:
+        if file_type == 'image':
+            f.seek(0)
+            with Image.open(f) as img:
+                return {
+                    'width': img.width,
+                    'height': img.height,
+                    'media_format': (img.format or '').lower(),
+                }
+        if file_type == 'video':
+            return parse_mp4(f)
+        if file_type == 'pdf':
+            return {'media_format': 'pdf'} if _read_at(f, 0, 5) == b'%PDF-' else {}
+    except (UnidentifiedImageError, OSError, struct.error, IndexError, ValueError, Image.DecompressionBombError):
+        pass
+    finally:
+        f.seek(0)
+    return {}
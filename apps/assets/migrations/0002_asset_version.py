@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-19 03:06
+
+from django.db import migrations, models
+
+
+def backfill_versions(apps, schema_editor):
+    """Number existing assets per deliverable and set the latest pointers."""
+    Asset = apps.get_model('assets', 'Asset')
+    EventDeliverable = apps.get_model('planning', 'EventDeliverable')
+
+    for deliverable in EventDeliverable.objects.filter(assets__isnull=False).distinct():
+        versions = list(Asset.objects.filter(deliverable=deliverable).order_by('created_at', 'pk'))
+        for number, asset in enumerate(versions, start=1):
+            asset.version = number
+        Asset.objects.bulk_update(versions, ['version'])
+        deliverable.latest_asset = versions[-1]
+        deliverable.version_count = len(versions)
+        deliverable.save(update_fields=['latest_asset', 'version_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0001_initial'),
+        ('planning', '0005_deliverable_latest_asset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Version number within the deliverable (1, 2, 3...)'),
+        ),
+        migrations.RunPython(backfill_versions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='asset',
+            constraint=models.UniqueConstraint(fields=('deliverable', 'version'), name='unique_asset_version_per_deliverable'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-19 03:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0002_asset_version'),
+        ('planning', '0006_deliverabletemplate_parsed_specs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='codec',
+            field=models.CharField(blank=True, help_text="Video codec fourcc (e.g., 'avc1', 'hvc1')", max_length=20),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='duration',
+            field=models.FloatField(blank=True, help_text='Duration in seconds (videos)', null=True),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, help_text='Pixel height (images and videos)', null=True),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='media_format',
+            field=models.CharField(blank=True, help_text="Detected container/image format (e.g., 'jpeg', 'mp4')", max_length=10),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, help_text='Pixel width (images and videos)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['deliverable', 'media_format', 'width', 'height'], name='asset_spec_check_idx'),
+        ),
+    ]
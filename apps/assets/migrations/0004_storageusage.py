@@ -0,0 +1,30 @@
+# Generated by Django 6.0 on 2026-10-19 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0003_asset_media_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StorageUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('total', 'Total'), ('event', 'Event'), ('year', 'Year'), ('user', 'User'), ('file_type', 'File Type')], max_length=20)),
+                ('key', models.CharField(blank=True, help_text='Event id, year, user id or file type (empty for total)', max_length=50)),
+                ('file_count', models.PositiveIntegerField(default=0)),
+                ('total_bytes', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Storage Usage',
+                'verbose_name_plural': 'Storage Usage',
+                'ordering': ['scope', '-total_bytes'],
+                'unique_together': {('scope', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0 on 2026-10-19 03:12
+
+import apps.assets.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0004_storageusage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='optimization_policy',
+            field=models.CharField(blank=True, help_text='Optimization policy applied at upload (screen, print, social...)', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='original_file',
+            field=models.FileField(blank=True, db_index=True, help_text='Archived original upload when the image was optimized', upload_to=apps.assets.models.original_upload_path),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='original_file_size',
+            field=models.PositiveIntegerField(default=0, help_text='Size of the upload before optimization (0 if not optimized)'),
+        ),
+        migrations.AlterField(
+            model_name='asset',
+            name='file',
+            field=models.FileField(db_index=True, help_text='The uploaded file', upload_to=apps.assets.models.asset_upload_path),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0005_asset_ingest_optimization'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='perceptual_hash',
+            field=models.BigIntegerField(blank=True, db_index=True, help_text='64-bit DCT perceptual hash for near-duplicate search (images)', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0006_asset_perceptual_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='palette',
+            field=models.JSONField(blank=True, help_text="Dominant colours [{'color': '#rrggbb', 'share': 0.4}, ...] (null until analysed in the background)", null=True),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 6.0 on 2026-10-19 15:20
+
+from collections import defaultdict
+
+from django.db import migrations
+
+
+def backfill_storage_usage(apps, schema_editor):
+    """
+    Count the existing assets into the storage counters.
+
+    Same computation as rebuild_storage_usage (and StorageUsage.keys_for),
+    so assets uploaded before the counters existed are included.
+    """
+    Asset = apps.get_model('assets', 'Asset')
+    StorageUsage = apps.get_model('assets', 'StorageUsage')
+
+    counts = defaultdict(int)
+    sizes = defaultdict(int)
+    assets = Asset.objects.only(
+        'file', 'file_size', 'original_file', 'original_file_size',
+        'file_type', 'uploaded_by_id'
+    ).order_by().iterator(chunk_size=2000)
+    for asset in assets:
+        parts = asset.file.name.split('/')
+        year = parts[1] if len(parts) > 2 and parts[0] == 'assets' else 'general'
+        keys = [
+            ('total', ''),
+            ('year', year),
+            ('file_type', asset.file_type),
+            ('user', str(asset.uploaded_by_id or '')),
+        ]
+        if len(parts) > 3 and parts[2].startswith('event_'):
+            keys.append(('event', parts[2][len('event_'):]))
+
+        stored_bytes = asset.file_size + (asset.original_file_size if asset.original_file else 0)
+        for scope_key in keys:
+            counts[scope_key] += 1
+            sizes[scope_key] += stored_bytes
+
+    StorageUsage.objects.bulk_create(
+        [
+            StorageUsage(scope=scope, key=key, file_count=count, total_bytes=sizes[(scope, key)])
+            for (scope, key), count in counts.items()
+        ],
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=['scope', 'key'],
+        update_fields=['file_count', 'total_bytes', 'updated_at'],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0007_asset_palette'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_storage_usage, migrations.RunPython.noop),
+    ]
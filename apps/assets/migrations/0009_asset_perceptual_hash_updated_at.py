@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0008_backfill_storage_usage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='perceptual_hash_updated_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text="When the hash of an existing asset was (re)computed, for the workers' indexes", null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0009_asset_perceptual_hash_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='asset',
+            name='perceptual_hash_updated_at',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, help_text="When the hash was last written (ingest or backfill), for the workers' indexes", null=True),
+        ),
+    ]
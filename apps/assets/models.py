@@ -6,7 +6,19 @@ Handles file uploads for marketing deliverables (images, videos, PDFs).
 
 import os
 from django.conf import settings
-from django.db import models
+from django.core.files.base import ContentFile
+from django.db import models, transaction
+from django.db.models import F, Max, Q
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from apps.jobs.models import Job
+from .media import extract_metadata
+from .optimize import optimize_image
+from .palette import theme_score
+from .similarity import index as similarity_index, perceptual_hash
 
 
 def asset_upload_path(instance, filename):
@@ -21,12 +33,49 @@ def asset_upload_path(instance, filename):
     return f"assets/general/{filename}"
 
 
+def original_upload_path(instance, filename):
+    """
+    Archive path for the untouched upload of an optimized image.
+    
+    Mirrors asset_upload_path under originals/ instead of assets/.
+    """
+    return 'originals/' + asset_upload_path(instance, filename)[len('assets/'):]
+
+
+class AssetQuerySet(models.QuerySet):
+    """Query helpers for Asset."""
+    
+    def spec_mismatches(self):
+        """
+        Assets whose extracted metadata doesn't match their template spec.
+        
+        Compares the stored width/height/media_format columns with the
+        parsed spec fields on DeliverableTemplate in a single joined query.
+        Assets with no readable dimensions count as mismatches when the
+        template defines a resolution.
+        """
+        template = 'deliverable__template__'
+        wrong_size = Q(**{f'{template}spec_width__isnull': False}) & (
+            Q(width__isnull=True)
+            | ~Q(width=F(f'{template}spec_width'))
+            | ~Q(height=F(f'{template}spec_height'))
+        )
+        wrong_format = ~Q(**{f'{template}spec_format': ''}) & ~Q(
+            media_format=F(f'{template}spec_format')
+        )
+        return self.filter(wrong_size | wrong_format)
+
+
 class Asset(models.Model):
     """
     Represents an uploaded file for a deliverable.
     
     Supports images, videos, and PDFs. Each asset is linked to
     an EventDeliverable and tracks upload metadata.
+    
+    Versioning: each new asset for a deliverable gets the next version
+    number, and the deliverable's latest_asset/version_count are kept
+    in sync in the same transaction.
     """
     
     class FileType(models.TextChoices):
@@ -35,9 +84,12 @@ class Asset(models.Model):
         PDF = 'pdf', 'PDF Document'
         OTHER = 'other', 'Other'
     
+    objects = AssetQuerySet.as_manager()
+    
     # File
     file = models.FileField(
         upload_to=asset_upload_path,
+        db_index=True,
         help_text="The uploaded file"
     )
     
@@ -58,6 +110,25 @@ class Asset(models.Model):
         help_text="File size in bytes"
     )
     
+    # Ingest optimization (see optimize.py)
+    original_file = models.FileField(
+        upload_to=original_upload_path,
+        blank=True,
+        db_index=True,
+        help_text="Archived original upload when the image was optimized"
+    )
+    
+    original_file_size = models.PositiveIntegerField(
+        default=0,
+        help_text="Size of the upload before optimization (0 if not optimized)"
+    )
+    
+    optimization_policy = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text="Optimization policy applied at upload (screen, print, social...)"
+    )
+    
     # Link to deliverable (optional for now, allows general uploads)
     deliverable = models.ForeignKey(
         'planning.EventDeliverable',
@@ -86,6 +157,64 @@ class Asset(models.Model):
         help_text="Whether this asset version is approved"
     )
     
+    version = models.PositiveIntegerField(
+        default=1,
+        help_text="Version number within the deliverable (1, 2, 3...)"
+    )
+    
+    # Media metadata (extracted from the file at upload)
+    width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Pixel width (images and videos)"
+    )
+    
+    height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Pixel height (images and videos)"
+    )
+    
+    duration = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Duration in seconds (videos)"
+    )
+    
+    codec = models.CharField(
+        max_length=20,
+        blank=True,
+        help_text="Video codec fourcc (e.g., 'avc1', 'hvc1')"
+    )
+    
+    media_format = models.CharField(
+        max_length=10,
+        blank=True,
+        help_text="Detected container/image format (e.g., 'jpeg', 'mp4')"
+    )
+    
+    perceptual_hash = models.BigIntegerField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text="64-bit DCT perceptual hash for near-duplicate search (images)"
+    )
+    
+    perceptual_hash_updated_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="When the hash was last written (ingest or backfill), for the workers' indexes"
+    )
+    
+    palette = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Dominant colours [{'color': '#rrggbb', 'share': 0.4}, ...] "
+                  "(null until analysed in the background)"
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -94,6 +223,18 @@ class Asset(models.Model):
         verbose_name = 'Asset'
         verbose_name_plural = 'Assets'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['deliverable', 'media_format', 'width', 'height'],
+                name='asset_spec_check_idx'
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['deliverable', 'version'],
+                name='unique_asset_version_per_deliverable'
+            ),
+        ]
     
     def __str__(self):
         if self.deliverable:
@@ -102,18 +243,35 @@ class Asset(models.Model):
     
     def save(self, *args, **kwargs):
         """Auto-detect file type and store metadata on save."""
+        if self.file:
+            self.prepare_file()
+        
+        if self._state.adding:
+            with transaction.atomic():
+                if self.deliverable_id:
+                    self._save_new_version(*args, **kwargs)
+                else:
+                    super().save(*args, **kwargs)
+                StorageUsage.track(self, +1)
+                if self.file_type == self.FileType.IMAGE:
+                    Job.enqueue('assets.extract_palette', asset_id=self.pk)
+        else:
+            super().save(*args, **kwargs)
+    
+    def prepare_file(self):
+        """
+        Detect file type and metadata, and optimize new image uploads.
+        
+        Called by save(); batch uploads call it directly before bulk_create.
+        """
         if self.file:
             # Store original filename
             if not self.original_filename:
                 self.original_filename = os.path.basename(self.file.name)
             
-            # Store file size
-            if hasattr(self.file, 'size'):
-                self.file_size = self.file.size
-            
             # Auto-detect file type
             ext = os.path.splitext(self.file.name)[1].lower()
-            if ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']:
+            if ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif', '.tif', '.tiff']:
                 self.file_type = self.FileType.IMAGE
             elif ext in ['.mp4', '.mov', '.avi', '.webm']:
                 self.file_type = self.FileType.VIDEO
@@ -121,8 +279,65 @@ class Asset(models.Model):
                 self.file_type = self.FileType.PDF
             else:
                 self.file_type = self.FileType.OTHER
+            
+            if not self.file._committed:
+                if self.file_type == self.FileType.IMAGE and settings.ASSET_IMAGE_OPTIMIZATION:
+                    self._optimize_upload()
+                
+                # Read real dimensions/codec from newly uploaded files
+                for field, value in extract_metadata(self.file, self.file_type).items():
+                    setattr(self, field, value)
+                
+                if self.file_type == self.FileType.IMAGE:
+                    self.perceptual_hash = perceptual_hash(self.file)
+                    self.perceptual_hash_updated_at = timezone.now()
+            
+            # Store file size
+            if hasattr(self.file, 'size'):
+                self.file_size = self.file.size
+    
+    def _optimize_upload(self):
+        """
+        Replace a new image upload with its optimized version.
+        
+        The untouched upload is moved to original_file and the size
+        before optimization is recorded for the savings report.
+        """
+        template = self.deliverable.template if self.deliverable else None
+        result = optimize_image(self.file, os.path.basename(self.file.name), template)
+        if result is None:
+            return
+        
+        data, filename, policy = result
+        self.original_file_size = self.file.size
+        self.original_file = self.file.file
+        self.file = ContentFile(data, name=filename)
+        self.optimization_policy = policy
+    
+    def _save_new_version(self, *args, **kwargs):
+        """
+        Insert this asset as the next version of its deliverable.
+        
+        Must run inside a transaction: the deliverable row is locked while
+        the version number is assigned and the pointer is updated.
+        """
+        from apps.planning.models import EventDeliverable
+        
+        deliverables = EventDeliverable.objects.filter(pk=self.deliverable_id)
+        list(deliverables.select_for_update().order_by().values_list('pk', flat=True))
+        
+        last_version = Asset.objects.filter(
+            deliverable_id=self.deliverable_id
+        ).aggregate(last=Max('version'))['last']
+        self.version = (last_version or 0) + 1
         
         super().save(*args, **kwargs)
+        
+        deliverables.update(
+            latest_asset=self,
+            version_count=models.F('version_count') + 1,
+            updated_at=timezone.now(),
+        )
     
     @property
     def file_size_display(self):
@@ -134,7 +349,206 @@ class Asset(models.Model):
             size /= 1024
         return f"{size:.1f} TB"
     
+    @property
+    def bytes_saved(self):
+        """Bytes saved by ingest optimization (0 if not optimized)."""
+        if not self.original_file_size:
+            return 0
+        return max(0, self.original_file_size - self.file_size)
+    
+    @property
+    def stored_bytes(self):
+        """Disk space used by this asset, including the archived original."""
+        return self.file_size + (self.original_file_size if self.original_file else 0)
+    
     @property
     def extension(self):
         """Return file extension."""
         return os.path.splitext(self.original_filename)[1].lower() if self.original_filename else ''
+    
+    @property
+    def dimensions_display(self):
+        """Return resolution string (e.g., '960x192') or empty string."""
+        if self.width and self.height:
+            return f"{self.width}x{self.height}"
+        return ''
+    
+    @property
+    def matches_spec(self):
+        """
+        Check this asset against its deliverable template spec.
+        
+        Returns True/False, or None when there is no spec to check against.
+        Same rules as AssetQuerySet.spec_mismatches().
+        """
+        if not self.deliverable:
+            return None
+        template = self.deliverable.template
+        if template.spec_width is None and not template.spec_format:
+            return None
+        if template.spec_width is not None and (
+            self.width != template.spec_width or self.height != template.spec_height
+        ):
+            return False
+        if template.spec_format and self.media_format != template.spec_format:
+            return False
+        return True
+    
+    def theme_score(self, theme):
+        """0-100 closeness of the palette to a ThemePeriod's colours, or None."""
+        if not theme or not self.palette:
+            return None
+        return theme_score(self.palette, [theme.primary_color, theme.accent_color])
+    
+    @property
+    def version_display(self):
+        """Return short version label (e.g., 'v3')."""
+        return f"v{self.version}"
+
+
+class StorageUsage(models.Model):
+    """
+    Incrementally maintained disk usage counters for uploaded assets.
+    
+    One row per (scope, key), e.g. ('year', '2026') or ('event', '42').
+    Rows are adjusted in the same transaction as Asset inserts/deletes,
+    so dashboards and the upload quota guard never sum the Asset table.
+    Rebuild with: python manage.py rebuild_storage_usage
+    """
+    
+    class Scope(models.TextChoices):
+        TOTAL = 'total', 'Total'
+        EVENT = 'event', 'Event'
+        YEAR = 'year', 'Year'
+        USER = 'user', 'User'
+        FILE_TYPE = 'file_type', 'File Type'
+    
+    scope = models.CharField(
+        max_length=20,
+        choices=Scope.choices
+    )
+    
+    key = models.CharField(
+        max_length=50,
+        blank=True,
+        help_text="Event id, year, user id or file type (empty for total)"
+    )
+    
+    file_count = models.PositiveIntegerField(default=0)
+    
+    total_bytes = models.PositiveBigIntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Storage Usage'
+        verbose_name_plural = 'Storage Usage'
+        ordering = ['scope', '-total_bytes']
+        unique_together = ['scope', 'key']
+    
+    def __str__(self):
+        return f"{self.get_scope_display()} {self.key}: {self.file_count} files"
+    
+    @classmethod
+    def keys_for(cls, asset):
+        """
+        Return the (scope, key) pairs an asset counts towards.
+        
+        Year and event come from the stored path
+        (assets/<year>/event_<id>/...), so no related rows are queried.
+        """
+        parts = asset.file.name.split('/')
+        year = parts[1] if len(parts) > 2 and parts[0] == 'assets' else 'general'
+        
+        keys = [
+            (cls.Scope.TOTAL, ''),
+            (cls.Scope.YEAR, year),
+            (cls.Scope.FILE_TYPE, asset.file_type),
+            (cls.Scope.USER, str(asset.uploaded_by_id or '')),
+        ]
+        if len(parts) > 3 and parts[2].startswith('event_'):
+            keys.append((cls.Scope.EVENT, parts[2][len('event_'):]))
+        return keys
+    
+    @classmethod
+    def track(cls, asset, sign):
+        """Add (sign=+1) or remove (sign=-1) an asset from all its counters."""
+        cls.track_many([asset], sign)
+    
+    @classmethod
+    def track_many(cls, assets, sign):
+        """Add or remove several assets, with one UPDATE per counter row."""
+        deltas = {}
+        for asset in assets:
+            for scope_key in cls.keys_for(asset):
+                count, size = deltas.get(scope_key, (0, 0))
+                deltas[scope_key] = (count + 1, size + asset.stored_bytes)
+        
+        if sign > 0:
+            # Make sure the rows exist; ON CONFLICT DO NOTHING lets concurrent
+            # first uploads for the same key both go through
+            cls.objects.bulk_create(
+                [cls(scope=scope, key=key) for scope, key in deltas],
+                ignore_conflicts=True,
+            )
+        
+        now = timezone.now()
+        for (scope, key), (count, size) in deltas.items():
+            # Clamped at 0: counters can lag behind assets stored before they
+            # existed, until rebuild_storage_usage is run
+            cls.objects.filter(scope=scope, key=key).update(
+                file_count=Greatest(F('file_count') + sign * count, 0),
+                total_bytes=Greatest(F('total_bytes') + sign * size, 0),
+                updated_at=now,
+            )
+    
+    @classmethod
+    def total(cls):
+        """Return the global counter row (unsaved zero row if none yet)."""
+        return cls.objects.filter(scope=cls.Scope.TOTAL, key='').first() or cls(scope=cls.Scope.TOTAL)
+    
+    @classmethod
+    def quota_bytes(cls):
+        """Configured storage quota in bytes."""
+        return settings.STORAGE_QUOTA_MB * 1024 * 1024
+    
+    @classmethod
+    def would_exceed_quota(cls, size):
+        """
+        Check if storing `size` more bytes would go over the quota.
+        
+        Pass Asset.stored_bytes (after prepare_file), which includes the
+        archived original of optimized images, not the upload size.
+        """
+        return cls.total().total_bytes + size > cls.quota_bytes()
+
+
+@receiver(post_delete, sender=Asset)
+def untrack_deleted_asset(sender, instance, **kwargs):
+    """Remove a deleted asset from the storage usage counters."""
+    StorageUsage.track(instance, -1)
+
+
+@receiver(post_delete, sender=Asset)
+def drop_from_similarity_index(sender, instance, **kwargs):
+    """Forget a deleted asset in this process's near-duplicate index."""
+    if instance.perceptual_hash is not None:
+        asset_id = instance.pk  # Cleared by the deletion collector afterwards
+        transaction.on_commit(lambda: similarity_index.remove(asset_id))
+
+
+@receiver(post_delete, sender=Asset)
+def refresh_deliverable_version_pointer(sender, instance, **kwargs):
+    """Repoint the deliverable to its newest remaining version after a delete."""
+    if not instance.deliverable_id:
+        return
+    
+    from apps.planning.models import EventDeliverable
+    
+    with transaction.atomic():
+        remaining = Asset.objects.filter(deliverable_id=instance.deliverable_id)
+        EventDeliverable.objects.filter(pk=instance.deliverable_id).update(
+            latest_asset=remaining.order_by('-version').first(),
+            version_count=remaining.count(),
+            updated_at=timezone.now(),
+        )
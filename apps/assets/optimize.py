@@ -0,0 +1,127 @@
+"""
+Ingest-time image optimization for the assets app.
+
+Uploaded images are re-encoded according to a policy chosen by the
+deliverable template category:
+
+- screen/social: bounded-loss JPEG/WebP, capped at the template's
+  target resolution (the LED wall can't show more pixels anyway)
+- print/other: lossless only, never resized
+
+PNG and TIFF are always recompressed losslessly (screen/social TIFFs are
+converted to PNG so browsers can display them).
+
+Metadata (EXIF, text chunks) is stripped, ICC profiles are kept.
+The original upload is archived by Asset.save(), so nothing is lost.
+"""
+
+import os
+from io import BytesIO
+
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+# quality: None = lossless only, otherwise JPEG/WebP quality (bounded loss)
+# max_dimension: fallback cap when the template has no parsed resolution
+DEFAULT_POLICIES = {
+    'screen': {'quality': 90, 'cap_to_spec': True, 'max_dimension': 3840},
+    'social': {'quality': 85, 'cap_to_spec': True, 'max_dimension': 2160},
+    'print': {'quality': None, 'cap_to_spec': False, 'max_dimension': None},
+    'other': {'quality': None, 'cap_to_spec': False, 'max_dimension': None},
+}
+
+# Pillow format -> (output format, extension) when re-encoding
+OUTPUT_FORMATS = {
+    'JPEG': ('JPEG', '.jpg'),
+    'PNG': ('PNG', '.png'),
+    'WEBP': ('WEBP', '.webp'),
+    'TIFF': ('TIFF', '.tif'),
+}
+
+
+def get_policy(category):
+    """Return (name, policy) for a DeliverableTemplate.category."""
+    policies = getattr(settings, 'ASSET_IMAGE_POLICIES', DEFAULT_POLICIES)
+    name = category if category in policies else 'other'
+    return name, policies[name]
+
+
+def _target_box(policy, template):
+    """Return the (width, height) box the image must fit in, or None."""
+    if policy['cap_to_spec'] and template and template.spec_width and template.spec_height:
+        return template.spec_width, template.spec_height
+    if policy['max_dimension']:
+        return policy['max_dimension'], policy['max_dimension']
+    return None
+
+
+def optimize_image(f, filename, template=None):
+    """
+    Re-encode an uploaded image according to its template's policy.
+
+    Args:
+        f: Seekable binary file object with the original image
+        filename: Original filename (the extension may change)
+        template: DeliverableTemplate or None
+
+    Returns:
+        (data, new_filename, policy_name), or None when the image is
+        left untouched (unreadable, animated, or re-encoding wouldn't
+        save anything).
+    """
+    policy_name, policy = get_policy(template.category if template else 'other')
+    lossless = policy['quality'] is None
+
+    try:
+        f.seek(0)
+        img = Image.open(f)
+        source_format = img.format
+        if source_format not in OUTPUT_FORMATS or getattr(img, 'is_animated', False):
+            return None
+        if lossless and source_format == 'JPEG':
+            # Re-encoding a JPEG is never lossless
+            return None
+
+        box = _target_box(policy, template)
+        resized = box is not None and (img.width > box[0] or img.height > box[1])
+        if resized and source_format == 'JPEG':
+            # Let the JPEG decoder downscale by a power of two first
+            img.draft('RGB', box)
+
+        icc_profile = img.info.get('icc_profile')
+        img = ImageOps.exif_transpose(img)
+        if resized:
+            img.thumbnail(box, Image.Resampling.LANCZOS)
+
+        output_format, ext = OUTPUT_FORMATS[source_format]
+        if output_format == 'TIFF' and not lossless:
+            # Screen/social TIFFs become browser-viewable lossless PNGs
+            output_format, ext = OUTPUT_FORMATS['PNG']
+        options = {'icc_profile': icc_profile} if icc_profile else {}
+        if output_format == 'JPEG':
+            if img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            options.update(quality=policy['quality'], optimize=True, progressive=True)
+        elif output_format == 'WEBP' and lossless:
+            options.update(lossless=True, method=6)
+        elif output_format == 'WEBP':
+            options.update(quality=policy['quality'], method=6)
+        elif output_format == 'PNG':
+            options.update(optimize=True)
+        elif output_format == 'TIFF':
+            options.update(compression='tiff_lzw')
+
+        out = BytesIO()
+        img.save(out, output_format, **options)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return None
+    finally:
+        f.seek(0)
+
+    original_size = f.size if hasattr(f, 'size') else None
+    if not resized and original_size is not None and out.tell() >= original_size:
+        return None
+
+    new_filename = os.path.splitext(filename)[0] + ext
+    return out.getvalue(), new_filename, policy_name
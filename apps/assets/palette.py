@@ -0,0 +1,125 @@
+"""
+Dominant colour extraction and theme conformance for image assets.
+
+- extract_palette(): k-means over a downsampled pixel array (NumPy,
+  fully vectorized), returning the dominant colours and their share
+- theme_score(): how close a palette is to a theme's primary/accent
+  colours, as a 0-100 score based on CIE76 Delta E in Lab space
+
+Extraction runs in the background job queue (see jobs.py), never on a
+request; the result is stored on Asset.palette.
+"""
+
+import numpy as np
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+
+PALETTE_SIZE = 5        # Number of k-means clusters
+SAMPLE_SIZE = 96        # Longest side of the pixel sample
+KMEANS_ITERATIONS = 20
+
+# Delta E at which a theme colour counts as completely missing
+MAX_DELTA_E = 60
+
+
+def _kmeans(pixels, k, iterations, seed=0):
+    """
+    Plain k-means with k-means++ seeding.
+
+    Args:
+        pixels: (n, 3) float array
+
+    Returns:
+        (centres, counts) sorted by cluster size, empty clusters dropped.
+    """
+    rng = np.random.default_rng(seed)
+    centres = [pixels[rng.integers(len(pixels))]]
+    for _ in range(1, k):
+        d2 = ((pixels[:, None, :] - np.array(centres)[None]) ** 2).sum(axis=2).min(axis=1)
+        if not d2.sum():
+            break  # Fewer distinct colours than clusters
+        centres.append(pixels[rng.choice(len(pixels), p=d2 / d2.sum())])
+    centres = np.array(centres)
+
+    for _ in range(iterations):
+        labels = ((pixels[:, None, :] - centres[None]) ** 2).sum(axis=2).argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centres))
+        sums = np.stack([np.bincount(labels, weights=pixels[:, c], minlength=len(centres)) for c in range(3)], axis=1)
+        updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centres)
+        if np.allclose(updated, centres):
+            break
+        centres = updated
+
+    labels = ((pixels[:, None, :] - centres[None]) ** 2).sum(axis=2).argmin(axis=1)
+    counts = np.bincount(labels, minlength=len(centres))
+    order = np.argsort(-counts)
+    order = order[counts[order] > 0]
+    return centres[order], counts[order]
+
+
+def extract_palette(f, k=PALETTE_SIZE):
+    """
+    Find the dominant colours of an image file object.
+
+    Returns:
+        [{'color': '#rrggbb', 'share': 0.42}, ...] largest first, or []
+        if the file can't be decoded.
+    """
+    try:
+        f.seek(0)
+        with Image.open(f) as img:
+            img.draft('RGB', (SAMPLE_SIZE * 2, SAMPLE_SIZE * 2))
+            img = ImageOps.exif_transpose(img).convert('RGB')
+            img.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.Resampling.BILINEAR)
+            pixels = np.asarray(img, dtype=np.float64).reshape(-1, 3)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return []
+    finally:
+        f.seek(0)
+
+    centres, counts = _kmeans(pixels, k, KMEANS_ITERATIONS)
+    total = counts.sum()
+    return [
+        {'color': '#{:02x}{:02x}{:02x}'.format(*np.clip(np.rint(centre), 0, 255).astype(int)), 'share': round(float(count / total), 3)}
+        for centre, count in zip(centres, counts)
+    ]
+
+
+def _hex_to_rgb(value):
+    value = value.lstrip('#')
+    if len(value) == 3:
+        value = ''.join(c * 2 for c in value)
+    return [int(value[i:i + 2], 16) for i in (0, 2, 4)]
+
+
+def _to_lab(rgb):
+    """sRGB (n, 3) 0-255 -> CIE Lab (D65)."""
+    c = np.asarray(rgb, dtype=np.float64) / 255
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = c @ np.array([
+        [0.4124, 0.3576, 0.1805],
+        [0.2126, 0.7152, 0.0722],
+        [0.0193, 0.1192, 0.9505],
+    ]).T / np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])], axis=1)
+
+
+def theme_score(palette, theme_colors):
+    """
+    Score how well a palette carries the theme colours (0-100).
+
+    For each theme colour the closest palette colour is found; 100 means
+    every theme colour appears exactly, 0 means none is within
+    MAX_DELTA_E. Returns None when there is nothing to compare.
+    """
+    theme_colors = [c for c in theme_colors if c]
+    if not palette or not theme_colors:
+        return None
+    try:
+        theme_lab = _to_lab([_hex_to_rgb(c) for c in theme_colors])
+    except ValueError:
+        return None
+    palette_lab = _to_lab([_hex_to_rgb(entry['color']) for entry in palette])
+    delta_e = np.sqrt(((theme_lab[:, None, :] - palette_lab[None]) ** 2).sum(axis=2)).min(axis=1)
+    return round(float(np.clip(1 - delta_e / MAX_DELTA_E, 0, 1).mean()) * 100)
@@ -0,0 +1,234 @@
+"""
+Perceptual hashing and near-duplicate search for image assets.
+
+- perceptual_hash(): 64-bit pHash (DCT of a 32x32 grayscale thumbnail,
+  computed with NumPy) stored on Asset.perceptual_hash at ingest
+- HashIndex: in-memory multi-index hash table answering "all hashes
+  within Hamming distance r" without comparing against every asset
+
+The index is built lazily from the stored column on first use (once per
+worker process) and then kept current incrementally.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+
+HASH_SIZE = 8        # 8x8 low-frequency DCT block -> 64-bit hash
+SAMPLE_SIZE = 32     # Grayscale thumbnail size fed to the DCT
+
+# Multi-index hashing: the 64-bit hash is split into CHUNKS substrings.
+# If two hashes differ in <= r bits, at least one chunk differs in
+# <= r // CHUNKS bits (pigeonhole), so only those buckets are probed.
+CHUNKS = 4
+CHUNK_BITS = 64 // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+DEFAULT_MAX_DISTANCE = 10
+
+# How far back each index catch-up re-reads updated hashes (get_index)
+SYNC_OVERLAP = timedelta(minutes=1)
+
+
+# =============================================================================
+# Hashing
+# =============================================================================
+
+@lru_cache(maxsize=1)
+def _dct_matrix(n):
+    """Orthonormal DCT-II matrix, so dct2(x) = D @ x @ D.T."""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+def to_signed(value):
+    """Map an unsigned 64-bit hash to the signed range of a BigIntegerField."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def to_unsigned(value):
+    """Inverse of to_signed()."""
+    return value + (1 << 64) if value < 0 else value
+
+
+def perceptual_hash(f):
+    """
+    Compute the pHash of an image file object.
+
+    Returns:
+        Signed 64-bit int (ready for Asset.perceptual_hash), or None
+        if the file can't be decoded.
+    """
+    try:
+        f.seek(0)
+        with Image.open(f) as img:
+            # JPEG decoder can downscale during decode - much faster on big files
+            img.draft('L', (SAMPLE_SIZE * 4, SAMPLE_SIZE * 4))
+            gray = img.convert('L').resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.Resampling.LANCZOS)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return None
+    finally:
+        f.seek(0)
+
+    pixels = np.asarray(gray, dtype=np.float64)
+    dct = _dct_matrix(SAMPLE_SIZE)
+    coefficients = (dct @ pixels @ dct.T)[:HASH_SIZE, :HASH_SIZE].flatten()
+    # Median excludes the DC term, which only encodes overall brightness
+    bits = coefficients > np.median(coefficients[1:])
+    value = int(np.packbits(bits).view('>u8')[0])
+    return to_signed(value)
+
+
+def hamming(a, b):
+    """Hamming distance between two stored (signed) hashes."""
+    return (to_unsigned(a) ^ to_unsigned(b)).bit_count()
+
+
+# =============================================================================
+# Multi-index hash table
+# =============================================================================
+
+@lru_cache(maxsize=None)
+def _flip_masks(max_bits):
+    """All CHUNK_BITS-wide masks with at most max_bits bits set."""
+    masks = [0]
+    for count in range(1, max_bits + 1):
+        for positions in combinations(range(CHUNK_BITS), count):
+            masks.append(sum(1 << p for p in positions))
+    return masks
+
+
+class HashIndex:
+    """
+    In-memory index of asset hashes for Hamming-radius queries.
+
+    Each hash is stored in CHUNKS tables keyed by one 16-bit substring.
+    A query probes every bucket within r // CHUNKS bits of each of its
+    substrings and verifies the candidates, which stays in the
+    milliseconds for 100k+ hashes and radius <= 11.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = [defaultdict(set) for _ in range(CHUNKS)]
+        self._hashes = {}   # asset id -> unsigned hash
+        self.loaded = False
+        self.synced_at = None  # Hashes updated since then are re-read
+
+    def __len__(self):
+        return len(self._hashes)
+
+    @staticmethod
+    def _chunks(value):
+        return [(value >> (i * CHUNK_BITS)) & CHUNK_MASK for i in range(CHUNKS)]
+
+    def add(self, asset_id, stored_hash):
+        value = to_unsigned(stored_hash)
+        with self._lock:
+            self._remove(asset_id)
+            self._hashes[asset_id] = value
+            for table, chunk in zip(self._tables, self._chunks(value)):
+                table[chunk].add(asset_id)
+
+    def remove(self, asset_id):
+        with self._lock:
+            self._remove(asset_id)
+
+    def _remove(self, asset_id):
+        value = self._hashes.pop(asset_id, None)
+        if value is None:
+            return
+        for table, chunk in zip(self._tables, self._chunks(value)):
+            table[chunk].discard(asset_id)
+
+    def query(self, stored_hash, max_distance=DEFAULT_MAX_DISTANCE):
+        """Return [(distance, asset_id)] within max_distance, closest first."""
+        value = to_unsigned(stored_hash)
+        masks = _flip_masks(max_distance // CHUNKS)
+
+        with self._lock:
+            candidates = set()
+            for table, chunk in zip(self._tables, self._chunks(value)):
+                for mask in masks:
+                    bucket = table.get(chunk ^ mask)
+                    if bucket:
+                        candidates.update(bucket)
+            matches = []
+            for asset_id in candidates:
+                distance = (self._hashes[asset_id] ^ value).bit_count()
+                if distance <= max_distance:
+                    matches.append((distance, asset_id))
+        matches.sort()
+        return matches
+
+
+# Process-wide index, filled from Asset.perceptual_hash on first use
+index = HashIndex()
+_load_lock = threading.Lock()
+
+
+def get_index():
+    """
+    Return the process index, catching up with assets changed elsewhere.
+
+    First call loads every stored hash; later calls only read rows whose
+    hash was written since the last call: uploads handled by other workers
+    and compute_perceptual_hashes on older assets both stamp
+    perceptual_hash_updated_at. Primary keys are not used for this, as
+    sequence values don't arrive in commit order. Deleted assets are
+    dropped when results are fetched (find_similar).
+    """
+    from .models import Asset
+
+    with _load_lock:
+        # Overlap the previous read, so hashes committed by transactions
+        # that were still open then are not missed
+        started = timezone.now() - SYNC_OVERLAP
+        rows = Asset.objects.filter(perceptual_hash__isnull=False)
+        if index.loaded:
+            rows = rows.filter(perceptual_hash_updated_at__gte=index.synced_at)
+        for asset_id, stored_hash in rows.order_by().values_list('pk', 'perceptual_hash').iterator(chunk_size=5000):
+            index.add(asset_id, stored_hash)
+        index.synced_at = started
+        index.loaded = True
+    return index
+
+
+def find_similar(stored_hash, max_distance=DEFAULT_MAX_DISTANCE, exclude=None, limit=20):
+    """
+    Return [(distance, Asset)] for assets within max_distance of a hash.
+
+    Args:
+        stored_hash: Signed hash as stored on Asset.perceptual_hash
+        max_distance: Hamming distance cutoff (0 = identical hash)
+        exclude: Asset id to leave out (usually the asset being compared)
+        limit: Maximum number of results, closest first
+    """
+    from .models import Asset
+
+    current = get_index()
+    matches = [
+        (distance, asset_id)
+        for distance, asset_id in current.query(stored_hash, max_distance)
+        if asset_id != exclude
+    ]
+    assets = Asset.objects.select_related(
+        'deliverable__event', 'deliverable__template'
+    ).in_bulk([asset_id for _, asset_id in matches])
+
+    # Deleted by another process: only that process's index dropped them
+    for _, asset_id in matches:
+        if asset_id not in assets:
+            current.remove(asset_id)
+
+    return [(distance, assets[asset_id]) for distance, asset_id in matches if asset_id in assets][:limit]
@@ -1,3 +1,370 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from apps.accounts.models import User
+from apps.planning.models import DeliverableTemplate, Event, EventDeliverable
+from . import similarity
+from .media import extract_metadata
+from .models import Asset, StorageUsage
+from .optimize import optimize_image
+from .uploads import StorageQuotaExceeded, bulk_upload
+
+
+def png_upload(name='poster.png', size=(256, 256)):
+    """
+    A noisy PNG. Under the 'other' template category it is re-encoded as
+    a lossless PNG, about 10% smaller, so optimization keeps the upload
+    as the archived original.
+    """
+    image = Image.effect_noise(size, 16).convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+def image_upload(name, image_format, size=(1200, 900), **options):
+    """A noisy photo-like image in any Pillow format."""
+    image = Image.effect_noise(size, 32).convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+class AssetTestCase(TestCase):
+    """Media in a temporary MEDIA_ROOT, and a deliverable to upload to."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+        self.user = User.objects.create_user('designer', password='pw')
+        event = Event.objects.create(name='Launch', date=date(2026, 11, 20))
+        template = DeliverableTemplate.objects.create(name='Poster')
+        self.deliverable = EventDeliverable.objects.create(event=event, template=template)
+
+    def upload(self, content=b'x' * 100, name='brief.txt'):
+        return Asset.objects.create(
+            file=ContentFile(content, name=name),
+            deliverable=self.deliverable,
+            uploaded_by=self.user,
+        )
+
+
+class VersioningTests(AssetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = EventDeliverable.objects.create(
+            event=self.deliverable.event, template=DeliverableTemplate.objects.create(name='Flyer')
+        )
+
+    def batch(self, *deliverables):
+        uploads = [(deliverable, SimpleUploadedFile('brief.txt', b'x' * 100)) for deliverable in deliverables]
+        return bulk_upload(uploads, uploaded_by=self.user)
+
+    def test_versions_consecutive_across_single_and_batch_uploads(self):
+        self.upload()
+        self.upload()
+        self.batch(self.deliverable, self.deliverable)
+        self.upload()
+
+        versions = Asset.objects.filter(deliverable=self.deliverable).order_by('pk').values_list('version', flat=True)
+        self.assertEqual(list(versions), [1, 2, 3, 4, 5])
+
+    def test_batch_over_two_deliverables_updates_pointers(self):
+        self.upload()
+
+        first, second, third = self.batch(self.deliverable, self.other, self.deliverable)
+
+        self.deliverable.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((first.version, second.version, third.version), (2, 1, 3))
+        self.assertEqual((self.deliverable.latest_asset_id, self.deliverable.version_count), (third.pk, 3))
+        self.assertEqual((self.other.latest_asset_id, self.other.version_count), (second.pk, 1))
+
+    def test_deleting_latest_version_repoints_deliverable(self):
+        first, second, third = self.upload(), self.upload(), self.upload()
+
+        third.delete()
+        self.deliverable.refresh_from_db()
+        self.assertEqual((self.deliverable.latest_asset_id, self.deliverable.version_count), (second.pk, 2))
+
+        first.delete()
+        second.delete()
+        self.deliverable.refresh_from_db()
+        self.assertEqual((self.deliverable.latest_asset_id, self.deliverable.version_count), (None, 0))
+
+    def test_batch_starts_only_todo_deliverables(self):
+        EventDeliverable.objects.filter(pk=self.other.pk).update(status=EventDeliverable.Status.REVIEW)
+
+        self.batch(self.deliverable, self.other)
+
+        self.deliverable.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.deliverable.status, EventDeliverable.Status.IN_PROGRESS)
+        self.assertEqual(self.other.status, EventDeliverable.Status.REVIEW)
+
+
+class StorageUsageTests(AssetTestCase):
+
+    def test_delete_asset_older_than_counters(self):
+        old = self.upload(b'x' * 5000)
+        StorageUsage.objects.all().delete()  # Counters created after the upload
+        self.upload(b'x' * 100)
+
+        old.delete()
+
+        # Drifted, but clamped instead of violating the non-negative constraints
+        total = StorageUsage.total()
+        self.assertGreaterEqual(total.file_count, 0)
+        self.assertGreaterEqual(total.total_bytes, 0)
+
+        call_command('rebuild_storage_usage', stdout=io.StringIO())
+
+        total = StorageUsage.total()
+        self.assertEqual(total.file_count, 1)
+        self.assertEqual(total.total_bytes, 100)
+
+    def test_counters_created_once(self):
+        self.upload()
+        self.upload()
+
+        self.assertEqual(StorageUsage.objects.filter(scope=StorageUsage.Scope.TOTAL).count(), 1)
+        self.assertEqual(StorageUsage.total().file_count, 2)
+        self.assertEqual(StorageUsage.total().total_bytes, 200)
+
+    @override_settings(ASSET_IMAGE_OPTIMIZATION=True)
+    def test_quota_counts_archived_original(self):
+        upload = png_upload()
+        [asset] = bulk_upload([(self.deliverable, upload)], uploaded_by=self.user)
+        self.assertTrue(asset.original_file)
+        self.assertEqual(StorageUsage.total().total_bytes, upload.size + asset.file_size)
+
+        # Room for the upload alone, not for the upload plus its optimized copy
+        StorageUsage.objects.filter(scope=StorageUsage.Scope.TOTAL).update(total_bytes=0)
+        quota_mb = (upload.size + asset.file_size // 2) / (1024 * 1024)
+        with override_settings(STORAGE_QUOTA_MB=quota_mb):
+            with self.assertRaises(StorageQuotaExceeded):
+                bulk_upload([(self.deliverable, png_upload())], uploaded_by=self.user)
+        self.assertEqual(Asset.objects.count(), 1)
+
+
+class OptimizeImageTests(SimpleTestCase):
+
+    def template(self, category, spec=(None, None)):
+        return DeliverableTemplate(name='Spec', category=category, spec_width=spec[0], spec_height=spec[1])
+
+    def optimize(self, upload, template):
+        return optimize_image(upload, upload.name, template)
+
+    def test_lossless_policies_never_reencode_jpeg(self):
+        for category in ('print', 'other'):
+            with self.subTest(category=category):
+                upload = image_upload('poster.jpg', 'JPEG', quality=100)
+                self.assertIsNone(self.optimize(upload, self.template(category)))
+        self.assertIsNone(self.optimize(image_upload('poster.jpg', 'JPEG', quality=100), None))
+
+    def test_screen_resizes_to_spec_box(self):
+        upload = image_upload('wall.jpg', 'JPEG', quality=95)
+
+        data, filename, policy = self.optimize(upload, self.template('screen', spec=(400, 400)))
+
+        self.assertEqual((filename, policy), ('wall.jpg', 'screen'))
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual((image.format, image.size), ('JPEG', (400, 300)))
+
+    def test_print_never_resizes(self):
+        upload = image_upload('flyer.png', 'PNG')
+
+        data, filename, policy = self.optimize(upload, self.template('print', spec=(400, 400)))
+
+        self.assertEqual((filename, policy), ('flyer.png', 'print'))
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual((image.format, image.size), ('PNG', (1200, 900)))
+
+    def test_tiff_becomes_png_for_screen_only(self):
+        screen = self.optimize(image_upload('wall.tif', 'TIFF'), self.template('screen'))
+        self.assertEqual(screen[1], 'wall.png')
+        with Image.open(io.BytesIO(screen[0])) as image:
+            self.assertEqual(image.format, 'PNG')
+
+        printed = self.optimize(image_upload('flyer.tif', 'TIFF'), self.template('print'))
+        self.assertEqual(printed[1], 'flyer.tif')
+
+    def test_no_savings_returns_none(self):
+        # Already saved the way it would be re-encoded: same bytes, nothing saved
+        upload = image_upload('flyer.png', 'PNG', size=(64, 64), optimize=True)
+        self.assertIsNone(self.optimize(upload, self.template('print')))
+
+
+@override_settings(ASSET_IMAGE_OPTIMIZATION=True)
+class IngestOptimizationTests(AssetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        DeliverableTemplate.objects.filter(pk=self.deliverable.template_id).update(
+            category=DeliverableTemplate.Category.SCREEN, spec_width=400, spec_height=400
+        )
+        self.deliverable.refresh_from_db()
+
+    def test_original_archived_and_savings_recorded(self):
+        upload = image_upload('wall.png', 'PNG')
+
+        asset = Asset.objects.create(file=upload, deliverable=self.deliverable, uploaded_by=self.user)
+
+        self.assertEqual(asset.optimization_policy, 'screen')
+        self.assertTrue(asset.file.name.endswith('.png'))
+        self.assertEqual((asset.width, asset.height), (400, 300))
+        self.assertTrue(asset.original_file.name.startswith('originals/'))
+        self.assertEqual(asset.original_file.size, upload.size)
+        self.assertEqual(asset.original_file_size, upload.size)
+        self.assertEqual(asset.bytes_saved, upload.size - asset.file_size)
+        self.assertGreater(asset.bytes_saved, 0)
+
+    @override_settings(ASSET_IMAGE_OPTIMIZATION=False)
+    def test_disabled_by_setting(self):
+        upload = image_upload('wall.png', 'PNG')
+
+        asset = Asset.objects.create(file=upload, deliverable=self.deliverable, uploaded_by=self.user)
+
+        self.assertFalse(asset.original_file)
+        self.assertEqual(asset.file_size, upload.size)
+        self.assertEqual(asset.bytes_saved, 0)
+
+
+class SimilarityIndexTests(AssetTestCase):
+
+    def test_index_picks_up_backfilled_hashes(self):
+        older = Asset.objects.create(file=png_upload(), deliverable=self.deliverable, uploaded_by=self.user)
+        Asset.objects.filter(pk=older.pk).update(perceptual_hash=None)  # Uploaded before hashing existed
+        newer = Asset.objects.create(file=png_upload(), deliverable=self.deliverable, uploaded_by=self.user)
+
+        with mock.patch.object(similarity, 'index', similarity.HashIndex()):
+            index = similarity.get_index()
+            self.assertEqual(set(index._hashes), {newer.pk})
+
+            call_command('compute_perceptual_hashes', stdout=io.StringIO())
+
+            self.assertEqual(set(similarity.get_index()._hashes), {older.pk, newer.pk})
+
+    def test_index_picks_up_uploads_committed_out_of_pk_order(self):
+        with mock.patch.object(similarity, 'index', similarity.HashIndex()):
+            late = Asset.objects.create(file=png_upload(), deliverable=self.deliverable, uploaded_by=self.user)
+            early = Asset.objects.create(file=png_upload(), deliverable=self.deliverable, uploaded_by=self.user)
+            # The lower pk commits after the higher one has been indexed
+            Asset.objects.filter(pk=late.pk).update(perceptual_hash=None)
+            self.assertEqual(set(similarity.get_index()._hashes), {early.pk})
+            Asset.objects.filter(pk=late.pk).update(perceptual_hash=late.perceptual_hash)
+
+            self.assertEqual(set(similarity.get_index()._hashes), {late.pk, early.pk})
+
+    def test_find_similar_drops_assets_deleted_elsewhere(self):
+        upload = png_upload()
+        assets = [
+            Asset.objects.create(file=upload, deliverable=self.deliverable, uploaded_by=self.user)
+            for _ in range(3)
+        ]
+        stored_hash = assets[0].perceptual_hash
+
+        with mock.patch.object(similarity, 'index', similarity.HashIndex()):
+            similarity.get_index()
+            # Deleted by another worker: this process's index still has it
+            Asset.objects.filter(pk=assets[0].pk).delete()
+
+            matches = similarity.find_similar(stored_hash, max_distance=0, limit=2)
+
+            self.assertEqual([asset.pk for _, asset in matches], [assets[1].pk, assets[2].pk])
+            self.assertNotIn(assets[0].pk, similarity.index._hashes)
+
+
+class ExtractMetadataTests(SimpleTestCase):
+
+    def test_decompression_bomb_has_no_metadata(self):
+        upload = png_upload(size=(64, 64))
+        # Over twice the limit, so Image.open raises DecompressionBombError
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            self.assertEqual(extract_metadata(upload, 'image'), {})
+        self.assertEqual(extract_metadata(upload, 'image')['width'], 64)
+
+
+class GcOrphanedMediaTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+        self.state_file = os.path.join(self.media_root, 'state', 'gc.json')
+
+        self.orphans = []
+        for event_dir in ('event_1', 'event_2', 'event_3'):
+            path = os.path.join(self.media_root, 'assets', '2026', event_dir, 'poster.png')
+            os.makedirs(os.path.dirname(path))
+            with open(path, 'wb') as f:
+                f.write(b'x')
+            self.orphans.append(path)
+
+    def gc(self, **options):
+        call_command(
+            'gc_orphaned_media', min_age_hours=0, batch_size=1,
+            state_file=self.state_file, stdout=io.StringIO(), **options
+        )
+
+    def test_dry_run_keeps_checkpoint(self):
+        os.makedirs(os.path.dirname(self.state_file))
+        checkpoint = {
+            'last_dir': 'assets/2026/event_1',
+            'stats': {'scanned': 1, 'orphans': 1, 'bytes': 1, 'skipped_recent': 0},
+        }
+        with open(self.state_file, 'w') as f:
+            json.dump(checkpoint, f)
+
+        self.gc(dry_run=True)
+
+        with open(self.state_file) as f:
+            self.assertEqual(json.load(f), checkpoint)
+        self.assertTrue(all(os.path.exists(path) for path in self.orphans))
+
+    def test_derivatives_of_deleted_assets(self):
+        asset = Asset.objects.create(file=ContentFile(b'x', name='brief.txt'))
+        deleted_id = asset.pk + 1
+        names = {
+            'kept': [f'derivatives/pdf/150/{asset.pk}.jpg', 'derivatives/other/notes.txt'],
+            'orphaned': [
+                f'derivatives/pdf/150/{deleted_id}.jpg',
+                f'derivatives/diffs/{asset.pk}_{deleted_id}.png',
+                f'derivatives/diffs/{asset.pk}_{deleted_id}.json',
+            ],
+        }
+        for name in names['kept'] + names['orphaned']:
+            path = os.path.join(self.media_root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(b'x')
+
+        self.gc()
+
+        def exists(name):
+            return os.path.exists(os.path.join(self.media_root, name))
+        self.assertTrue(all(exists(name) for name in names['kept']))
+        self.assertFalse(any(exists(name) for name in names['orphaned']))
+        self.assertFalse(any(os.path.exists(path) for path in self.orphans))
+
+    def test_dry_run_time_slice_writes_no_checkpoint(self):
+        self.gc(dry_run=True, max_seconds=0.000001)
+        self.assertFalse(os.path.exists(self.state_file))
+
+        self.gc(resume=True)
+
+        self.assertFalse(any(os.path.exists(path) for path in self.orphans))
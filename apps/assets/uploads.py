@@ -0,0 +1,116 @@
+"""
+Batch asset uploads.
+
+Creates many Asset rows in one transaction: files are streamed to
+storage one by one, then all rows are inserted with a single
+bulk_create and the deliverables are updated with set-based UPDATEs.
+Asset.save() does the same bookkeeping for single uploads.
+
+If the transaction fails, files already written to storage are left
+for gc_orphaned_media to collect.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, Max, Value, When
+from django.utils import timezone
+
+from apps.jobs.models import Job
+from apps.planning.models import EventDeliverable
+from .models import Asset, StorageUsage
+
+
+class StorageQuotaExceeded(Exception):
+    """The uploads would take the stored assets over STORAGE_QUOTA_MB."""
+
+
+def _commit_files(asset):
+    """Write uncommitted file fields to storage (what Model.save's pre_save does)."""
+    for field_file in (asset.file, asset.original_file):
+        if field_file and not field_file._committed:
+            field_file.save(field_file.name, field_file.file, save=False)
+
+
+def bulk_upload(uploads, uploaded_by, notes=''):
+    """
+    Create assets for many (deliverable, uploaded_file) pairs at once.
+
+    Args:
+        uploads: List of (EventDeliverable, UploadedFile) tuples
+        uploaded_by: User uploading the files
+        notes: Notes applied to every asset
+
+    Returns:
+        List of created Asset objects, in upload order.
+
+    Raises:
+        StorageQuotaExceeded: if the files, once processed, don't fit in
+            the storage quota. Nothing is written then.
+    """
+    assets = []
+    for deliverable, uploaded_file in uploads:
+        asset = Asset(
+            file=uploaded_file,
+            deliverable=deliverable,
+            uploaded_by=uploaded_by,
+            notes=notes,
+        )
+        asset.prepare_file()
+        assets.append(asset)
+
+    # Checked on what will be stored: optimized images keep their original too
+    if StorageUsage.would_exceed_quota(sum(asset.stored_bytes for asset in assets)):
+        raise StorageQuotaExceeded
+
+    for asset in assets:
+        _commit_files(asset)
+
+    deliverable_ids = {asset.deliverable_id for asset in assets}
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Lock the deliverables while version numbers are assigned
+        list(
+            EventDeliverable.objects.filter(pk__in=deliverable_ids)
+            .select_for_update().order_by().values_list('pk', flat=True)
+        )
+        last_versions = dict(
+            Asset.objects.filter(deliverable_id__in=deliverable_ids)
+            .order_by().values('deliverable_id')
+            .annotate(last=Max('version')).values_list('deliverable_id', 'last')
+        )
+        for asset in assets:
+            last_versions[asset.deliverable_id] = last_versions.get(asset.deliverable_id, 0) + 1
+            asset.version = last_versions[asset.deliverable_id]
+            if asset.perceptual_hash is not None:
+                # Stamped at insert, not when prepared: workers' indexes
+                # catch up by this time (similarity.get_index)
+                asset.perceptual_hash_updated_at = now
+
+        Asset.objects.bulk_create(assets)
+
+        latest = {asset.deliverable_id: asset.pk for asset in assets}
+        added = Counter(asset.deliverable_id for asset in assets)
+        EventDeliverable.objects.filter(pk__in=deliverable_ids).update(
+            latest_asset_id=Case(*[When(pk=pk, then=Value(asset_pk)) for pk, asset_pk in latest.items()]),
+            version_count=F('version_count') + Case(
+                *[When(pk=pk, then=Value(count)) for pk, count in added.items()],
+                default=Value(0),
+            ),
+            updated_at=now,
+        )
+
+        # TODO -> IN_PROGRESS for every touched deliverable, in one UPDATE
+        EventDeliverable.objects.filter(
+            pk__in=deliverable_ids,
+            status=EventDeliverable.Status.TODO,
+        ).update(status=EventDeliverable.Status.IN_PROGRESS, updated_at=now)
+
+        StorageUsage.track_many(assets, +1)
+
+        Job.enqueue_many('assets.extract_palette', [
+            {'asset_id': asset.pk} for asset in assets if asset.file_type == Asset.FileType.IMAGE
+        ])
+
+    return assets
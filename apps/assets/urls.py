@@ -1,7 +1,8 @@
 """
 URL configuration for assets app.
 
-Handles asset listing and uploads.
+Handles asset listing, uploads, bundle downloads, similarity search
+and version diffs.
 """
 
 from django.urls import path
@@ -12,6 +13,12 @@ app_name = 'assets'
 
 urlpatterns = [
     path('', views.asset_list, name='asset_list'),
+    path('storage/', views.storage_dashboard, name='storage'),
     path('upload/<int:deliverable_id>/', views.upload_asset, name='upload_asset'),
+    path('upload/batch/', views.upload_batch, name='upload_batch'),
+    path('events/<int:event_id>/bundle/', views.download_event_bundle, name='download_event_bundle'),
+    path('<int:pk>/similar/', views.similar_assets, name='similar_assets'),
+    path('api/similar/', views.similar_assets_api, name='similar_assets_api'),
+    path('<int:pk>/diff/', views.asset_diff, name='asset_diff'),
 ]
 
@@ -1,17 +1,25 @@
 """
 Views for the assets app.
 
-Handles asset listing and file uploads for deliverables.
+Handles asset listing, file uploads for deliverables, bundle downloads,
+near-duplicate search and version diffs.
 """
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.http import require_POST
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.http import require_GET, require_POST
 
-from apps.planning.models import EventDeliverable
-from .models import Asset
+from apps.accounts.models import User
+from apps.core import metrics
+from apps.planning.models import Event, EventDeliverable
+from .bundles import iter_zip
+from .diff import DiffError, version_diff
+from .models import Asset, StorageUsage
+from .similarity import DEFAULT_MAX_DISTANCE, find_similar, to_signed
+from .uploads import StorageQuotaExceeded, bulk_upload
 
 
 @login_required
@@ -23,14 +31,51 @@ def asset_list(request):
         'deliverable__event', 'deliverable__template', 'uploaded_by'
     ).order_by('-created_at')[:50]  # Last 50 assets
     
+    usage = StorageUsage.total()
+    
     context = {
         'page_title': 'Assets',
-        'page_subtitle': f'{Asset.objects.count()} files uploaded',
+        'page_subtitle': f'{usage.file_count} files uploaded • {filesizeformat(usage.total_bytes)}',
         'assets': assets,
     }
     return render(request, 'assets/asset_list.html', context)
 
 
+@login_required
+def storage_dashboard(request):
+    """
+    Disk usage overview by year, file type, event and user.
+    
+    Reads the StorageUsage counters only - no aggregation over Asset.
+    """
+    usage = StorageUsage.total()
+    quota = StorageUsage.quota_bytes()
+    rows = StorageUsage.objects.exclude(scope=StorageUsage.Scope.TOTAL).filter(file_count__gt=0)
+    
+    top_events = list(rows.filter(scope=StorageUsage.Scope.EVENT)[:20])
+    event_names = Event.objects.in_bulk([int(row.key) for row in top_events])
+    for row in top_events:
+        row.label = event_names.get(int(row.key), f'Deleted event #{row.key}')
+    
+    top_users = list(rows.filter(scope=StorageUsage.Scope.USER)[:20])
+    users = User.objects.in_bulk([int(row.key) for row in top_users if row.key])
+    for row in top_users:
+        row.label = users[int(row.key)].display_name if row.key and int(row.key) in users else 'Unknown'
+    
+    context = {
+        'page_title': 'Storage',
+        'page_subtitle': f'{filesizeformat(usage.total_bytes)} of {filesizeformat(quota)} used',
+        'usage': usage,
+        'quota': quota,
+        'quota_percent': min(100, round(usage.total_bytes * 100 / quota)) if quota else 0,
+        'by_year': rows.filter(scope=StorageUsage.Scope.YEAR).order_by('-key'),
+        'by_type': rows.filter(scope=StorageUsage.Scope.FILE_TYPE),
+        'top_events': top_events,
+        'top_users': top_users,
+    }
+    return render(request, 'assets/storage.html', context)
+
+
 @login_required
 @require_POST
 def upload_asset(request, deliverable_id):
@@ -47,18 +92,18 @@ def upload_asset(request, deliverable_id):
     
     uploaded_file = request.FILES['file']
     
-    # Create asset
-    asset = Asset.objects.create(
-        file=uploaded_file,
-        deliverable=deliverable,
-        uploaded_by=request.user,
-        notes=request.POST.get('notes', '')
-    )
+    # Same path as batch uploads: the quota is checked on the processed file,
+    # the version is assigned and a TODO deliverable moves to in_progress
+    try:
+        [asset] = bulk_upload(
+            [(deliverable, uploaded_file)],
+            uploaded_by=request.user,
+            notes=request.POST.get('notes', ''),
+        )
+    except StorageQuotaExceeded:
+        return JsonResponse({'error': 'Storage quota exceeded'}, status=413)
     
-    # Update deliverable status to in_progress if it was todo
-    if deliverable.status == EventDeliverable.Status.TODO:
-        deliverable.status = EventDeliverable.Status.IN_PROGRESS
-        deliverable.save()
+    metrics.observe_upload(uploaded_file.size)
     
     # If HTMX request, return partial
     if request.headers.get('HX-Request'):
@@ -67,3 +112,215 @@ def upload_asset(request, deliverable_id):
     messages.success(request, f'Asset uploaded: {asset.original_filename}')
     return redirect('planning:event_detail', pk=deliverable.event.pk)
 
+
+@login_required
+@require_POST
+def upload_batch(request):
+    """
+    Upload many files, for one or several deliverables, in one request.
+    
+    Accepts multipart fields:
+        files + deliverable=<id>: several files for one deliverable
+        file_<deliverable_id>: files for that deliverable (repeatable)
+    
+    All Asset rows are inserted with one bulk_create. Returns one combined
+    HTMX fragment, or redirects to the event page.
+    """
+    requested = []  # (deliverable_id, uploaded_file)
+    for field, files in request.FILES.lists():
+        if field == 'files':
+            deliverable_id = request.POST.get('deliverable', '')
+        elif field.startswith('file_'):
+            deliverable_id = field[len('file_'):]
+        else:
+            continue
+        if not deliverable_id.isdigit():
+            return JsonResponse({'error': f'Invalid deliverable for {field}'}, status=400)
+        requested.extend((int(deliverable_id), f) for f in files)
+    
+    if not requested:
+        return JsonResponse({'error': 'No file provided'}, status=400)
+    
+    deliverables = EventDeliverable.objects.select_related('event', 'template').in_bulk(
+        {deliverable_id for deliverable_id, _ in requested}
+    )
+    if len(deliverables) != len({deliverable_id for deliverable_id, _ in requested}):
+        return JsonResponse({'error': 'Deliverable not found'}, status=404)
+    
+    try:
+        assets = bulk_upload(
+            [(deliverables[deliverable_id], f) for deliverable_id, f in requested],
+            uploaded_by=request.user,
+            notes=request.POST.get('notes', ''),
+        )
+    except StorageQuotaExceeded:
+        return JsonResponse({'error': 'Storage quota exceeded'}, status=413)
+    metrics.observe_upload(sum(f.size for _, f in requested), files=len(requested))
+    
+    if request.headers.get('HX-Request'):
+        return render(request, 'assets/_asset_batch.html', {'assets': assets})
+    
+    messages.success(request, f'{len(assets)} asset{"s" if len(assets) != 1 else ""} uploaded')
+    return redirect('planning:event_detail', pk=assets[0].deliverable.event_id)
+
+
+@login_required
+@require_GET
+def download_event_bundle(request, event_id):
+    """
+    Download all assets of an event as a single streamed ZIP.
+
+    Optional query params:
+        deliverable: EventDeliverable id (repeatable) to restrict the bundle
+        approved: '1' to only include approved asset versions
+        type: Asset.FileType value (repeatable), e.g. 'image' or 'video'
+
+    The archive is generated while it is sent, so large bundles start
+    downloading immediately and use constant server memory.
+    """
+    event = get_object_or_404(Event, pk=event_id)
+
+    assets = Asset.objects.filter(
+        deliverable__event=event
+    ).select_related('deliverable__template').order_by(
+        'deliverable__template__name', 'created_at'
+    )
+
+    deliverable_ids = [d for d in request.GET.getlist('deliverable') if d.isdigit()]
+    if deliverable_ids:
+        assets = assets.filter(deliverable_id__in=deliverable_ids)
+
+    if request.GET.get('approved') == '1':
+        assets = assets.filter(is_approved=True)
+
+    file_types = [t for t in request.GET.getlist('type') if t in Asset.FileType.values]
+    if file_types:
+        assets = assets.filter(file_type__in=file_types)
+
+    response = StreamingHttpResponse(
+        iter_zip(assets.iterator(chunk_size=200)),
+        content_type='application/zip'
+    )
+    filename = f"{event.name.replace(' ', '_')}_{event.date}_assets.zip"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+# Upper bound for ?distance= - beyond this nearly every image "matches"
+MAX_SIMILARITY_DISTANCE = 16
+
+
+def _distance_param(request):
+    """Parse ?distance=, clamped to [0, MAX_SIMILARITY_DISTANCE]."""
+    try:
+        distance = int(request.GET.get('distance', DEFAULT_MAX_DISTANCE))
+    except ValueError:
+        distance = DEFAULT_MAX_DISTANCE
+    return max(0, min(distance, MAX_SIMILARITY_DISTANCE))
+
+
+@login_required
+@require_GET
+def similar_assets(request, pk):
+    """
+    Panel listing images that look like this asset (HTMX partial).
+    
+    Optional query params:
+        distance: Max Hamming distance between perceptual hashes (default 10)
+    """
+    asset = get_object_or_404(Asset, pk=pk)
+    
+    matches = []
+    if asset.perceptual_hash is not None:
+        matches = find_similar(asset.perceptual_hash, _distance_param(request), exclude=asset.pk)
+    
+    return render(request, 'assets/_similar_assets.html', {
+        'asset': asset,
+        'matches': matches,
+    })
+
+
+@login_required
+@require_GET
+def similar_assets_api(request):
+    """
+    JSON near-duplicate search.
+    
+    Query params (one of asset/hash is required):
+        asset: Asset id to compare against
+        hash: 16-digit hex perceptual hash
+        distance: Max Hamming distance (default 10)
+        limit: Max results (default 20, max 100)
+    """
+    exclude = None
+    if request.GET.get('asset', '').isdigit():
+        asset = get_object_or_404(Asset, pk=request.GET['asset'])
+        if asset.perceptual_hash is None:
+            return JsonResponse({'error': 'Asset has no perceptual hash'}, status=400)
+        stored_hash, exclude = asset.perceptual_hash, asset.pk
+    else:
+        try:
+            value = int(request.GET.get('hash', ''), 16)
+        except ValueError:
+            return JsonResponse({'error': 'Provide an asset id or a hex hash'}, status=400)
+        if not 0 <= value < (1 << 64):
+            return JsonResponse({'error': 'Hash must be 64 bits'}, status=400)
+        stored_hash = to_signed(value)
+    
+    limit = request.GET.get('limit', '')
+    limit = min(int(limit), 100) if limit.isdigit() else 20
+    
+    matches = find_similar(stored_hash, _distance_param(request), exclude=exclude, limit=limit)
+    return JsonResponse({
+        'results': [
+            {
+                'id': match.pk,
+                'distance': distance,
+                'filename': match.original_filename,
+                'url': match.file.url,
+                'version': match.version,
+                'deliverable': match.deliverable_id,
+                'event': match.deliverable.event_id if match.deliverable else None,
+            }
+            for distance, match in matches
+        ],
+    })
+
+
+@login_required
+@require_GET
+def asset_diff(request, pk):
+    """
+    Show what changed between an image asset and an earlier version.
+    
+    Optional query params:
+        against: Asset id to compare with (default: the previous version
+                 of the same deliverable)
+    """
+    new = get_object_or_404(Asset.objects.select_related('deliverable__event', 'deliverable__template'), pk=pk)
+    if new.file_type != Asset.FileType.IMAGE or not new.deliverable_id:
+        return JsonResponse({'error': 'Only deliverable images can be compared'}, status=400)
+    
+    versions = Asset.objects.filter(deliverable_id=new.deliverable_id, file_type=Asset.FileType.IMAGE)
+    against = request.GET.get('against', '')
+    if against.isdigit():
+        old = get_object_or_404(versions.exclude(pk=new.pk), pk=against)
+    else:
+        old = versions.filter(version__lt=new.version).order_by('-version').first()
+        if old is None:
+            return JsonResponse({'error': 'No earlier image version to compare with'}, status=400)
+    
+    try:
+        diff = version_diff(old, new)
+    except DiffError as e:
+        return JsonResponse({'error': str(e)}, status=422)
+    
+    context = {
+        'page_title': f'{new.deliverable.template.name}: {old.version_display} → {new.version_display}',
+        'page_subtitle': new.deliverable.event.name,
+        'old': old,
+        'new': new,
+        'diff': diff,
+        'versions': versions.exclude(pk=new.pk).order_by('-version'),
+    }
+    return render(request, 'assets/diff.html', context)
@@ -0,0 +1,34 @@
+from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.core'
+    verbose_name = 'Core'
+
+    def ready(self):
+        from .db import configure_connection
+
+        connection_created.connect(configure_connection, dispatch_uid='apps.core.configure_connection')
+
+        if settings.REQUEST_TIMING_ENABLED or settings.METRICS_ENABLED:
+            from . import timing
+
+            timing.install()
+
+        if settings.METRICS_ENABLED:
+            from . import metrics
+
+            metrics.install()
+
+        if settings.SLOW_QUERY_LOG_ENABLED:
+            from . import slowlog
+
+            slowlog.install()
+
+        if settings.NPLUSONE_DETECTION != 'off':
+            from . import nplusone
+
+            nplusone.install()
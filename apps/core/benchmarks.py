@@ -0,0 +1,163 @@
+"""
+Page benchmarks: latency and SQL query counts of the main pages.
+
+Meant to run locally against the synthetic dataset
+(`python manage.py generate_synthetic_data` with its defaults), through
+`python manage.py benchmark_pages`. Each page in PAGES has a query budget
+and a p95 latency budget; `--check` fails when a page goes over.
+`python manage.py compare_benchmarks` compares two result files.
+
+Query counts are deterministic for a given dataset, so their budgets are
+tight: a fixed number per page, plus a number per listed row for list
+pages. Latency budgets are generous since they depend on the machine.
+"""
+
+import math
+import statistics
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.contrib import admin
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .queries import fingerprint
+
+
+def _event_url(name):
+    return lambda event: reverse(name, args=[event.pk])
+
+
+def _admin_url(model):
+    return lambda event: reverse(f'admin:{model}_changelist')
+
+
+def _changelist_rows(model):
+    """Rows on the first admin changelist page of an 'app.Model'."""
+    def rows():
+        model_class = apps.get_model(model)
+        return min(model_class._default_manager.count(), admin.site._registry[model_class].list_per_page)
+    return rows
+
+
+# Query budgets: max_queries, plus per_row for each row of a list page
+# (`rows` counts them in the current database). Measured on small and on
+# the default synthetic dataset; the per-row ones come from queries in
+# admin columns, lower them as those get fixed so the gain can't
+# silently regress.
+PAGES = [
+    {'name': 'calendar', 'url': lambda event: reverse('planning:calendar'), 'max_queries': 10, 'p95_ms': 2000},
+    {'name': 'event_list', 'url': lambda event: reverse('planning:event_list'), 'max_queries': 10, 'p95_ms': 2500},
+    {'name': 'event_detail', 'url': _event_url('planning:event_detail'), 'max_queries': 15, 'p95_ms': 200},
+    {'name': 'export_event_pdf', 'url': _event_url('planning:export_event_pdf'), 'max_queries': 10, 'p95_ms': 200},
+    {'name': 'asset_list', 'url': lambda event: reverse('assets:asset_list'), 'max_queries': 10, 'p95_ms': 1200},
+    {'name': 'bar_list', 'url': lambda event: reverse('venues:bar_list'), 'max_queries': 10, 'p95_ms': 200},
+    {'name': 'admin_event', 'url': _admin_url('planning_event'), 'max_queries': 10, 'p95_ms': 1000},
+    {
+        'name': 'admin_deliverable', 'url': _admin_url('planning_eventdeliverable'),
+        'max_queries': 10, 'per_row': 1, 'rows': _changelist_rows('planning.EventDeliverable'), 'p95_ms': 800,
+    },
+    {
+        'name': 'admin_asset', 'url': _admin_url('assets_asset'),
+        'max_queries': 10, 'per_row': 3, 'rows': _changelist_rows('assets.Asset'), 'p95_ms': 1500,
+    },
+    {
+        'name': 'admin_bar', 'url': _admin_url('venues_bar'),
+        'max_queries': 10, 'per_row': 2, 'rows': _changelist_rows('venues.Bar'), 'p95_ms': 400,
+    },
+    {'name': 'admin_job', 'url': _admin_url('jobs_job'), 'max_queries': 10, 'p95_ms': 300},
+]
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def benchmark_event():
+    """Event for the detail and export pages: the next upcoming one with the most files."""
+    from apps.planning.models import Event
+
+    events = Event.objects.annotate(files=Count('deliverables__assets')).order_by('-files', 'date', 'pk')
+    return events.filter(date__gte=timezone.localdate()).first() or events.first()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def measure(client, url, repeat, warmup):
+    """Time `repeat` GETs of a URL after `warmup` untimed ones, counting queries."""
+    for _ in range(warmup):
+        client.get(url)
+
+    latencies = []
+    query_counts = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(url)
+            latencies.append((time.perf_counter() - started) * 1000)
+        query_counts.append(len(captured))
+
+    # Statements issued more than once with the same shape, e.g. per row in a loop
+    shapes = Counter(fingerprint(query['sql'])[0] for query in captured.captured_queries)
+    return {
+        'url': url,
+        'status': response.status_code,
+        'runs': repeat,
+        'queries': max(query_counts),
+        'repeated_queries': sum(count for count in shapes.values() if count > 1),
+        'latency_ms': {
+            'min': round(min(latencies), 2),
+            'mean': round(statistics.fmean(latencies), 2),
+            **{f'p{pct}': round(percentile(latencies, pct), 2) for pct in PERCENTILES},
+            'max': round(max(latencies), 2),
+        },
+    }
+
+
+def budget(page):
+    """Query and latency budget of a page for the rows currently in the database."""
+    max_queries = page['max_queries']
+    if 'rows' in page:
+        max_queries += page['per_row'] * page['rows']()
+    return {'max_queries': max_queries, 'p95_ms': page['p95_ms']}
+
+
+def over_budget(result):
+    """Budget violations of one page result (with its 'budget'), as messages."""
+    problems = []
+    limits = result['budget']
+    if result['status'] != 200:
+        problems.append(f"status {result['status']}")
+    if result['queries'] > limits['max_queries']:
+        problems.append(f"{result['queries']} queries > budget {limits['max_queries']}")
+    if result['latency_ms']['p95'] > limits['p95_ms']:
+        problems.append(f"p95 {result['latency_ms']['p95']:.0f} ms > budget {limits['p95_ms']} ms")
+    return problems
+
+
+def compare(baseline, current, threshold, min_ms):
+    """
+    Regressions between two result files.
+
+    A page regresses when it issues more queries, or when its p50 or p95
+    latency grew by more than `threshold` percent and `min_ms` milliseconds.
+    Returns [(page, metric, before, after)].
+    """
+    regressions = []
+    for name, after in current['pages'].items():
+        before = baseline['pages'].get(name)
+        if before is None:
+            continue
+        if after['queries'] > before['queries']:
+            regressions.append((name, 'queries', before['queries'], after['queries']))
+        for metric in ('p50', 'p95'):
+            old, new = before['latency_ms'][metric], after['latency_ms'][metric]
+            if new - old > min_ms and new > old * (1 + threshold / 100):
+                regressions.append((name, f'{metric} ms', old, new))
+    return regressions
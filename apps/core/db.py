@@ -0,0 +1,37 @@
+"""
+SQLite connection tuning.
+
+configure_connection() runs for every new database connection
+(connection_created, connected in apps.py) and applies SQLITE_PRAGMAS:
+
+- journal_mode=WAL: readers and the writer no longer block each other
+- synchronous=NORMAL: fsync at checkpoints only, which is safe with WAL
+- mmap_size / cache_size: memory-mapped reads and a bigger page cache
+- temp_store=MEMORY: sorts and temporary indexes stay in RAM
+- busy_timeout: wait for the write lock instead of failing at once
+
+The pragmas alone don't remove "database is locked": a deferred
+transaction that reads first and then writes can't wait for the lock
+and fails immediately. DATABASES therefore sets
+OPTIONS['transaction_mode'] = 'IMMEDIATE', so atomic() blocks take the
+write lock up front and queue on busy_timeout. Reads in autocommit
+mode are unaffected.
+
+SQLiteConcurrencyTests in apps/core/tests.py checks this with parallel
+writers.
+"""
+
+from django.conf import settings
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """Execute PRAGMA name = value for each entry on a sqlite3 connection."""
+    for name, value in pragmas.items():
+        dbapi_connection.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created receiver applying SQLITE_PRAGMAS to SQLite connections."""
+    if connection.vendor != 'sqlite':
+        return
+    apply_pragmas(connection.connection, settings.SQLITE_PRAGMAS)
@@ -0,0 +1,128 @@
+"""
+Benchmark the main pages against the current database.
+
+Logs in as a staff user, requests every page in apps/core/benchmarks.py
+PAGES a number of times and reports query counts and latency
+percentiles. Results are written as JSON for compare_benchmarks. Run it
+on the synthetic dataset so numbers are comparable between runs:
+
+    python manage.py generate_synthetic_data
+    python manage.py benchmark_pages --check
+
+Usage:
+    python manage.py benchmark_pages
+    python manage.py benchmark_pages --page calendar --page event_list --repeat 50
+    python manage.py benchmark_pages --output before.json
+    python manage.py benchmark_pages --check   # Exit with an error when over budget
+"""
+
+import json
+import os
+import platform
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from apps.core import benchmarks
+
+
+BENCHMARK_USER = 'synthetic-benchmark'
+
+
+class Command(BaseCommand):
+    help = 'Measure query counts and latency percentiles of the main pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page',
+            action='append',
+            choices=[page['name'] for page in benchmarks.PAGES],
+            help='Only benchmark this page (can be repeated)',
+        )
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per page (default: 20)')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per page first (default: 2)')
+        parser.add_argument(
+            '--output',
+            help='JSON results file (default: cache/benchmarks/<timestamp>.json)',
+        )
+        parser.add_argument('--host', default='localhost', help='Host header, must be in ALLOWED_HOSTS')
+        parser.add_argument('--check', action='store_true', help='Fail when a page is over its budget')
+
+    def handle(self, *args, **options):
+        event = benchmarks.benchmark_event()
+        if event is None:
+            raise CommandError('No events: run `python manage.py generate_synthetic_data` first')
+
+        user, _ = get_user_model().objects.update_or_create(
+            username=BENCHMARK_USER,
+            defaults={'is_staff': True, 'is_superuser': True, 'is_active': True},
+        )
+        client = Client(HTTP_HOST=options['host'], secure=not settings.DEBUG)
+        client.force_login(user)
+
+        pages = [page for page in benchmarks.PAGES if not options['page'] or page['name'] in options['page']]
+        # The N+1 detector's stack walks would skew timings (the counts are reported anyway)
+        with override_settings(NPLUSONE_DETECTION='off'):
+            results, failures = self.run_pages(client, pages, event, options)
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'cache', 'benchmarks', f'{timezone.now():%Y%m%d-%H%M%S}.json'
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': timezone.now().isoformat(),
+                'environment': {
+                    'python': platform.python_version(),
+                    'django': django.get_version(),
+                    'database': connection.vendor,
+                    'settings': settings.SETTINGS_MODULE,
+                },
+                'dataset': self.dataset(),
+                'event': event.pk,
+                'repeat': options['repeat'],
+                'pages': results,
+            }, f, indent=2)
+        self.stdout.write(f'Results written to {output}')
+
+        if failures:
+            message = 'Over budget:\n  ' + '\n  '.join(failures)
+            if options['check']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+
+    def run_pages(self, client, pages, event, options):
+        results = {}
+        failures = []
+        self.stdout.write(f"{'page':<18} {'queries':>7} {'repeated':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for page in pages:
+            result = benchmarks.measure(client, page['url'](event), options['repeat'], options['warmup'])
+            result['budget'] = benchmarks.budget(page)
+            results[page['name']] = result
+
+            problems = benchmarks.over_budget(result)
+            failures += [f"{page['name']}: {problem}" for problem in problems]
+            latency = result['latency_ms']
+            line = (
+                f"{page['name']:<18} {result['queries']:>7} {result['repeated_queries']:>8} "
+                f"{latency['p50']:>6.1f}ms {latency['p95']:>6.1f}ms {latency['p99']:>6.1f}ms"
+            )
+            self.stdout.write(self.style.ERROR(line) if problems else line)
+        return results, failures
+
+    def dataset(self):
+        from apps.assets.models import Asset
+        from apps.planning.models import Event, EventDeliverable
+        from apps.venues.models import Bar
+
+        return {
+            'bars': Bar.objects.count(),
+            'events': Event.objects.count(),
+            'deliverables': EventDeliverable.objects.count(),
+            'assets': Asset.objects.count(),
+        }
@@ -0,0 +1,69 @@
+"""
+Compare two benchmark_pages result files and flag regressions.
+
+A page regresses when it issues more SQL queries than in the baseline,
+or when its p50/p95 latency grew by more than --threshold percent (and
+by more than --min-ms, to ignore noise on fast pages). Exits with an
+error when anything regressed, so it can gate a branch.
+
+Usage:
+    python manage.py compare_benchmarks before.json after.json
+    python manage.py compare_benchmarks before.json after.json --threshold 20 --min-ms 10
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Compare two page benchmark result files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('baseline', help='Results to compare against')
+        parser.add_argument('current', help='New results')
+        parser.add_argument(
+            '--threshold', type=float, default=20,
+            help='Allowed latency increase in percent (default: 20)',
+        )
+        parser.add_argument(
+            '--min-ms', type=float, default=10,
+            help='Ignore latency increases smaller than this (default: 10)',
+        )
+
+    def handle(self, *args, **options):
+        baseline, current = self.load(options['baseline']), self.load(options['current'])
+        if baseline['dataset'] != current['dataset']:
+            self.stdout.write(self.style.WARNING(
+                f"Datasets differ: {baseline['dataset']} vs {current['dataset']}"
+            ))
+
+        self.stdout.write(f"{'page':<18} {'queries':>15} {'p50 ms':>19} {'p95 ms':>19}")
+        for name, after in current['pages'].items():
+            before = baseline['pages'].get(name)
+            if before is None:
+                self.stdout.write(f'{name:<18} (new)')
+                continue
+            self.stdout.write(
+                f"{name:<18} {before['queries']:>6} -> {after['queries']:<6}"
+                + ''.join(
+                    f" {before['latency_ms'][metric]:>7.1f} -> {after['latency_ms'][metric]:<7.1f}"
+                    for metric in ('p50', 'p95')
+                )
+            )
+
+        regressions = benchmarks.compare(baseline, current, options['threshold'], options['min_ms'])
+        if regressions:
+            raise CommandError('Regressions:\n  ' + '\n  '.join(
+                f'{name}: {metric} {before} -> {after}' for name, metric, before, after in regressions
+            ))
+        self.stdout.write(self.style.SUCCESS('No regressions'))
+
+    def load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read {path}: {e}')
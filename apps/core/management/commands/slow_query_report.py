@@ -0,0 +1,108 @@
+"""
+Summarize the slow query log by statement fingerprint.
+
+Reads SLOW_QUERY_LOG_FILE and its rotated backups (see apps/core/slowlog.py)
+and lists the fingerprints with the highest total time, with their call
+sites and the most recent query plan.
+
+Usage:
+    python manage.py slow_query_report
+    python manage.py slow_query_report --top 5 --sort max
+    python manage.py slow_query_report --since-hours 24 --plans
+"""
+
+import glob
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+SORT_KEYS = {
+    'total': lambda stats: stats['total_ms'],
+    'count': lambda stats: stats['count'],
+    'max': lambda stats: stats['max_ms'],
+}
+
+
+class Command(BaseCommand):
+    help = 'List the slowest statement fingerprints from the slow query log'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10, help='Fingerprints to show (default: 10)')
+        parser.add_argument('--sort', choices=list(SORT_KEYS), default='total', help='Order by (default: total)')
+        parser.add_argument('--since-hours', type=float, help='Only entries from the last N hours')
+        parser.add_argument('--plans', action='store_true', help='Print the latest query plan of each fingerprint')
+        parser.add_argument('--file', help='Log file (default: SLOW_QUERY_LOG_FILE)')
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.SLOW_QUERY_LOG_FILE
+        files = sorted(glob.glob(f'{glob.escape(path)}.*'), reverse=True) + sorted(glob.glob(glob.escape(path)))
+        if not files:
+            raise CommandError(f'No slow query log at {path}')
+
+        since = timezone.now() - timedelta(hours=options['since_hours']) if options['since_hours'] else None
+        stats = {}
+        skipped = 0
+        for name in files:  # Oldest backup first, so "latest" wins
+            with open(name, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        skipped += 1
+                        continue
+                    if since and datetime.fromisoformat(entry['time']) < since:
+                        continue
+                    self._add(stats, entry)
+
+        if not stats:
+            self.stdout.write('No slow queries logged' + (' in that period' if since else ''))
+            return
+
+        total_ms = sum(s['total_ms'] for s in stats.values())
+        self.stdout.write(
+            f"{sum(s['count'] for s in stats.values())} slow statements, {len(stats)} fingerprints, "
+            f'{total_ms / 1000:.1f}s in total' + (f' ({skipped} unreadable lines skipped)' if skipped else '')
+        )
+        ranked = sorted(stats.values(), key=SORT_KEYS[options['sort']], reverse=True)[:options['top']]
+        for rank, s in enumerate(ranked, start=1):
+            self.stdout.write('')
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"#{rank} {s['fingerprint']}  total {s['total_ms']:.0f} ms  count {s['count']}  "
+                f"avg {s['total_ms'] / s['count']:.1f} ms  max {s['max_ms']:.1f} ms  "
+                f"({s['total_ms'] * 100 / total_ms:.0f}%)"
+            ))
+            self.stdout.write(f"   {s['sql'][:300]}")
+            for label in ('view', 'template', 'caller'):
+                for site, count in s[label].most_common(3):
+                    self.stdout.write(f'   {label}: {site} ({count}x)')
+            if options['plans'] and s['plan']:
+                self.stdout.write('   plan:')
+                for plan_line in s['plan']:
+                    self.stdout.write(f'     {plan_line}')
+
+    def _add(self, stats, entry):
+        s = stats.get(entry['fingerprint'])
+        if s is None:
+            s = stats[entry['fingerprint']] = {
+                'fingerprint': entry['fingerprint'],
+                'sql': entry['sql'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'view': Counter(),
+                'template': Counter(),
+                'caller': Counter(),
+                'plan': None,
+            }
+        s['count'] += 1
+        s['total_ms'] += entry['duration_ms']
+        s['max_ms'] = max(s['max_ms'], entry['duration_ms'])
+        for label in ('view', 'template', 'caller'):
+            if entry.get(label):
+                s[label][entry[label]] += 1
+        s['plan'] = entry.get('plan') or s['plan']
@@ -0,0 +1,114 @@
+"""
+Prometheus metrics, served at /metrics.
+
+Collected in-process with prometheus_client (thread-safe) in its
+multiprocess mode: every process - WSGI workers, run_jobs, report
+renderers - writes its values to memory-mapped files in METRICS_DIR,
+and the /metrics view sums them at scrape time. Empty METRICS_DIR when
+the web app is restarted so counters of old processes don't pile up.
+
+Exposed:
+- http_request_duration_seconds{view, method}: latency histogram by URL name
+- http_request_db_queries_total{view}: SQL queries executed by requests
+- asset_upload_bytes_total / asset_upload_files_total
+- pdf_render_duration_seconds{renderer}: event sheet render time
+- jobs_queue_depth, sessions_stored: read from the database at scrape time
+
+Everything is a no-op unless METRICS_ENABLED is set; install() runs at
+startup (apps.py) before prometheus_client is imported anywhere.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PDF_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+request_latency = None
+request_queries = None
+upload_bytes = None
+upload_files = None
+pdf_render_duration = None
+
+
+def install():
+    """Create the metrics (multiprocess mode must be set up before the import)."""
+    global request_latency, request_queries, upload_bytes, upload_files, pdf_render_duration
+
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', str(settings.METRICS_DIR))
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+    from prometheus_client import Counter, Histogram
+
+    request_latency = Histogram(
+        'http_request_duration_seconds', 'Request latency by URL name',
+        ['view', 'method'], buckets=REQUEST_BUCKETS,
+    )
+    request_queries = Counter(
+        'http_request_db_queries', 'SQL queries executed while handling requests', ['view'],
+    )
+    upload_bytes = Counter('asset_upload_bytes', 'Bytes of uploaded asset files')
+    upload_files = Counter('asset_upload_files', 'Number of uploaded asset files')
+    pdf_render_duration = Histogram(
+        'pdf_render_duration_seconds', 'Event sheet PDF render time',
+        ['renderer'], buckets=PDF_BUCKETS,
+    )
+
+
+def observe_request(view, method, duration, queries):
+    if request_latency is None:
+        return
+    request_latency.labels(view, method).observe(duration)
+    request_queries.labels(view).inc(queries)
+
+
+def observe_upload(size, files=1):
+    if upload_bytes is None:
+        return
+    upload_bytes.inc(size)
+    upload_files.inc(files)
+
+
+@contextmanager
+def pdf_render_timer(renderer):
+    """Time a PDF render (successful renders only)."""
+    if pdf_render_duration is None:
+        yield
+        return
+    started = time.perf_counter()
+    yield
+    pdf_render_duration.labels(renderer).observe(time.perf_counter() - started)
+
+
+class DatabaseCollector:
+    """Gauges read from the database on each scrape."""
+
+    def collect(self):
+        from importlib import import_module
+
+        from django.contrib.sessions.backends.db import SessionStore as DBStore
+        from prometheus_client.core import GaugeMetricFamily
+
+        from apps.jobs.models import Job
+
+        yield GaugeMetricFamily('jobs_queue_depth', 'Background jobs waiting to run', value=Job.queue_depth())
+
+        engine = import_module(settings.SESSION_ENGINE)
+        if issubclass(engine.SessionStore, DBStore):
+            yield GaugeMetricFamily(
+                'sessions_stored', 'Rows in the session table',
+                value=engine.SessionStore.get_model_class().objects.count(),
+            )
+
+
+def render_latest():
+    """(body, content type) of the aggregated metrics of all processes."""
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(DatabaseCollector())
+    return generate_latest(registry), CONTENT_TYPE_LATEST
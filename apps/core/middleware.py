@@ -0,0 +1,238 @@
+"""
+Request instrumentation middleware.
+
+RequestTimingMiddleware records SQL query count and time, duplicated
+queries, template render time and view time for every request (see
+timing.py). Staff users get them as a Server-Timing header (shown in
+the browser dev tools' Network > Timing tab); requests slower than
+REQUEST_TIMING_SLOW_MS are logged as one key=value line on the
+'apps.core.timing' logger.
+
+MetricsMiddleware feeds the Prometheus request latency histogram and
+query counter (see metrics.py).
+
+Both work under WSGI and ASGI, share one recorder per request, and are
+removed from the chain at startup unless REQUEST_TIMING_ENABLED /
+METRICS_ENABLED is set.
+
+ProfilingMiddleware runs requests under a profiler (see profiling.py)
+when PROFILING_ENABLED is set.
+
+NPlusOneMiddleware logs or raises on N+1 queries (see nplusone.py)
+unless NPLUSONE_DETECTION is 'off'.
+"""
+
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics, nplusone, profiling, timing
+
+
+logger = logging.getLogger('apps.core.timing')
+
+# Other methods are labelled 'other' to keep metric cardinality bounded
+HTTP_METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+class _RecorderMiddleware:
+    """Runs the request with a RequestTimings recorder (reusing an outer one)."""
+
+    sync_capable = True
+    async_capable = True
+    setting = None
+
+    def __init__(self, get_response):
+        if not getattr(settings, self.setting):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings, token = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            if token is not None:
+                timing.current.reset(token)
+        self.finish(request, response, timings)
+        return response
+
+    async def __acall__(self, request):
+        timings, token = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            if token is not None:
+                timing.current.reset(token)
+        await self.afinish(request, response, timings)
+        return response
+
+    def _start(self):
+        timings = timing.current.get()
+        if timings is not None:
+            return timings, None
+        timings = timing.RequestTimings()
+        return timings, timing.current.set(timings)
+
+    def finish(self, request, response, timings):
+        raise NotImplementedError
+
+    async def afinish(self, request, response, timings):
+        self.finish(request, response, timings)
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else '<unresolved>'
+
+
+class RequestTimingMiddleware(_RecorderMiddleware):
+    setting = 'REQUEST_TIMING_ENABLED'
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.async_mode:
+            # Avoid a thread hop for process_view under ASGI
+            self.process_view = self._aprocess_view
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = timing.current.get()
+        if timings is not None:
+            timings.view_started = time.perf_counter()
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.process_view(request, view_func, view_args, view_kwargs)
+
+    def finish(self, request, response, timings):
+        user = getattr(request, 'user', None)
+        self._report(request, response, timings, user is not None and user.is_staff)
+
+    async def afinish(self, request, response, timings):
+        # request.user would query the database from the event loop
+        user = await request.auser() if hasattr(request, 'auser') else None
+        self._report(request, response, timings, user is not None and user.is_staff)
+
+    def _report(self, request, response, timings, is_staff):
+        timings.finish()
+
+        if is_staff:
+            response['Server-Timing'] = timings.server_timing()
+
+        if timings.total_time * 1000 >= settings.REQUEST_TIMING_SLOW_MS:
+            data = {
+                'method': request.method,
+                'path': request.path,
+                'view': _view_name(request),
+                'status': response.status_code,
+                **timings.as_dict(),
+            }
+            logger.warning(
+                'slow_request %s',
+                ' '.join(f'{key}={value}' for key, value in data.items()),
+                extra={'timing': data},
+            )
+
+
+class MetricsMiddleware(_RecorderMiddleware):
+    setting = 'METRICS_ENABLED'
+
+    def finish(self, request, response, timings):
+        metrics.observe_request(
+            _view_name(request),
+            request.method if request.method in HTTP_METHODS else 'other',
+            time.perf_counter() - timings.started,
+            timings.query_count,
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests and save the result to PROFILE_DIR.
+
+    Staff users ask for a profile with `?profile=1` or an `X-Profile: 1`
+    header (`cprofile` / `sample` pick the mode, anything else uses
+    PROFILE_MODE); the saved file name comes back in the X-Profile response
+    header. Independently, PROFILE_SAMPLE_RATE of all requests are profiled
+    with the low-overhead stack sampler.
+
+    Sync only: the profilers follow the current thread, so under ASGI
+    Django runs this and the view in the same worker thread.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = self._requested_mode(request)
+        sampled = mode is None and random.random() < settings.PROFILE_SAMPLE_RATE
+        if sampled:
+            mode = 'sample'
+        if mode is None:
+            return self.get_response(request)
+
+        # Lets views pass the request on to background jobs they queue
+        request.profile_mode = mode
+        with profiling.Profile(mode) as profile:
+            response = self.get_response(request)
+
+        user = getattr(request, 'user', None)
+        name = profile.save(
+            f'{request.method} {request.path}',
+            method=request.method,
+            path=request.get_full_path(),
+            view=_view_name(request),
+            status=response.status_code,
+            user=user.get_username() if user is not None and user.is_authenticated else '',
+            sampled=sampled,
+        )
+        if not sampled:
+            response['X-Profile'] = name
+        return response
+
+    def _requested_mode(self, request):
+        value = request.GET.get('profile') or request.headers.get('X-Profile')
+        if not value or not request.user.is_staff:
+            return None
+        return value if value in profiling.MODES else settings.PROFILE_MODE
+
+
+class NPlusOneMiddleware:
+    """Watch each request for N+1 queries; NPLUSONE_DETECTION is 'log' or 'raise'."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.NPLUSONE_DETECTION == 'off':
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with self._watch(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with self._watch(request):
+            return await self.get_response(request)
+
+    def _watch(self, request):
+        return nplusone.watch(
+            label=f'{request.method} {request.path}',
+            raise_errors=settings.NPLUSONE_DETECTION == 'raise',
+        )
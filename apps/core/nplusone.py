@@ -0,0 +1,116 @@
+"""
+N+1 query detection.
+
+While a watcher is active (one per request with NPlusOneMiddleware, or
+`with watch():` in a test), every statement is grouped by its normalized
+SQL fingerprint and call site - the template line rendering it, or else
+the innermost frame in our apps (see queries.call_site). A group reaching
+NPLUSONE_THRESHOLD statements is almost always a relation loaded lazily
+in a loop, e.g. `{% for event in events %}{{ event.bars.all }}` or
+`deliverable.assets.count` per row, and is reported:
+
+- 'log': one warning per group on the 'apps.core.nplusone' logger, with
+  the template line and view (the development default)
+- 'raise': NPlusOneError at the end of the request or `with` block (the
+  default under `manage.py test`)
+
+Fix them with select_related/prefetch_related or an annotation in the view.
+
+Usage in a test:
+    with nplusone.watch():
+        self.client.get('/events/')
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .queries import call_site, fingerprint
+
+
+logger = logging.getLogger('apps.core.nplusone')
+
+_current = ContextVar('nplusone_watcher', default=None)
+
+
+class NPlusOneError(AssertionError):
+    """Repeated same-shape queries from one call site."""
+
+
+class QueryWatcher:
+    """Counts statements per (fingerprint, call site)."""
+
+    def __init__(self, threshold, parent=None):
+        self.threshold = threshold
+        self.parent = parent  # Enclosing watcher, which sees the same queries
+        self.groups = {}
+
+    def record(self, digest, normalized, site):
+        key = (digest, site['template'] or site['caller'])
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {'count': 0, 'sql': normalized, **site}
+        group['count'] += 1
+
+    def problems(self):
+        """Groups at or over the threshold, most repeated first."""
+        found = [group for group in self.groups.values() if group['count'] >= self.threshold]
+        return sorted(found, key=lambda group: group['count'], reverse=True)
+
+
+def describe(group):
+    site = group['template'] or group['caller'] or '<unknown>'
+    via = f" (view {group['view']})" if group['view'] and group['view'] != group['caller'] else ''
+    return f"{group['count']}x at {site}{via}: {group['sql'][:200]}"
+
+
+def report(watcher, label, raise_errors):
+    problems = watcher.problems()
+    if not problems:
+        return
+    if raise_errors:
+        raise NPlusOneError(
+            f'N+1 queries in {label}:\n  ' + '\n  '.join(describe(group) for group in problems)
+        )
+    for group in problems:
+        logger.warning('N+1 queries in %s: %s', label, describe(group), extra={'nplusone': group})
+
+
+@contextmanager
+def watch(label='block', raise_errors=True, threshold=None):
+    """Detect N+1 queries in the enclosed code (reported only if it completes)."""
+    install()
+    watcher = QueryWatcher(threshold or settings.NPLUSONE_THRESHOLD, parent=_current.get())
+    token = _current.set(watcher)
+    try:
+        yield watcher
+    finally:
+        _current.reset(token)
+    report(watcher, label, raise_errors)
+
+
+def record_query(execute, sql, params, many, context):
+    watcher = _current.get()
+    if watcher is not None and not many:
+        digest, normalized = fingerprint(sql)
+        site = call_site(skip=2)
+        while watcher is not None:
+            watcher.record(digest, normalized, site)
+            watcher = watcher.parent
+    return execute(sql, params, many, context)
+
+
+def _add_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install():
+    """Record queries on new connections and the ones already open in this thread."""
+    connection_created.connect(_add_recorder, dispatch_uid='apps.core.nplusone')
+    for connection in connections.all(initialized_only=True):
+        _add_recorder(None, connection)
@@ -0,0 +1,194 @@
+"""
+Profiling of individual requests and jobs.
+
+Two modes:
+
+- 'cprofile': deterministic cProfile of every call, saved as .prof
+  (open with snakeviz, `python -m pstats`, or the admin stats view)
+- 'sample': a background thread samples the profiled thread's stack every
+  PROFILE_SAMPLE_INTERVAL_MS, saved as collapsed stacks (.collapsed,
+  one `frame;frame;frame count` line per stack) for flamegraph.pl,
+  speedscope or inferno. Much lower overhead, so used for random sampling.
+
+Each profile is stored in PROFILE_DIR next to a .json file describing it
+(label, path, user, duration, ...). Only the newest PROFILE_KEEP are kept.
+
+Usage:
+    with Profile('sample') as profile:
+        ...
+    profile.save('GET /events/', path='/events/', status=200)
+"""
+
+import cProfile
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+
+MODES = {
+    'cprofile': '.prof',
+    'sample': '.collapsed',
+}
+
+# Names accepted by the download view
+PROFILE_NAME = re.compile(r'^[\w-]+\.(?:prof|collapsed)$')
+
+
+class StackSampler:
+    """Counts the stacks of one thread, sampled from a helper thread."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_id = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def _short_path(filename):
+    """Paths relative to the project or site-packages, to keep stacks readable."""
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        return filename[len(base):]
+    marker = filename.rfind('site-packages' + os.sep)
+    if marker != -1:
+        return filename[marker + len('site-packages') + 1:]
+    return filename
+
+
+class Profile:
+    """Context manager profiling the enclosed code in the given mode."""
+
+    def __init__(self, mode='cprofile'):
+        if mode not in MODES:
+            raise ValueError(f'Unknown profile mode {mode!r}')
+        self.mode = mode
+        self.duration = None
+        self._profiler = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        if self.mode == 'cprofile':
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = StackSampler(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+            self._profiler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.mode == 'cprofile':
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+        self.duration = time.perf_counter() - self._started
+        return False
+
+    def save(self, label, **meta):
+        """Write the profile and its description to PROFILE_DIR; returns the file name."""
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        created = timezone.now()
+        # Sortable by time; the label keeps the path readable (/events/5/ -> events-5)
+        slug = slugify(label.replace('/', ' '))[:50] or 'profile'
+        stem = f'{created:%Y%m%d-%H%M%S-%f}-{slug}-{secrets.token_hex(3)}'
+        name = stem + MODES[self.mode]
+        path = os.path.join(settings.PROFILE_DIR, name)
+
+        if self.mode == 'cprofile':
+            self._profiler.dump_stats(path)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self._profiler.collapsed())
+            meta['samples'] = self._profiler.samples
+
+        description = {
+            'name': name,
+            'label': label,
+            'mode': self.mode,
+            'created': created.isoformat(),
+            'duration_ms': round(self.duration * 1000, 1),
+            'size': os.path.getsize(path),
+            **meta,
+        }
+        with open(os.path.join(settings.PROFILE_DIR, stem + '.json'), 'w', encoding='utf-8') as f:
+            json.dump(description, f, default=str)
+
+        prune(settings.PROFILE_KEEP)
+        return name
+
+
+def list_profiles(limit=None):
+    """Descriptions of stored profiles, newest first."""
+    try:
+        names = sorted((n for n in os.listdir(settings.PROFILE_DIR) if n.endswith('.json')), reverse=True)
+    except FileNotFoundError:
+        return []
+    profiles = []
+    for name in names[:limit]:
+        try:
+            with open(os.path.join(settings.PROFILE_DIR, name), encoding='utf-8') as f:
+                profile = json.load(f)
+        except (OSError, ValueError):
+            continue  # Being written or pruned by another process
+        profile['created'] = datetime.fromisoformat(profile['created'])
+        profiles.append(profile)
+    return profiles
+
+
+def profile_path(name):
+    """Absolute path of a stored profile, or None if the name is not one."""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = os.path.join(settings.PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+def prune(keep):
+    """Delete all but the newest `keep` profiles."""
+    try:
+        names = sorted((n for n in os.listdir(settings.PROFILE_DIR) if n.endswith('.json')), reverse=True)
+    except FileNotFoundError:
+        return
+    for name in names[keep:]:
+        stem = name[:-len('.json')]
+        for ext in ('.json', *MODES.values()):
+            try:
+                os.remove(os.path.join(settings.PROFILE_DIR, stem + ext))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,109 @@
+"""
+Helpers for describing SQL statements in logs.
+
+- fingerprint(): normalized SQL shape, identical for queries that only
+  differ in parameter values or IN-list length
+- redact_params(): parameter list safe to write to a log
+- call_site(): where in our code (view, caller, template line) a
+  statement was issued, found by walking the Python stack - only call it
+  for the few statements that get reported
+"""
+
+import datetime
+import decimal
+import hashlib
+import os
+import re
+import sys
+
+from django.conf import settings
+
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_VALUES_LIST = re.compile(r'(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+', re.IGNORECASE)
+_ROW = re.compile(r'\((?:\s*\?\s*,)*\s*\?\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """SQL with literals and placeholders replaced by ?, lists collapsed."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _IN_LIST.sub('(...)', sql)
+    sql = _ROW.sub('(...)', sql)
+    sql = _VALUES_LIST.sub(r'\1', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    """(short hash, normalized SQL) identifying a statement's shape."""
+    normalized = normalize_sql(sql)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+def redact_params(params):
+    """Keep numbers, dates and NULLs; replace strings and blobs by their type and length."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: _redact(value) for key, value in params.items()}
+    return [_redact(value) for value in params]
+
+
+def _redact(value):
+    if isinstance(value, (bool, int, float, type(None))):
+        return value
+    if isinstance(value, (decimal.Decimal, datetime.date, datetime.time)):
+        return str(value)
+    if isinstance(value, (str, bytes, bytearray, memoryview)):
+        return f'<{type(value).__name__} len={len(value)}>'
+    if isinstance(value, (list, tuple)):
+        return [_redact(item) for item in value]
+    return f'<{type(value).__name__}>'
+
+
+_APPS_DIR = os.path.join(str(settings.BASE_DIR), 'apps') + os.sep
+_CORE_DIR = os.path.join(_APPS_DIR, 'core') + os.sep
+_TEMPLATE_BASE = os.path.join('django', 'template', 'base.py')
+
+
+def call_site(skip=1):
+    """
+    Describe where the current statement comes from.
+
+    Returns:
+        {'view': 'apps/planning/views.py:56 calendar_view' (outermost
+         views/admin frame), 'caller': innermost frame in our apps,
+         'template': 'planning/calendar.html:42' (innermost node being
+         rendered)}, each None when not found.
+    """
+    view = caller = template = None
+    frame = sys._getframe(skip)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_APPS_DIR) and not filename.startswith(_CORE_DIR):
+            site = f'{os.path.relpath(filename, settings.BASE_DIR)}:{frame.f_lineno} {frame.f_code.co_name}'
+            if caller is None:
+                caller = site
+            if os.path.basename(filename) in ('views.py', 'admin.py'):
+                view = site
+        elif template is None and frame.f_code.co_name == 'render_annotated' and filename.endswith(_TEMPLATE_BASE):
+            template = _template_line(frame)
+        frame = frame.f_back
+    return {'view': view, 'caller': caller, 'template': template}
+
+
+def _template_line(frame):
+    node = frame.f_locals.get('self')
+    context = frame.f_locals.get('context')
+    token = getattr(node, 'token', None)
+    origin = getattr(getattr(context, 'template', None), 'origin', None)
+    # Nodes from included/extended templates carry their own origin
+    origin = getattr(node, 'origin', None) or origin
+    if origin is None:
+        return None
+    return f'{origin.template_name or origin.name}:{token.lineno if token else "?"}'
@@ -0,0 +1,122 @@
+"""
+Slow query log.
+
+When SLOW_QUERY_LOG_ENABLED is set, install() (called from apps.py) adds
+an execute wrapper to every database connection. Statements taking
+longer than SLOW_QUERY_MS are written as one JSON object per line to
+SLOW_QUERY_LOG_FILE (rotating, BASE_DIR/logs by default) with:
+
+- fingerprint / sql: hash and normalized shape of the statement
+- params: parameters with strings and blobs redacted
+- view, caller, template: where it was issued (queries.call_site)
+- plan: EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (PostgreSQL) output,
+  captured right after the statement on the same connection
+
+Summarize with `python manage.py slow_query_report`.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+
+from .queries import call_site, fingerprint, redact_params
+
+
+logger = logging.getLogger('apps.core.slow_queries')
+
+# Statements EXPLAIN can describe without side effects
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+# Set while the plan is captured so EXPLAIN itself is never reported
+_explaining = ContextVar('slow_query_explaining', default=False)
+
+
+def explain(connection, sql, params):
+    """Query plan lines for a statement, or None if unavailable."""
+    if not sql.lstrip()[:6].upper().startswith(EXPLAINABLE):
+        return None
+    if connection.vendor == 'sqlite':
+        from django.db.backends.sqlite3.base import SQLiteCursorWrapper
+
+        prefix = 'EXPLAIN QUERY PLAN '
+        cursor = connection.connection.cursor(factory=SQLiteCursorWrapper)
+    elif connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN '
+        cursor = connection.connection.cursor()
+    else:
+        return None
+
+    token = _explaining.set(True)
+    try:
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+        _explaining.reset(token)
+
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail): indent children under their parent
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node_id] + detail)
+        return lines
+    return [row[0] for row in rows]
+
+
+def _wrapper_for(connection):
+    def log_slow_query(execute, sql, params, many, context):
+        if _explaining.get():
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= settings.SLOW_QUERY_MS:
+            _log(connection, sql, params, many, duration_ms)
+        return result
+    return log_slow_query
+
+
+def _log(connection, sql, params, many, duration_ms):
+    digest, normalized = fingerprint(sql)
+    entry = {
+        'time': timezone.now().isoformat(),
+        'duration_ms': round(duration_ms, 2),
+        'database': connection.alias,
+        'fingerprint': digest,
+        'sql': normalized,
+        'params': None if many else redact_params(params),
+        'many': many,
+        **call_site(skip=3),
+        'plan': None if many else explain(connection, sql, params),
+    }
+    logger.warning(json.dumps(entry, default=str))
+
+
+def _add_wrapper(sender, connection, **kwargs):
+    connection.execute_wrappers.append(_wrapper_for(connection))
+
+
+def install():
+    """Attach the wrapper to new connections and set up the log file."""
+    connection_created.connect(_add_wrapper, dispatch_uid='apps.core.slowlog')
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(settings.SLOW_QUERY_LOG_FILE), exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            settings.SLOW_QUERY_LOG_FILE,
+            maxBytes=settings.SLOW_QUERY_LOG_MAX_MB * 1024 * 1024,
+            backupCount=5,
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
@@ -0,0 +1,218 @@
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+
+from django.core.files.base import ContentFile
+from django.db import OperationalError, connection, transaction
+from django.http import HttpResponse
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.urls import path, reverse
+
+from apps.accounts.models import User
+from apps.assets.models import Asset
+from apps.jobs.models import Job
+from apps.planning.models import DeliverableTemplate, Event, EventDeliverable
+from apps.venues.models import Bar
+from . import benchmarks, nplusone
+
+
+@unittest.skipUnless(
+    connection.vendor == 'sqlite' and not connection.is_in_memory_db(),
+    'needs an SQLite test database file (DATABASES TEST NAME)',
+)
+class SQLiteConcurrencyTests(TransactionTestCase):
+    """Parallel writers through Django connections (pragmas from apps/core/db.py)."""
+
+    writers = 8
+    transactions = 25
+
+    def test_parallel_read_then_write_transactions(self):
+        job = Job.objects.create(name='counter')
+        locked = []
+        journal_modes = set()
+
+        def writer():
+            # A new thread gets its own connection, set up by connection_created
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    journal_modes.add(cursor.fetchone()[0])
+                for _ in range(self.transactions):
+                    try:
+                        with transaction.atomic():
+                            attempts = Job.objects.get(pk=job.pk).attempts
+                            time.sleep(0.0005)  # Work between the read and the write
+                            Job.objects.filter(pk=job.pk).update(attempts=attempts + 1)
+                    except OperationalError as exc:
+                        locked.append(str(exc))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(self.writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(journal_modes, {'wal'})
+        self.assertEqual(locked, [])
+        # BEGIN IMMEDIATE serializes the transactions: no lost updates either
+        job.refresh_from_db()
+        self.assertEqual(job.attempts, self.writers * self.transactions)
+
+
+class PageBudgetTests(TestCase):
+    """The benchmarked pages stay within their query budgets on a small dataset."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        bars = [Bar.objects.create(name=f'Bar {n}', location='Paris') for n in range(3)]
+        for n in range(3):
+            DeliverableTemplate.objects.create(name=f'Template {n}')
+
+        today = date.today()
+        dates = [today.replace(day=1), today.replace(day=15), today.replace(day=28),
+                 today + timedelta(days=20), today + timedelta(days=45)]
+        for number, event_date in enumerate(dates):
+            event = Event.objects.create(name=f'Event {number}', date=event_date, created_by=cls.user)
+            event.bars.set(bars[:2])  # Generates the deliverables
+            if number % 2:
+                event.deliverables.update(status=EventDeliverable.Status.APPROVED)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        deliverable = EventDeliverable.objects.first()
+        for version in range(2):
+            Asset.objects.create(
+                file=ContentFile(b'brief', name=f'brief_v{version}.txt'),
+                deliverable=deliverable, uploaded_by=self.user,
+            )
+        self.client.force_login(self.user)
+
+    def test_pages_within_query_budget(self):
+        event = benchmarks.benchmark_event()
+        for page in benchmarks.PAGES:
+            with self.subTest(page=page['name']):
+                result = benchmarks.measure(self.client, page['url'](event), repeat=1, warmup=1)
+                limits = benchmarks.budget(page)
+                self.assertEqual(result['status'], 200)
+                self.assertLessEqual(result['queries'], limits['max_queries'])
+
+    def test_list_budgets_grow_with_rows(self):
+        admin_bar = next(page for page in benchmarks.PAGES if page['name'] == 'admin_bar')
+        self.assertEqual(benchmarks.budget(admin_bar)['max_queries'], 10 + 2 * 3)
+
+        Bar.objects.create(name='Extra', location='Paris')
+        self.assertEqual(benchmarks.budget(admin_bar)['max_queries'], 10 + 2 * 4)
+
+
+def lazy_bars(request):
+    """Deliberate N+1 for the middleware test."""
+    names = [bar.name for event in Event.objects.all() for bar in event.bars.all()]
+    return HttpResponse(', '.join(names))
+
+
+urlpatterns = [path('lazy-bars/', lazy_bars)]
+
+
+class NPlusOneTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        bars = [Bar.objects.create(name=f'Bar {n}', location='Paris') for n in range(2)]
+        DeliverableTemplate.objects.create(name='Poster')
+        # Upcoming and all in one month, so every page below lists them all
+        cls.month = (date.today().replace(day=1) + timedelta(days=32)).replace(day=1)
+        for number in range(6):
+            event = Event.objects.create(name=f'Event {number}', date=cls.month + timedelta(days=number))
+            event.bars.set(bars)
+
+    def test_lazy_relation_in_loop_raises(self):
+        with self.assertRaises(nplusone.NPlusOneError) as raised:
+            with nplusone.watch(threshold=5):
+                for event in Event.objects.all():
+                    list(event.bars.all())
+
+        self.assertIn('6x at', str(raised.exception))
+        self.assertIn('FROM "venues_bar"', str(raised.exception))
+
+    def test_prefetched_relation_passes(self):
+        with nplusone.watch(threshold=5) as watcher:
+            for event in Event.objects.prefetch_related('bars'):
+                list(event.bars.all())
+
+        self.assertEqual(watcher.problems(), [])
+        self.assertEqual(sum(group['count'] for group in watcher.groups.values()), 2)
+
+    def test_nested_watchers_see_the_same_queries(self):
+        with self.assertLogs('apps.core.nplusone', 'WARNING') as logs:
+            with nplusone.watch(raise_errors=False) as outer:
+                with self.assertRaises(nplusone.NPlusOneError):
+                    with nplusone.watch(threshold=5):
+                        for event in Event.objects.all():
+                            list(event.bars.all())
+
+        self.assertEqual(len(outer.problems()), 1)
+        self.assertEqual(len(logs.records), 1)
+
+    @override_settings(NPLUSONE_DETECTION='raise')
+    def test_event_pages_pass_under_raise(self):
+        client = Client()  # Middleware is set up on the first request
+        client.force_login(self.user)
+        urls = [
+            reverse('planning:event_list'),
+            reverse('planning:calendar') + f'?year={self.month.year}&month={self.month.month}',
+            reverse('admin:planning_event_changelist'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'Event 5')
+
+    @override_settings(NPLUSONE_DETECTION='raise', ROOT_URLCONF=__name__)
+    def test_middleware_raises_for_lazy_loop(self):
+        client = Client()
+        with self.assertLogs('django.request', 'ERROR'):
+            with self.assertRaisesMessage(nplusone.NPlusOneError, 'GET /lazy-bars/'):
+                client.get('/lazy-bars/')
+
+
+class QueryWatcherTests(unittest.TestCase):
+
+    site = {'view': 'apps.planning.views.event_list', 'caller': 'apps/planning/views.py:10', 'template': None}
+
+    def test_groups_by_fingerprint_and_call_site(self):
+        watcher = nplusone.QueryWatcher(threshold=3)
+        for _ in range(3):
+            watcher.record('a', 'SELECT ... WHERE id = %s', self.site)
+        watcher.record('b', 'SELECT ... FROM other', self.site)
+        watcher.record('a', 'SELECT ... WHERE id = %s', {**self.site, 'caller': 'apps/planning/views.py:20'})
+
+        self.assertEqual(len(watcher.groups), 3)
+        [problem] = watcher.problems()
+        self.assertEqual(problem['count'], 3)
+        self.assertEqual(problem['caller'], 'apps/planning/views.py:10')
+
+    def test_template_line_takes_precedence_over_caller(self):
+        watcher = nplusone.QueryWatcher(threshold=2)
+        watcher.record('a', 'SELECT 1', {**self.site, 'template': 'planning/event_list.html:44'})
+        watcher.record('a', 'SELECT 1', {**self.site, 'template': 'planning/event_list.html:44', 'caller': 'other'})
+
+        self.assertEqual(len(watcher.problems()), 1)
+
+    def test_below_threshold_is_not_a_problem(self):
+        watcher = nplusone.QueryWatcher(threshold=5)
+        for _ in range(4):
+            watcher.record('a', 'SELECT 1', self.site)
+
+        self.assertEqual(watcher.problems(), [])
+        watcher.record('a', 'SELECT 1', self.site)
+        self.assertEqual([group['count'] for group in watcher.problems()], [5])
@@ -0,0 +1,123 @@
+"""
+Per-request SQL, template and view timings.
+
+When REQUEST_TIMING_ENABLED is on, install() (called from apps.py) adds
+an execute wrapper to every database connection and wraps Django
+template rendering. Both report into the RequestTimings object of the
+current request, held in a context variable, so they work in WSGI
+threads, under ASGI and in sync views run through sync_to_async alike.
+Outside a request (jobs, management commands) nothing is recorded.
+
+RequestTimingMiddleware (middleware.py) creates the recorder, sends
+Server-Timing headers to staff users and logs requests slower than
+REQUEST_TIMING_SLOW_MS. With the setting off nothing is installed and
+the middleware removes itself.
+"""
+
+import time
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+
+
+current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Counters for one request (times in seconds)."""
+
+    __slots__ = (
+        'started', 'view_started', 'view_time', 'total_time',
+        'query_count', 'query_time', 'duplicate_count', '_seen', 'template_time', '_template_depth',
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_time = 0.0
+        self.total_time = 0.0
+        self.query_count = 0
+        self.query_time = 0.0
+        self.duplicate_count = 0
+        self._seen = set()
+        self.template_time = 0.0
+        self._template_depth = 0
+
+    def add_query(self, sql, params, duration):
+        self.query_count += 1
+        self.query_time += duration
+        key = hash((sql, repr(params)))
+        if key in self._seen:
+            self.duplicate_count += 1
+        else:
+            self._seen.add(key)
+
+    def finish(self):
+        now = time.perf_counter()
+        self.total_time = now - self.started
+        if self.view_started is not None:
+            self.view_time = now - self.view_started
+
+    def as_dict(self):
+        """Milliseconds and counts, for logging."""
+        return {
+            'total_ms': round(self.total_time * 1000, 1),
+            'view_ms': round(self.view_time * 1000, 1),
+            'db_queries': self.query_count,
+            'db_ms': round(self.query_time * 1000, 1),
+            'db_duplicates': self.duplicate_count,
+            'template_ms': round(self.template_time * 1000, 1),
+        }
+
+    def server_timing(self):
+        """Value of the Server-Timing response header."""
+        return ', '.join([
+            f'db;dur={self.query_time * 1000:.1f};desc="{self.query_count} queries, {self.duplicate_count} duplicated"',
+            f'tpl;dur={self.template_time * 1000:.1f};desc="Templates"',
+            f'view;dur={self.view_time * 1000:.1f};desc="View"',
+            f'total;dur={self.total_time * 1000:.1f};desc="Total"',
+        ])
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper timing every statement of the current request."""
+    timings = current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add_query(sql, params, time.perf_counter() - started)
+
+
+def _add_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def _timed_render(render):
+    def wrapper(self, context=None, request=None):
+        timings = current.get()
+        if timings is None:
+            return render(self, context, request)
+        # Templates rendered while rendering another are already counted
+        timings._template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            timings._template_depth -= 1
+            if not timings._template_depth:
+                timings.template_time += time.perf_counter() - started
+    wrapper.__wrapped__ = render
+    return wrapper
+
+
+def install():
+    """Hook the query and template recorders in (once, at startup)."""
+    from django.template.backends.django import Template
+
+    connection_created.connect(_add_query_recorder, dispatch_uid='apps.core.timing')
+    if not hasattr(Template.render, '__wrapped__'):
+        Template.render = _timed_render(Template.render)
@@ -0,0 +1,80 @@
+"""
+Views for the core app.
+"""
+
+import hmac
+import io
+import pstats
+
+from django.conf import settings
+from django.contrib import admin
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
+from django.shortcuts import render
+from django.views.decorators.http import require_GET
+
+from . import metrics as metrics_module
+from . import profiling
+
+
+LOCAL_ADDRESSES = {'127.0.0.1', '::1'}
+
+PROFILE_SORT_KEYS = ('cumulative', 'tottime', 'ncalls')
+
+
+@require_GET
+def metrics(request):
+    """
+    Prometheus scrape endpoint.
+
+    Allowed with `Authorization: Bearer <METRICS_TOKEN>` when a token is
+    configured; otherwise only from localhost or for staff users.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404
+
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        allowed = hmac.compare_digest(request.headers.get('Authorization', ''), expected)
+    else:
+        allowed = request.META.get('REMOTE_ADDR') in LOCAL_ADDRESSES or request.user.is_staff
+    if not allowed:
+        return HttpResponseForbidden('Forbidden')
+
+    body, content_type = metrics_module.render_latest()
+    return HttpResponse(body, content_type=content_type)
+
+
+# Profiles (apps/core/profiling.py), wrapped with admin.site.admin_view in config/urls.py
+
+@require_GET
+def profile_list(request):
+    """Recent request and job profiles, newest first."""
+    context = {
+        **admin.site.each_context(request),
+        'title': 'Profiles',
+        'profiles': profiling.list_profiles(limit=settings.PROFILE_KEEP),
+        'profiling_enabled': settings.PROFILING_ENABLED,
+        'sample_rate': settings.PROFILE_SAMPLE_RATE,
+    }
+    return render(request, 'core/profile_list.html', context)
+
+
+@require_GET
+def profile_download(request, name):
+    path = profiling.profile_path(name)
+    if path is None:
+        raise Http404
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
+
+
+@require_GET
+def profile_stats(request, name):
+    """Top functions of a cProfile profile by cumulative time, as text."""
+    path = profiling.profile_path(name)
+    if path is None or not name.endswith('.prof'):
+        raise Http404
+    sort = request.GET.get('sort')
+    output = io.StringIO()
+    stats = pstats.Stats(path, stream=output)
+    stats.strip_dirs().sort_stats(sort if sort in PROFILE_SORT_KEYS else 'cumulative').print_stats(60)
+    return HttpResponse(output.getvalue(), content_type='text/plain; charset=utf-8')
@@ -0,0 +1,45 @@
+"""
+Admin configuration for jobs app.
+
+Read-only view of the background job queue, with a requeue action.
+"""
+
+from django.contrib import admin
+from django.utils.html import format_html
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Inspect queued, running and finished jobs."""
+    list_display = ('name', 'status', 'progress', 'attempts', 'created_by', 'created_at', 'duration_display')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'key')
+    ordering = ('-created_at',)
+    readonly_fields = (
+        'name', 'kwargs', 'key', 'status', 'progress', 'result_link', 'result', 'error', 'attempts',
+        'created_by', 'created_at', 'started_at', 'finished_at',
+    )
+    actions = ['requeue']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def result_link(self, obj):
+        """Download link for jobs whose result has a 'url' (e.g. report PDFs)."""
+        if obj.status == Job.Status.DONE and isinstance(obj.result, dict) and obj.result.get('url'):
+            return format_html('<a href="{}">Download</a>', obj.result['url'])
+        return '—'
+    result_link.short_description = 'Output'
+    
+    def duration_display(self, obj):
+        return f"{obj.duration:.1f}s" if obj.duration is not None else '—'
+    duration_display.short_description = 'Duration'
+    
+    def requeue(self, request, queryset):
+        count = queryset.exclude(status=Job.Status.RUNNING).update(
+            status=Job.Status.QUEUED, progress=0, error=''
+        )
+        self.message_user(request, f'{count} jobs requeued')
+    requeue.short_description = 'Requeue selected jobs'
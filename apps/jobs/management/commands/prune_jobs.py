@@ -0,0 +1,78 @@
+"""
+Delete finished jobs older than a retention period, in small batches.
+
+Every image upload queues an extract_palette job and every export a
+render job, so DONE and FAILED rows pile up. Pending jobs are never
+touched. Deletes BATCH_SIZE rows per transaction and pauses between
+batches so requests can write in between (see clear_expired_sessions).
+
+Run it as a scheduled task, e.g. daily:
+    python manage.py prune_jobs
+
+Usage:
+    python manage.py prune_jobs
+    python manage.py prune_jobs --days 30 --batch-size 500
+    python manage.py prune_jobs --dry-run
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Delete finished jobs older than --days, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=float,
+            default=14,
+            help='Keep jobs finished less than this many days ago (default: 14)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Jobs deleted per transaction (default: 1000)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.1,
+            help='Seconds to wait between batches (default: 0.1)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the jobs that would be deleted',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        finished = Job.objects.filter(
+            status__in=[Job.Status.DONE, Job.Status.FAILED],
+            finished_at__lt=cutoff,
+        )
+        started = time.monotonic()
+        if options['dry_run']:
+            self.stdout.write(f'{finished.count()} finished jobs to delete ({Job.objects.count()} total)')
+            return
+
+        deleted = 0
+        while True:
+            pks = list(finished.order_by().values_list('pk', flat=True)[:options['batch_size']])
+            if not pks:
+                break
+            deleted += Job.objects.filter(pk__in=pks).delete()[0]
+            if len(pks) < options['batch_size']:
+                break
+            time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} finished jobs in {time.monotonic() - started:.1f}s'
+        ))
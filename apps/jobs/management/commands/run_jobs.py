@@ -0,0 +1,82 @@
+"""
+Background job worker.
+
+Claims queued Job rows one at a time and runs them. Run one or more
+workers next to the web server (systemd, supervisor...), or from cron
+with --burst to drain the queue and exit.
+
+Usage:
+    python manage.py run_jobs
+    python manage.py run_jobs --burst
+    python manage.py run_jobs --requeue-stale-minutes 30
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.jobs import registry
+from apps.jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of waiting for new jobs',
+        )
+        parser.add_argument(
+            '--poll-seconds',
+            type=float,
+            default=2,
+            help='Wait between queue checks when idle (default: 2)',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=0,
+            help='Exit after running this many jobs; 0 = no limit',
+        )
+        parser.add_argument(
+            '--requeue-stale-minutes',
+            type=float,
+            default=0,
+            help='At startup, requeue jobs stuck in "running" for longer than this '
+                 '(left behind by a killed worker); 0 = off',
+        )
+
+    def handle(self, *args, **options):
+        if options['requeue_stale_minutes']:
+            cutoff = timezone.now() - timedelta(minutes=options['requeue_stale_minutes'])
+            requeued = Job.objects.filter(
+                status=Job.Status.RUNNING, started_at__lt=cutoff
+            ).update(status=Job.Status.QUEUED, progress=0)
+            if requeued:
+                self.stdout.write(f'Requeued {requeued} stale jobs')
+
+        done = failed = 0
+        while not options['max_jobs'] or done + failed < options['max_jobs']:
+            close_old_connections()
+            job = Job.claim_next()
+            if job is None:
+                if options['burst']:
+                    break
+                time.sleep(options['poll_seconds'])
+                continue
+
+            started = time.monotonic()
+            if registry.run(job):
+                done += 1
+                outcome = self.style.SUCCESS('done')
+            else:
+                failed += 1
+                outcome = self.style.ERROR('failed')
+            self.stdout.write(f'{job.name} #{job.pk} {outcome} in {time.monotonic() - started:.2f}s')
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {done + failed} jobs ({failed} failed)'))
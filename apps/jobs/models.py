@@ -0,0 +1,162 @@
+"""
+Models for the jobs app.
+
+A small database-backed job queue for work that must not run inside a
+request (image analysis, PDF rendering...). Jobs are rows in the Job
+table; `python manage.py run_jobs` claims and runs them.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    One unit of background work.
+    
+    `name` selects a function registered with @register (see registry.py),
+    called with the JSON `kwargs`. Functions may report progress and
+    return a JSON-serializable result, both stored on the row.
+    """
+    
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+    
+    name = models.CharField(
+        max_length=100,
+        help_text="Registered job name (e.g., 'assets.extract_palette')"
+    )
+    
+    kwargs = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Keyword arguments passed to the job function"
+    )
+    
+    key = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Deduplication key: a pending job with the same key isn't queued twice"
+    )
+    
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED
+    )
+    
+    progress = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Percent complete, reported by the job"
+    )
+    
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Return value of the job function"
+    )
+    
+    error = models.TextField(
+        blank=True,
+        help_text="Traceback of the last failure"
+    )
+    
+    attempts = models.PositiveSmallIntegerField(default=0)
+    
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='job_queue_idx'),
+            models.Index(fields=['key', 'status'], name='job_key_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
+    
+    PENDING = (Status.QUEUED, Status.RUNNING)
+    
+    @classmethod
+    def enqueue(cls, name, key='', created_by=None, **kwargs):
+        """
+        Queue a job.
+        
+        The row is inserted in the current transaction, so workers only
+        see it once that commits. With a `key`, returns the already
+        pending job instead of queueing a duplicate.
+        """
+        if key:
+            pending = cls.objects.filter(key=key, status__in=cls.PENDING).first()
+            if pending:
+                return pending
+        return cls.objects.create(name=name, key=key, kwargs=kwargs, created_by=created_by)
+    
+    @classmethod
+    def enqueue_many(cls, name, kwargs_list):
+        """Queue one job per kwargs dict with a single INSERT."""
+        return cls.objects.bulk_create([cls(name=name, kwargs=kwargs) for kwargs in kwargs_list])
+    
+    @classmethod
+    def queue_depth(cls):
+        """Number of jobs waiting to run."""
+        return cls.objects.filter(status=cls.Status.QUEUED).count()
+    
+    @classmethod
+    def claim_next(cls):
+        """
+        Atomically take the oldest queued job, or return None.
+        
+        The conditional UPDATE makes the claim safe with several workers
+        on any database (no SELECT ... SKIP LOCKED needed).
+        """
+        while True:
+            pk = cls.objects.filter(status=cls.Status.QUEUED).order_by('created_at', 'pk').values_list('pk', flat=True).first()
+            if pk is None:
+                return None
+            job = cls.claim(pk)
+            if job:
+                return job
+    
+    @classmethod
+    def claim(cls, pk):
+        """Atomically take one queued job, or return None if already taken."""
+        claimed = cls.objects.filter(pk=pk, status=cls.Status.QUEUED).update(
+            status=cls.Status.RUNNING,
+            started_at=timezone.now(),
+            attempts=models.F('attempts') + 1,
+        )
+        return cls.objects.get(pk=pk) if claimed else None
+    
+    def set_progress(self, percent):
+        """Report progress (0-100) from inside a running job."""
+        self.progress = max(0, min(100, int(percent)))
+        Job.objects.filter(pk=self.pk).update(progress=self.progress)
+    
+    @property
+    def is_pending(self):
+        return self.status in self.PENDING
+    
+    @property
+    def duration(self):
+        """Run time in seconds, or None if not finished."""
+        if self.started_at and self.finished_at:
+            return (self.finished_at - self.started_at).total_seconds()
+        return None
@@ -0,0 +1,72 @@
+"""
+Registry of background job functions.
+
+Apps declare jobs in their jobs.py module (auto-imported at startup):
+
+    from apps.jobs.registry import register
+
+    @register('assets.extract_palette')
+    def extract_palette(job, asset_id):
+        ...
+
+The function receives the Job row (for set_progress) and the job's
+kwargs; its return value is stored in Job.result. A `_profile` kwarg
+('cprofile' or 'sample', set when queued from a profiled request) runs
+the job under apps.core.profiling and is not passed on.
+"""
+
+import traceback
+
+from django.utils import timezone
+
+
+_jobs = {}
+
+
+def register(name):
+    """Decorator registering a job function under `name`."""
+    def decorator(func):
+        _jobs[name] = func
+        return func
+    return decorator
+
+
+def run(job):
+    """Run a claimed job and record the outcome on its row."""
+    from .models import Job
+
+    func = _jobs.get(job.name)
+    kwargs = dict(job.kwargs)
+    profile_mode = kwargs.pop('_profile', None)
+    try:
+        if func is None:
+            raise LookupError(f'No job registered as {job.name!r}')
+        if profile_mode:
+            result = _run_profiled(job, func, kwargs, profile_mode)
+        else:
+            result = func(job, **kwargs)
+    except Exception:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.Status.FAILED,
+            error=traceback.format_exc(),
+            finished_at=timezone.now(),
+        )
+        return False
+
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.Status.DONE,
+        progress=100,
+        result=result,
+        error='',
+        finished_at=timezone.now(),
+    )
+    return True
+
+
+def _run_profiled(job, func, kwargs, mode):
+    from apps.core.profiling import Profile
+
+    with Profile(mode) as profile:
+        result = func(job, **kwargs)
+    profile.save(f'job {job.name}', path=f'job {job.name} #{job.pk}', view=job.name, job=job.pk)
+    return result
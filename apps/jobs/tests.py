@@ -0,0 +1,183 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from . import registry
+from .models import Job
+
+
+def _fail(job, reason):
+    raise ValueError(reason)
+
+
+def _succeed(job, value):
+    job.set_progress(50)
+    return {'value': value}
+
+
+class RegisteredJobsTestCase(TestCase):
+    """Test job functions registered for the duration of each test."""
+
+    def setUp(self):
+        self.enterContext(mock.patch.dict(registry._jobs, {'tests.fail': _fail, 'tests.succeed': _succeed}))
+
+
+class ClaimTests(TestCase):
+
+    def test_job_is_claimed_once(self):
+        job = Job.enqueue('tests.succeed', value=1)
+
+        claimed = Job.claim(job.pk)
+
+        self.assertEqual(claimed.status, Job.Status.RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNotNone(claimed.started_at)
+        self.assertIsNone(Job.claim(job.pk))
+
+    def test_claim_next_takes_oldest_unclaimed(self):
+        first = Job.enqueue('tests.succeed', value=1)
+        second = Job.enqueue('tests.succeed', value=2)
+
+        self.assertEqual(Job.claim_next().pk, first.pk)
+        self.assertEqual(Job.claim_next().pk, second.pk)
+        self.assertIsNone(Job.claim_next())
+
+    def test_claim_next_skips_job_taken_after_select(self):
+        taken = Job.enqueue('tests.succeed', value=1)
+        free = Job.enqueue('tests.succeed', value=2)
+        real_claim = Job.claim.__func__
+
+        def claim_after_other_worker(cls, pk):
+            if pk == taken.pk:
+                real_claim(cls, pk)  # Another worker wins the race for this row
+            return real_claim(cls, pk)
+
+        with mock.patch.object(Job, 'claim', classmethod(claim_after_other_worker)):
+            self.assertEqual(Job.claim_next().pk, free.pk)
+
+
+class RunTests(RegisteredJobsTestCase):
+
+    def test_success_records_result(self):
+        job = Job.claim(Job.enqueue('tests.succeed', value=3).pk)
+
+        self.assertTrue(registry.run(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(job.result, {'value': 3})
+        self.assertIsNotNone(job.finished_at)
+
+    def test_failure_records_traceback(self):
+        job = Job.claim(Job.enqueue('tests.fail', reason='bad input').pk)
+
+        self.assertFalse(registry.run(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIn('Traceback', job.error)
+        self.assertIn('ValueError: bad input', job.error)
+        self.assertIsNone(job.result)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_unregistered_name_fails(self):
+        job = Job.claim(Job.enqueue('tests.missing').pk)
+
+        self.assertFalse(registry.run(job))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.FAILED)
+        self.assertIn("No job registered as 'tests.missing'", job.error)
+
+
+class EnqueueTests(TestCase):
+
+    def test_pending_job_with_same_key_is_reused(self):
+        job = Job.enqueue('tests.succeed', key='event-1', value=1)
+
+        self.assertEqual(Job.enqueue('tests.succeed', key='event-1', value=2).pk, job.pk)
+        Job.claim(job.pk)
+        self.assertEqual(Job.enqueue('tests.succeed', key='event-1', value=2).pk, job.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_finished_job_with_same_key_is_queued_again(self):
+        job = Job.enqueue('tests.succeed', key='event-1', value=1)
+        Job.objects.filter(pk=job.pk).update(status=Job.Status.DONE)
+
+        again = Job.enqueue('tests.succeed', key='event-1', value=1)
+
+        self.assertNotEqual(again.pk, job.pk)
+        self.assertEqual(again.status, Job.Status.QUEUED)
+
+    def test_jobs_without_key_are_never_merged(self):
+        Job.enqueue('tests.succeed', value=1)
+        Job.enqueue('tests.succeed', value=1)
+
+        self.assertEqual(Job.objects.count(), 2)
+
+
+class RunJobsCommandTests(RegisteredJobsTestCase):
+
+    def run_jobs(self, **options):
+        out = io.StringIO()
+        # It would close the connection holding the test transaction
+        with mock.patch('apps.jobs.management.commands.run_jobs.close_old_connections'):
+            call_command('run_jobs', burst=True, stdout=out, **options)
+        return out.getvalue()
+
+    def test_burst_drains_queue(self):
+        Job.enqueue('tests.succeed', value=1)
+        Job.enqueue('tests.fail', reason='bad input')
+
+        output = self.run_jobs()
+
+        self.assertIn('Ran 2 jobs (1 failed)', output)
+        self.assertEqual(Job.queue_depth(), 0)
+
+    def test_requeues_stale_running_jobs(self):
+        stale = Job.claim(Job.enqueue('tests.succeed', value=1).pk)
+        Job.objects.filter(pk=stale.pk).update(started_at=timezone.now() - timedelta(hours=1))
+        recent = Job.claim(Job.enqueue('tests.succeed', value=2).pk)
+
+        output = self.run_jobs(requeue_stale_minutes=30)
+
+        self.assertIn('Requeued 1 stale jobs', output)
+        stale.refresh_from_db()
+        recent.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts), (Job.Status.DONE, 2))
+        self.assertEqual(recent.status, Job.Status.RUNNING)
+
+
+class PruneJobsTests(TestCase):
+
+    def test_deletes_only_old_finished_jobs(self):
+        old = timezone.now() - timedelta(days=15)
+        recent = timezone.now() - timedelta(days=1)
+        old_done = Job.objects.create(name='tests.succeed', status=Job.Status.DONE, finished_at=old)
+        old_failed = Job.objects.create(name='tests.fail', status=Job.Status.FAILED, finished_at=old)
+        kept = [
+            Job.objects.create(name='tests.succeed', status=Job.Status.DONE, finished_at=recent),
+            Job.objects.create(name='tests.succeed', status=Job.Status.QUEUED),
+            Job.objects.create(name='tests.succeed', status=Job.Status.RUNNING, started_at=old),
+        ]
+
+        out = io.StringIO()
+        call_command('prune_jobs', days=14, batch_size=1, pause=0, stdout=out)
+
+        self.assertIn('Deleted 2 finished jobs', out.getvalue())
+        self.assertFalse(Job.objects.filter(pk__in=[old_done.pk, old_failed.pk]).exists())
+        self.assertEqual(set(Job.objects.values_list('pk', flat=True)), {job.pk for job in kept})
+
+    def test_dry_run_deletes_nothing(self):
+        Job.objects.create(name='tests.succeed', status=Job.Status.DONE, finished_at=timezone.now() - timedelta(days=30))
+
+        out = io.StringIO()
+        call_command('prune_jobs', dry_run=True, stdout=out)
+
+        self.assertIn('1 finished jobs to delete', out.getvalue())
+        self.assertEqual(Job.objects.count(), 1)
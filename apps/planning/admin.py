@@ -5,11 +5,27 @@ Provides admin interface for ThemePeriod, Event, and Deliverable models.
 """
 
 from django.contrib import admin
+from django.urls import reverse
 from django.utils.html import format_html
 
+from apps.jobs.models import Job
 from .models import ThemePeriod, Event, DeliverableTemplate, EventDeliverable
 
 
+def queue_report(modeladmin, request, event_ids, title):
+    """Queue a report PDF job and point the user to its progress."""
+    event_ids = list(event_ids)
+    if not event_ids:
+        modeladmin.message_user(request, 'No events to include in the report', level='warning')
+        return
+    job = Job.enqueue('planning.render_report', created_by=request.user, event_ids=event_ids, title=title)
+    modeladmin.message_user(request, format_html(
+        'Report for {} events queued. <a href="{}">Follow its progress</a>; '
+        'the download link appears on the job when it is done.',
+        len(event_ids), reverse('admin:jobs_job_change', args=[job.pk])
+    ))
+
+
 class EventDeliverableInline(admin.TabularInline):
     """Inline admin for EventDeliverables within Event."""
     model = EventDeliverable
@@ -59,6 +75,14 @@ class ThemePeriodAdmin(admin.ModelAdmin):
     )
     
     readonly_fields = ('created_at', 'updated_at')
+    actions = ['render_report']
+    
+    def render_report(self, request, queryset):
+        """Queue one report PDF per selected theme."""
+        for theme in queryset:
+            event_ids = theme.events.order_by('date', 'name').values_list('pk', flat=True)
+            queue_report(self, request, event_ids, f'{theme.name} ({theme.period_display})')
+    render_report.short_description = 'Render report PDF for selected themes'
     
     def period_display(self, obj):
         """Display formatted period."""
@@ -82,10 +106,20 @@ class ThemePeriodAdmin(admin.ModelAdmin):
 class DeliverableTemplateAdmin(admin.ModelAdmin):
     """Admin interface for global DeliverableTemplate."""
     
-    list_display = ('name', 'category', 'specs', 'is_active')
+    list_display = ('name', 'category', 'specs', 'parsed_specs', 'is_active')
     list_filter = ('category', 'is_active')
     search_fields = ('name', 'specs')
     ordering = ('category', 'name')
+    
+    def parsed_specs(self, obj):
+        """Display the structured spec used for upload validation."""
+        parts = []
+        if obj.spec_width:
+            parts.append(f"{obj.spec_width}x{obj.spec_height}")
+        if obj.spec_format:
+            parts.append(obj.spec_format)
+        return ' '.join(parts) or '-'
+    parsed_specs.short_description = 'Checked spec'
 
 
 @admin.register(Event)
@@ -118,6 +152,17 @@ class EventAdmin(admin.ModelAdmin):
     
     readonly_fields = ('created_at', 'updated_at', 'created_by')
     inlines = [EventDeliverableInline]
+    actions = ['render_report']
+    
+    def get_queryset(self, request):
+        # health_badge and bar_list on every changelist row
+        return super().get_queryset(request).with_health().prefetch_related('bars')
+    
+    def render_report(self, request, queryset):
+        """Queue a report PDF covering the selected events."""
+        event_ids = queryset.order_by('date', 'name').values_list('pk', flat=True)
+        queue_report(self, request, event_ids, 'Selected events')
+    render_report.short_description = 'Render report PDF for selected events'
     
     def save_model(self, request, obj, form, change):
         if not obj.created_by:
@@ -158,10 +203,10 @@ class EventAdmin(admin.ModelAdmin):
     
     def bar_list(self, obj):
         """Display list of bars."""
-        bars = obj.bars.all()[:3]
-        names = ', '.join(b.name for b in bars)
-        if obj.bars.count() > 3:
-            names += f' +{obj.bars.count() - 3}'
+        bars = list(obj.bars.all())  # Prefetched by get_queryset
+        names = ', '.join(b.name for b in bars[:3])
+        if len(bars) > 3:
+            names += f' +{len(bars) - 3}'
         return names or '-'
     bar_list.short_description = 'Venues'
 
@@ -175,6 +220,7 @@ class EventDeliverableAdmin(admin.ModelAdmin):
     list_editable = ('is_starred',)  # Quick toggle in list view
     search_fields = ('event__name', 'template__name')
     ordering = ('event__date', 'template__name')
+    readonly_fields = ('latest_asset', 'version_count')
     
     def status_badge(self, obj):
         """Display status as colored badge."""
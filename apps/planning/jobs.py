@@ -0,0 +1,35 @@
+"""
+Background jobs for the planning app (run by `python manage.py run_jobs`).
+"""
+
+from django.urls import reverse
+
+from apps.jobs.registry import register
+from . import pdf, reports
+
+
+@register('planning.render_event_pdf')
+def render_event_pdf(job, event_id, deliverable_ids, asset_ids, renderer=None):
+    """Render an event sheet export into the PDF cache."""
+    event = pdf.event_queryset().get(pk=event_id)
+    job.set_progress(10)
+    deliverables, assets = pdf.load_selection(event, deliverable_ids, asset_ids)
+    fingerprint = pdf.render_selection(event, deliverables, assets, on_progress=job.set_progress, renderer=renderer)
+    return {'fingerprint': fingerprint}
+
+
+@register('planning.render_report')
+def render_report(job, event_ids, title=''):
+    """Render a multi-event report PDF (see reports.py)."""
+    path = reports.report_path(f'job_{job.pk}')
+    count = reports.build_report(
+        event_ids, path,
+        on_progress=lambda done, total: job.set_progress(done * 95 / total),
+    )
+    pdf.evict(keep=path)  # Reports share the export cache budget and retention
+    return {
+        'title': title,
+        'events': count,
+        'path': path,
+        'url': reverse('planning:download_report', args=[job.pk]),
+    }
@@ -0,0 +1,117 @@
+"""
+Compare the event sheet renderers (see apps/planning/pdf.py RENDERERS).
+
+Renders the same selection with each renderer, bypassing the export
+cache, and prints timing, peak memory and output size. Image derivatives
+are created before timing starts so both renderers embed the same files.
+
+Peak memory is measured with tracemalloc on one extra, untimed render
+(tracing slows allocations down). It counts Python allocations, which
+is where both renderers build their document; pixel buffers allocated
+by C libraries are not included.
+
+Usage:
+    python manage.py benchmark_pdf_renderers
+    python manage.py benchmark_pdf_renderers --event 42 --repeat 10
+    python manage.py benchmark_pdf_renderers --renderer reportlab --output /tmp/sheets
+"""
+
+import os
+import statistics
+import time
+import tracemalloc
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from apps.planning import pdf
+
+
+class Command(BaseCommand):
+    help = 'Time the HTML and ReportLab event sheet renderers on the same selection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--event',
+            type=int,
+            help='Event id (default: the event with the most deliverable files)',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Renders per renderer (default: 5)')
+        parser.add_argument(
+            '--renderer',
+            action='append',
+            choices=list(pdf.RENDERERS),
+            help='Only benchmark this renderer (can be repeated)',
+        )
+        parser.add_argument('--output', help='Directory to write one sample PDF per renderer to')
+
+    def handle(self, *args, **options):
+        events = pdf.event_queryset()
+        if options['event']:
+            event = events.filter(pk=options['event']).first()
+            if event is None:
+                raise CommandError(f"Event {options['event']} does not exist")
+        else:
+            event = events.annotate(files=Count('deliverables__assets')).order_by('-files', 'pk').first()
+            if event is None:
+                raise CommandError('No events to render')
+
+        # The export form's default selection: every deliverable with all its files
+        deliverables = list(event.deliverables.all())
+        deliverables, assets = pdf.load_selection(
+            event,
+            [d.pk for d in deliverables],
+            [asset.pk for d in deliverables for asset in d.assets.all()],
+        )
+        pdf.prepare_images(assets)
+        context = {'event': event, 'deliverables': deliverables, 'assets': assets}
+
+        self.stdout.write(
+            f'Event {event.pk} "{event.name}": {len(deliverables)} deliverables, {len(assets)} files, '
+            f"{options['repeat']} renders each"
+        )
+
+        results = {}
+        for renderer in options['renderer'] or pdf.RENDERERS:
+            pdf.render_event_pdf(context, renderer)  # Warm-up (imports, fonts, templates)
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                data = pdf.render_event_pdf(context, renderer)
+                timings.append(time.perf_counter() - started)
+            results[renderer] = statistics.median(timings)
+            peak = self._peak_memory(context, renderer)
+
+            self.stdout.write(
+                f'  {renderer:<10} median {statistics.median(timings) * 1000:8.1f} ms   '
+                f'min {min(timings) * 1000:8.1f} ms   max {max(timings) * 1000:8.1f} ms   '
+                f'peak {peak / (1024 * 1024):7.1f} MB   '
+                f'{len(data) / 1024:8.1f} KB   {self._page_count(data)} pages'
+            )
+            if options['output']:
+                os.makedirs(options['output'], exist_ok=True)
+                path = os.path.join(options['output'], f'event_{event.pk}_{renderer}.pdf')
+                with open(path, 'wb') as f:
+                    f.write(data)
+
+        if len(results) > 1:
+            fastest = min(results, key=results.get)
+            slowest = max(results, key=results.get)
+            self.stdout.write(self.style.SUCCESS(
+                f'{fastest} is {results[slowest] / results[fastest]:.1f}x faster than {slowest}'
+            ))
+
+    def _peak_memory(self, context, renderer):
+        """Peak bytes allocated by Python during one render."""
+        tracemalloc.start()
+        try:
+            pdf.render_event_pdf(context, renderer)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def _page_count(self, data):
+        from pypdf import PdfReader
+
+        return len(PdfReader(BytesIO(data)).pages)
@@ -0,0 +1,444 @@
+"""
+Generate a realistic planning dataset at scale, for benchmarks and load tests.
+
+Adds (never deletes) synthetic rows next to existing data:
+
+- hardware items and deliverable templates from a realistic catalogue
+  (reused by name if they already exist)
+- N bars with 3-6 hardware items each
+- M events per year spread over the bars (1-3 bars per event), each with
+  one deliverable per active template - like Event.generate_deliverables
+- a status mix that depends on how close the event is (past events are
+  mostly approved, far-away ones mostly to do), and 0-4 asset versions
+  per deliverable depending on its status
+
+Rows are written with bulk_create in batches of events, one transaction
+per batch. Assets point to one small placeholder file per template and
+year (assets/<year>/synthetic/...), so the media directory stays small;
+their dimensions and format follow the template spec, with a few
+mismatches. The same --seed and --today give the same dataset (statuses
+depend on the reference date, which defaults to the current day).
+
+Synthetic bars, events and users are tagged (see SYNTHETIC) so --clear
+can remove them without touching real data.
+
+Usage:
+    python manage.py generate_synthetic_data
+    python manage.py generate_synthetic_data --bars 200 --events-per-year 50000 --years 2
+    python manage.py generate_synthetic_data --seed 7 --today 2026-06-01
+    python manage.py generate_synthetic_data --clear
+"""
+
+import random
+import time
+import zlib
+from datetime import date, timedelta
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils.text import slugify
+
+from apps.assets.models import Asset
+from apps.planning.models import DeliverableTemplate, Event, EventDeliverable, ThemePeriod
+from apps.venues.models import Bar, HardwareItem
+
+
+# Tags marking generated rows for --clear
+SYNTHETIC = {
+    'bar_location': ' (synthetic)',
+    'event_description': '[synthetic]',
+    'username': 'synthetic-',
+}
+
+HARDWARE = [
+    ('Cube LED', '960x192 mp4'),
+    ('Giant LED', '1920x768 mp4'),
+    ('Circle LED', '1080x1080 mp4'),
+    ('16:9 TV', '1920x1080'),
+    ('9:16 TV', '1080x1920'),
+    ('Door LED', '768x1536 mp4'),
+    ('Big Vertical LED', '1080x1920 mp4'),
+    ('Big Square LED', '1536x1536 mp4'),
+    ('Main LED Wall', '3840x2160 mp4'),
+    ('DJ Booth Screen', '1920x1080 mp4'),
+]
+
+TEMPLATES = [
+    ('Video 16:9 TV', '1920x1080 mp4', DeliverableTemplate.Category.SCREEN),
+    ('Video 9:16 TV', '1080x1920 mp4', DeliverableTemplate.Category.SCREEN),
+    ('Video Cube LED', '960x192 mp4', DeliverableTemplate.Category.SCREEN),
+    ('Video Giant LED', '1920x768 mp4', DeliverableTemplate.Category.SCREEN),
+    ('Video Door LED', '768x1536 mp4', DeliverableTemplate.Category.SCREEN),
+    ('Poster A3', 'A3 300dpi pdf', DeliverableTemplate.Category.PRINT),
+    ('Flyer A5', 'A5 300dpi pdf', DeliverableTemplate.Category.PRINT),
+    ('Instagram Post', '1080x1350 jpg', DeliverableTemplate.Category.SOCIAL),
+    ('Instagram Story', '1080x1920 jpg', DeliverableTemplate.Category.SOCIAL),
+    ('Facebook Cover', '1640x924 png', DeliverableTemplate.Category.SOCIAL),
+    ('Reel Video', '1080x1920 mp4', DeliverableTemplate.Category.SOCIAL),
+    ('Menu Card', 'A5 300dpi pdf', DeliverableTemplate.Category.PRINT),
+]
+
+BAR_NAMES = [
+    'Red Dragon', 'Shark', 'Mandarin', 'Fahrenheit', 'Bliss', 'Geisha', 'Lotus',
+    'Neon Tiger', 'Blue Lagoon', 'Jade Room', 'Paradise', 'Velvet', 'Sky Garden',
+]
+CITIES = ['Bangkok', 'Pattaya', 'Phuket', 'Chiang Mai', 'Hua Hin', 'Koh Samui']
+
+EVENT_ADJECTIVES = [
+    'Neon', 'Tropical', 'Midnight', 'Golden', 'Cyber', 'Electric', 'Velvet', 'Wild',
+    'Cosmic', 'Retro', 'Sunset', 'Frozen', 'Crimson', 'Jungle', 'Disco',
+]
+EVENT_NOUNS = [
+    'Night', 'Party', 'Fever', 'Carnival', 'Takeover', 'Session', 'Festival',
+    'Ladies Night', 'Pool Party', 'Showcase', 'Countdown', 'Masquerade',
+]
+
+THEMES = [
+    ('Cyberpunk', '#d946ef', '#22d3ee'), ('Eden Reborn', '#22c55e', '#facc15'),
+    ('Tropical Paradise', '#f97316', '#14b8a6'), ('Ice Palace', '#38bdf8', '#e2e8f0'),
+    ('Golden Age', '#eab308', '#7c2d12'), ('Red Lantern', '#dc2626', '#fbbf24'),
+]
+
+Status = EventDeliverable.Status
+
+# Status weights by days until the event
+STATUS_MIX = [
+    (-7, {Status.APPROVED: 85, Status.CHANGES_REQUESTED: 4, Status.REVIEW: 5, Status.IN_PROGRESS: 4, Status.TODO: 2}),
+    (14, {Status.APPROVED: 35, Status.CHANGES_REQUESTED: 10, Status.REVIEW: 20, Status.IN_PROGRESS: 25, Status.TODO: 10}),
+    (60, {Status.APPROVED: 10, Status.CHANGES_REQUESTED: 5, Status.REVIEW: 10, Status.IN_PROGRESS: 30, Status.TODO: 45}),
+    (None, {Status.APPROVED: 2, Status.REVIEW: 3, Status.IN_PROGRESS: 10, Status.TODO: 85}),
+]
+
+# (min, max) asset versions by status
+VERSIONS = {
+    Status.TODO: (0, 0),
+    Status.IN_PROGRESS: (0, 1),
+    Status.REVIEW: (1, 2),
+    Status.CHANGES_REQUESTED: (1, 3),
+    Status.APPROVED: (1, 4),
+}
+
+# Asset kind per spec format, and per category when the spec has none
+KINDS = {
+    'mp4': (Asset.FileType.VIDEO, 'mp4', 'mp4'),
+    'pdf': (Asset.FileType.PDF, 'pdf', 'pdf'),
+    'jpeg': (Asset.FileType.IMAGE, 'jpg', 'jpeg'),
+    'png': (Asset.FileType.IMAGE, 'png', 'png'),
+}
+CATEGORY_KINDS = {
+    DeliverableTemplate.Category.SCREEN: 'mp4',
+    DeliverableTemplate.Category.PRINT: 'pdf',
+}
+
+MISMATCH_RATE = 0.08
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate synthetic bars, events, deliverables and assets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bars', type=int, default=50, help='Bars to create (default: 50)')
+        parser.add_argument(
+            '--events-per-year', type=int, default=2000,
+            help='Events per year across all bars (default: 2000)',
+        )
+        parser.add_argument('--years', type=int, default=2, help='Years of events (default: 2)')
+        parser.add_argument(
+            '--today', type=date.fromisoformat,
+            help='Reference date (YYYY-MM-DD) for the status mix and the default start year '
+                 '(default: the current day)',
+        )
+        parser.add_argument(
+            '--start-year', type=int,
+            help='First year (default: the year before --today, so the range covers past and upcoming events)',
+        )
+        parser.add_argument(
+            '--templates', type=int, default=10,
+            help='Active deliverable templates to make sure exist (default: 10, max %d)' % len(TEMPLATES),
+        )
+        parser.add_argument('--users', type=int, default=10, help='Synthetic team members (default: 10)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Events per transaction (default: 1000)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Delete previously generated synthetic rows instead of generating',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            self.clear()
+            return
+        if options['templates'] > len(TEMPLATES):
+            raise CommandError(f'At most {len(TEMPLATES)} templates are available')
+
+        self.rng = random.Random(options['seed'])
+        self.today = options['today'] or date.today()
+        start_year = options['start_year'] or self.today.year - 1
+        years = range(start_year, start_year + options['years'])
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            hardware = self.create_hardware()
+            templates = self.create_templates(options['templates'])
+            bars = self.create_bars(options['bars'], hardware)
+            users = self.create_users(options['users'])
+            themes = self.create_themes(years)
+        self.placeholders = {}
+
+        total_events = options['events_per_year'] * len(years)
+        dates = self.event_dates(years, options['events_per_year'])
+        counts = {'events': 0, 'deliverables': 0, 'assets': 0}
+        for offset in range(0, total_events, options['batch_size']):
+            batch = dates[offset:offset + options['batch_size']]
+            with transaction.atomic():
+                created = self.create_events(batch, bars, templates, users, themes)
+            for key, value in created.items():
+                counts[key] += value
+            self.stdout.write(
+                f"  {counts['events']}/{total_events} events, {counts['deliverables']} deliverables, "
+                f"{counts['assets']} assets ({time.perf_counter() - started:.0f}s)"
+            )
+
+        # Assets were inserted without Asset.save(), which maintains the counters
+        call_command('rebuild_storage_usage', stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(bars)} bars, {counts['events']} events, {counts['deliverables']} deliverables "
+            f"and {counts['assets']} assets in {time.perf_counter() - started:.1f}s"
+        ))
+
+    # Reference data
+
+    def create_hardware(self):
+        items = []
+        for name, specs in HARDWARE:
+            item, _ = HardwareItem.objects.get_or_create(name=name, defaults={'specs': specs})
+            items.append(item)
+        return items
+
+    def create_templates(self, count):
+        for name, specs, category in TEMPLATES[:count]:
+            DeliverableTemplate.objects.get_or_create(name=name, defaults={'specs': specs, 'category': category})
+        # Deliverables are generated from every active template, as in the app
+        return list(DeliverableTemplate.objects.filter(is_active=True))
+
+    def create_bars(self, count, hardware):
+        bars = Bar.objects.bulk_create([
+            Bar(
+                name=BAR_NAMES[i % len(BAR_NAMES)] + (f' {i // len(BAR_NAMES) + 1}' if i >= len(BAR_NAMES) else ''),
+                location=self.rng.choice(CITIES) + SYNTHETIC['bar_location'],
+                is_active=self.rng.random() > 0.05,
+            )
+            for i in range(count)
+        ])
+        Bar.hardware.through.objects.bulk_create([
+            Bar.hardware.through(bar_id=bar.pk, hardwareitem_id=item.pk)
+            for bar in bars
+            for item in self.rng.sample(hardware, self.rng.randint(3, 6))
+        ])
+        return bars
+
+    def create_users(self, count):
+        User = get_user_model()
+        password = make_password(None)  # Unusable: synthetic users can't log in
+        prefix = SYNTHETIC['username']
+        existing = User.objects.filter(username__startswith=prefix).count()
+        User.objects.bulk_create([
+            User(username=f'{prefix}{existing + i + 1:03}', email=f'{prefix}{existing + i + 1:03}@example.com', password=password)
+            for i in range(count)
+        ])
+        return list(User.objects.filter(username__startswith=prefix).values_list('pk', flat=True)) or [None]
+
+    def create_themes(self, years):
+        themes = {}
+        for year in years:
+            for month in range(1, 13):
+                name, primary, accent = self.rng.choice(THEMES)
+                theme, _ = ThemePeriod.objects.get_or_create(
+                    year=year, month=month,
+                    defaults={'name': name, 'primary_color': primary, 'accent_color': accent},
+                )
+                themes[year, month] = theme if theme.is_active else None
+        return themes
+
+    def event_dates(self, years, per_year):
+        dates = []
+        for year in years:
+            first = date(year, 1, 1)
+            days = (date(year + 1, 1, 1) - first).days
+            # Weekends are busier
+            weights = [3 if (first + timedelta(days=d)).weekday() >= 4 else 1 for d in range(days)]
+            dates.extend(first + timedelta(days=d) for d in self.rng.choices(range(days), weights, k=per_year))
+        dates.sort()
+        return dates
+
+    # Events, deliverables, assets
+
+    def create_events(self, dates, bars, templates, users, themes):
+        events = Event.objects.bulk_create([
+            Event(
+                name=f'{self.rng.choice(EVENT_ADJECTIVES)} {self.rng.choice(EVENT_NOUNS)}',
+                date=day,
+                description=SYNTHETIC['event_description'],
+                theme=themes[day.year, day.month],
+                created_by_id=self.rng.choice(users),
+            )
+            for day in dates
+        ])
+
+        # Through rows directly: Event.bars.add() would regenerate deliverables
+        Event.bars.through.objects.bulk_create([
+            Event.bars.through(event_id=event.pk, bar_id=bar.pk)
+            for event in events
+            for bar in self.rng.sample(bars, min(len(bars), self.rng.choice((1, 1, 1, 2, 2, 3))))
+        ])
+
+        deliverables = []
+        versions = []
+        for event in events:
+            mix = self.status_mix((event.date - self.today).days)
+            statuses = self.rng.choices(list(mix), list(mix.values()), k=len(templates))
+            for template, status in zip(templates, statuses):
+                low, high = VERSIONS[status]
+                count = self.rng.randint(low, high)
+                deliverables.append(EventDeliverable(
+                    event=event,
+                    template=template,
+                    status=status,
+                    assigned_to_id=self.rng.choice(users) if status != Status.TODO else None,
+                    is_enabled=self.rng.random() > 0.04,
+                    is_starred=self.rng.random() < 0.03,
+                    version_count=count,
+                ))
+                versions.append(count)
+        deliverables = EventDeliverable.objects.bulk_create(deliverables)
+
+        assets = [
+            self.build_asset(deliverable, version, version == count, users)
+            for deliverable, count in zip(deliverables, versions)
+            for version in range(1, count + 1)
+        ]
+        Asset.objects.bulk_create(assets)
+
+        # Point deliverables with versions at their newest one
+        EventDeliverable.objects.filter(event__in=events, version_count__gt=0).update(
+            latest_asset=Subquery(
+                Asset.objects.filter(deliverable=OuterRef('pk')).order_by('-version').values('pk')[:1]
+            )
+        )
+        return {'events': len(events), 'deliverables': len(deliverables), 'assets': len(assets)}
+
+    def status_mix(self, days_until):
+        for limit, mix in STATUS_MIX:
+            if limit is None or days_until < limit:
+                return mix
+
+    def build_asset(self, deliverable, version, is_latest, users):
+        placeholder = self.placeholder(deliverable.template, deliverable.event.date.year)
+        file_type = placeholder['file_type']
+        width, height = placeholder['width'], placeholder['height']
+        if self.rng.random() < MISMATCH_RATE and width:
+            width, height = height, width  # Wrong orientation
+        return Asset(
+            file=placeholder['name'],
+            file_type=file_type,
+            original_filename=f"{placeholder['slug']}_v{version}.{placeholder['ext']}",
+            file_size=placeholder['size'],
+            deliverable=deliverable,
+            uploaded_by_id=self.rng.choice(users),
+            is_approved=is_latest and deliverable.status == Status.APPROVED,
+            version=version,
+            width=width,
+            height=height,
+            duration=round(self.rng.uniform(8, 30), 1) if file_type == Asset.FileType.VIDEO else None,
+            codec='avc1' if file_type == Asset.FileType.VIDEO else '',
+            media_format=placeholder['media_format'],
+            palette=self.palette() if file_type == Asset.FileType.IMAGE else None,
+        )
+
+    def palette(self):
+        shares = sorted((self.rng.random() for _ in range(3)), reverse=True)
+        total = sum(shares)
+        return [
+            {'color': f'#{self.rng.randrange(0x1000000):06x}', 'share': round(share / total, 2)}
+            for share in shares
+        ]
+
+    def placeholder(self, template, year):
+        """The shared file of a template for a year, written on first use, and its asset fields."""
+        key = (template.pk, year)
+        if key not in self.placeholders:
+            spec = template.spec_format or CATEGORY_KINDS.get(template.category, 'jpeg')
+            file_type, ext, media_format = KINDS.get(spec, KINDS['jpeg'])
+            width, height = template.spec_width, template.spec_height
+            if file_type == Asset.FileType.PDF:
+                width = height = None
+            elif not width:
+                width, height = (1920, 1080) if file_type == Asset.FileType.VIDEO else (1080, 1350)
+
+            slug = slugify(template.name)
+            name = f'assets/{year}/synthetic/{slug}.{ext}'
+            if not default_storage.exists(name):
+                content = placeholder_content(template.name, file_type, ext, width, height)
+                name = default_storage.save(name, ContentFile(content))
+            self.placeholders[key] = {
+                'name': name,
+                'size': default_storage.size(name),
+                'slug': slug,
+                'ext': ext,
+                'file_type': file_type,
+                'media_format': media_format,
+                'width': width,
+                'height': height,
+            }
+        return self.placeholders[key]
+
+    # Cleanup
+
+    def clear(self):
+        events = Event.objects.filter(description=SYNTHETIC['event_description'])
+        assets = Asset.objects.filter(deliverable__event__in=events)
+        started = time.perf_counter()
+        with transaction.atomic():
+            EventDeliverable.objects.filter(event__in=events).update(latest_asset=None)
+            # Raw delete: the per-asset post_delete handlers only adjust counters
+            # and pointers of rows deleted here anyway; counters are rebuilt below
+            asset_count = assets._raw_delete(assets.db)
+            _, deleted = events.delete()
+            _, deleted_bars = Bar.objects.filter(location__endswith=SYNTHETIC['bar_location']).delete()
+            _, deleted_users = get_user_model().objects.filter(username__startswith=SYNTHETIC['username']).delete()
+        call_command('rebuild_storage_usage', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted.get('planning.Event', 0)} events, "
+            f"{deleted.get('planning.EventDeliverable', 0)} deliverables, {asset_count} assets, "
+            f"{deleted_bars.get('venues.Bar', 0)} bars and {deleted_users.get('accounts.User', 0)} users "
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
+
+
+def placeholder_content(title, file_type, ext, width, height):
+    """Small valid file of the given kind (not from the seeded RNG: files are reused across runs)."""
+    if file_type == Asset.FileType.IMAGE:
+        from PIL import Image
+
+        output = BytesIO()
+        color = tuple(zlib.crc32(title.encode()).to_bytes(4, 'big')[:3])
+        Image.new('RGB', (width, height), color).save(output, 'JPEG' if ext == 'jpg' else 'PNG')
+        return output.getvalue()
+    if file_type == Asset.FileType.PDF:
+        from reportlab.pdfgen import canvas
+
+        output = BytesIO()
+        pdf = canvas.Canvas(output)
+        pdf.drawString(72, 720, f'{title} - synthetic placeholder')
+        pdf.save()
+        return output.getvalue()
+    # Just an MP4 'ftyp' box: enough for file type sniffing, not playable
+    return b'\x00\x00\x00\x18ftypisom\x00\x00\x02\x00isomavc1'
@@ -0,0 +1,70 @@
+"""
+Render all events of a month and/or theme into one PDF.
+
+Event sheets are rendered in parallel worker processes and merged with
+pypdf (see apps/planning/reports.py). Progress is printed as parts finish.
+
+Usage:
+    python manage.py render_report --year 2026 --month 5
+    python manage.py render_report --theme 12 --output theme.pdf
+    python manage.py render_report --year 2026 --workers 8
+"""
+
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.planning import reports
+from apps.planning.models import ThemePeriod
+
+
+class Command(BaseCommand):
+    help = 'Render a month or theme report PDF covering many events'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, help='Only events in this year')
+        parser.add_argument('--month', type=int, choices=range(1, 13), help='Only events in this month')
+        parser.add_argument('--theme', type=int, help='Only events with this ThemePeriod id')
+        parser.add_argument(
+            '--output',
+            help='Output file (default: report_<year>_<month>.pdf or report_theme_<id>.pdf)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Number of renderer processes (default: REPORT_WORKERS setting)',
+        )
+
+    def handle(self, *args, **options):
+        year, month, theme_id = options['year'], options['month'], options['theme']
+        if not (year or theme_id):
+            raise CommandError('Pass --year (optionally with --month) and/or --theme')
+        if month and not year:
+            raise CommandError('--month requires --year')
+
+        theme = None
+        if theme_id:
+            theme = ThemePeriod.objects.filter(pk=theme_id).first()
+            if theme is None:
+                raise CommandError(f'ThemePeriod {theme_id} does not exist')
+
+        event_ids = list(reports.report_events(year, month, theme).values_list('pk', flat=True))
+        if not event_ids:
+            raise CommandError('No events match')
+
+        output = options['output']
+        if not output:
+            output = f'report_theme_{theme_id}.pdf' if theme else f"report_{year}{f'_{month:02d}' if month else ''}.pdf"
+
+        self.stdout.write(f'Rendering {len(event_ids)} events...')
+        started = time.monotonic()
+
+        def progress(done, total):
+            self.stdout.write(f'  {done}/{total} ({done * 100 // total}%)')
+
+        reports.build_report(event_ids, output, workers=options['workers'], on_progress=progress)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {os.path.abspath(output)} ({len(event_ids)} events, {time.monotonic() - started:.1f}s)'
+        ))
@@ -0,0 +1,25 @@
+# Generated by Django 6.0 on 2026-10-19 03:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0001_initial'),
+        ('planning', '0004_simplify_models'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventdeliverable',
+            name='latest_asset',
+            field=models.ForeignKey(blank=True, help_text='Most recent asset version uploaded for this deliverable', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='assets.asset'),
+        ),
+        migrations.AddField(
+            model_name='eventdeliverable',
+            name='version_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of asset versions currently stored'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 6.0 on 2026-10-19 03:08
+
+import re
+
+from django.db import migrations, models
+
+
+# Frozen copy of apps.assets.media.parse_specs as of this migration, so
+# later changes to the parser don't change what this migration does
+FORMAT_ALIASES = {
+    'jpg': 'jpeg',
+    'jpeg': 'jpeg',
+    'png': 'png',
+    'webp': 'webp',
+    'gif': 'gif',
+    'mp4': 'mp4',
+    'mov': 'mov',
+    'pdf': 'pdf',
+}
+
+DIMENSIONS_RE = re.compile(r'(\d{2,5})\s*[x×]\s*(\d{2,5})', re.IGNORECASE)
+FORMAT_RE = re.compile(r'\b(' + '|'.join(FORMAT_ALIASES) + r')\b', re.IGNORECASE)
+
+
+def parse_specs(specs):
+    """Parse a free-text specs string ('960x192 mp4') into structured fields."""
+    result = {'spec_width': None, 'spec_height': None, 'spec_format': ''}
+    if not specs:
+        return result
+
+    dimensions = DIMENSIONS_RE.search(specs)
+    if dimensions:
+        result['spec_width'] = int(dimensions.group(1))
+        result['spec_height'] = int(dimensions.group(2))
+
+    file_format = FORMAT_RE.search(specs)
+    if file_format:
+        result['spec_format'] = FORMAT_ALIASES[file_format.group(1).lower()]
+
+    return result
+
+
+def parse_existing_specs(apps, schema_editor):
+    """Fill the structured spec fields from the existing free-text specs."""
+    DeliverableTemplate = apps.get_model('planning', 'DeliverableTemplate')
+    for item in DeliverableTemplate.objects.exclude(specs=''):
+        for field, value in parse_specs(item.specs).items():
+            setattr(item, field, value)
+        item.save(update_fields=['spec_width', 'spec_height', 'spec_format'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planning', '0005_deliverable_latest_asset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deliverabletemplate',
+            name='spec_format',
+            field=models.CharField(blank=True, editable=False, help_text="Required file format parsed from specs (e.g., 'mp4', 'jpeg')", max_length=10),
+        ),
+        migrations.AddField(
+            model_name='deliverabletemplate',
+            name='spec_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Required pixel height parsed from specs', null=True),
+        ),
+        migrations.AddField(
+            model_name='deliverabletemplate',
+            name='spec_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Required pixel width parsed from specs', null=True),
+        ),
+        migrations.RunPython(parse_existing_specs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planning', '0006_deliverabletemplate_parsed_specs'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['date'], name='event_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventdeliverable',
+            index=models.Index(condition=models.Q(('is_enabled', True), models.Q(('status', 'approved'), _negated=True)), fields=['event'], name='deliverable_open_idx'),
+        ),
+    ]
@@ -8,9 +8,12 @@ from datetime import timedelta
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Exists, OuterRef
 from django.db.models.signals import post_save, m2m_changed
 from django.dispatch import receiver
 
+from apps.assets.media import parse_specs
+
 
 class ThemePeriod(models.Model):
     """
@@ -131,6 +134,28 @@ class DeliverableTemplate(models.Model):
         help_text="Technical specifications (e.g., '960x192 mp4', 'A3 300dpi PDF')"
     )
     
+    # Structured specs (parsed from the free-text specs on save)
+    spec_width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Required pixel width parsed from specs"
+    )
+    
+    spec_height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Required pixel height parsed from specs"
+    )
+    
+    spec_format = models.CharField(
+        max_length=10,
+        blank=True,
+        editable=False,
+        help_text="Required file format parsed from specs (e.g., 'mp4', 'jpeg')"
+    )
+    
     category = models.CharField(
         max_length=20,
         choices=Category.choices,
@@ -152,6 +177,28 @@ class DeliverableTemplate(models.Model):
     
     def __str__(self):
         return self.name
+    
+    def save(self, *args, **kwargs):
+        """Parse the free-text specs into structured fields."""
+        for field, value in parse_specs(self.specs).items():
+            setattr(self, field, value)
+        super().save(*args, **kwargs)
+
+
+class EventQuerySet(models.QuerySet):
+    """Query helpers for Event."""
+    
+    def with_health(self):
+        """
+        Annotate has_open_deliverables, read by Event.health_status.
+        
+        The EXISTS runs inside the list query (on the deliverable_open_idx
+        partial index) instead of once per displayed event.
+        """
+        open_deliverables = EventDeliverable.objects.filter(
+            event=OuterRef('pk'), is_enabled=True
+        ).exclude(status=EventDeliverable.Status.APPROVED)
+        return self.annotate(has_open_deliverables=Exists(open_deliverables))
 
 
 class Event(models.Model):
@@ -167,6 +214,8 @@ class Event(models.Model):
     The J-7 rule: All deliverables should be approved 7 days before the event.
     """
     
+    objects = EventQuerySet.as_manager()
+    
     name = models.CharField(
         max_length=200,
         help_text="Name of the event (e.g., 'DJ Night with Guest Star')"
@@ -217,6 +266,10 @@ class Event(models.Model):
         verbose_name = 'Event'
         verbose_name_plural = 'Events'
         ordering = ['date', 'name']
+        indexes = [
+            # Calendar and list views filter on date ranges
+            models.Index(fields=['date'], name='event_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.date})"
@@ -250,20 +303,24 @@ class Event(models.Model):
         """
         Calculate event health based on deliverable status.
         
+        Uses the has_open_deliverables annotation of
+        EventQuerySet.with_health() when present, so list pages don't run
+        a query per event.
+        
         Returns:
             'green': All deliverables approved
             'orange': In progress, deadline OK
             'red': Past deadline with unapproved deliverables
         """
-        deliverables = self.deliverables.filter(is_enabled=True)
-        
-        if not deliverables.exists():
-            return 'green'  # No deliverables = nothing to worry about
-        
-        all_approved = all(d.status == EventDeliverable.Status.APPROVED for d in deliverables)
+        has_open = getattr(self, 'has_open_deliverables', None)
+        if has_open is None:
+            # One EXISTS on the deliverable_open_idx partial index
+            has_open = self.deliverables.filter(is_enabled=True).exclude(
+                status=EventDeliverable.Status.APPROVED
+            ).exists()
         
-        if all_approved:
-            return 'green'
+        if not has_open:
+            return 'green'  # All approved, or no deliverables at all
         
         if self.is_past_deadline:
             return 'red'
@@ -289,14 +346,14 @@ class Event(models.Model):
         # Get all active templates
         templates = DeliverableTemplate.objects.filter(is_active=True)
         
-        for template in templates:
-            EventDeliverable.objects.get_or_create(
-                event=self,
-                template=template,
-                defaults={
-                    'status': EventDeliverable.Status.TODO
-                }
-            )
+        # One INSERT; rows that already exist (event, template) are left as they are
+        EventDeliverable.objects.bulk_create(
+            [
+                EventDeliverable(event=self, template=template, status=EventDeliverable.Status.TODO)
+                for template in templates
+            ],
+            ignore_conflicts=True,
+        )
 
 
 class EventDeliverable(models.Model):
@@ -359,8 +416,21 @@ class EventDeliverable(models.Model):
         help_text="Notes or feedback about this deliverable"
     )
     
-    # Asset will be added in Phase 5
-    # asset = models.ForeignKey('assets.Asset', ...)
+    # Denormalized version pointer, maintained by Asset.save() and the
+    # Asset post_delete signal so pages never scan the asset history
+    latest_asset = models.ForeignKey(
+        'assets.Asset',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Most recent asset version uploaded for this deliverable"
+    )
+    
+    version_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of asset versions currently stored"
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -371,6 +441,14 @@ class EventDeliverable(models.Model):
         verbose_name_plural = 'Event Deliverables'
         ordering = ['template__category', 'template__name']
         unique_together = ['event', 'template']
+        indexes = [
+            # Partial index: only the rows Event.health_status looks for
+            models.Index(
+                fields=['event'],
+                name='deliverable_open_idx',
+                condition=models.Q(is_enabled=True) & ~models.Q(status='approved'),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.template.name} for {self.event.name}"
@@ -379,6 +457,13 @@ class EventDeliverable(models.Model):
     def is_late(self):
         """Check if this deliverable is late (past J-7 and not approved)."""
         return self.event.is_past_deadline and self.status != self.Status.APPROVED
+    
+    @property
+    def theme_score(self):
+        """Theme colour conformance (0-100) of the latest version, or None."""
+        if not self.latest_asset:
+            return None
+        return self.latest_asset.theme_score(self.event.theme)
 
 
 # Signal to auto-generate deliverables when bars are added to an event
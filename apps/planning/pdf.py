@@ -0,0 +1,278 @@
+"""
+Event sheet PDF rendering and the on-disk export cache.
+
+Rendering an event sheet with xhtml2pdf takes seconds, and the same
+selection is often exported several times. Every export is keyed by a
+fingerprint of everything that goes into the document:
+
+- the event (updated_at), its theme and venues
+- all deliverables of the event (the sheet shows health and counts)
+- the selected deliverable and asset ids with their updated_at
+- the renderer, the PDF template source, RENDERER_VERSION and PDF_IMAGE_DPI
+
+Generated files are kept in PDF_CACHE_DIR under that fingerprint. Cache
+hits refresh the file's mtime; files unused for PDF_EXPORT_RETENTION_HOURS
+expire, and the least recently used files are evicted once the directory
+grows past PDF_CACHE_MAX_MB.
+
+Exports are rendered by the 'planning.render_event_pdf' background job
+(see jobs.py); render_selection() is the shared entry point. Images are
+embedded as print-sized JPEG derivatives (apps/assets/derivatives.py),
+not the original uploads.
+
+Two renderers produce the same sheet (RENDERERS): 'html' renders the
+event_pdf.html template with xhtml2pdf, 'reportlab' builds it directly
+from platypus flowables (pdf_reportlab.py) and is considerably faster.
+PDF_RENDERER picks the default; exports can choose per request.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.template.loader import get_template
+
+from apps.assets.derivatives import pdf_image_path
+from apps.core import metrics
+
+
+PDF_TEMPLATE = 'planning/event_pdf.html'
+
+# Bump when the rendering code changes in a way that alters the output
+RENDERER_VERSION = 2
+
+RENDERERS = {
+    'html': 'HTML template (xhtml2pdf)',
+    'reportlab': 'Direct layout (ReportLab)',
+}
+
+
+class PDFRenderError(Exception):
+    """Raised when xhtml2pdf reports errors for a document."""
+
+
+@lru_cache(maxsize=None)
+def template_version(template_name=PDF_TEMPLATE):
+    """Short hash of the template source (changes when the template is edited)."""
+    source = get_template(template_name).template.source
+    return hashlib.sha256(source.encode()).hexdigest()[:12]
+
+
+def get_renderer(name=None):
+    """Validate a renderer name, falling back to the PDF_RENDERER setting."""
+    return name if name in RENDERERS else settings.PDF_RENDERER
+
+
+def export_fingerprint(event, deliverables, assets, renderer=None):
+    """
+    Return a key identifying the PDF for this event and selection.
+
+    '<event id>-<hex digest>', so a cached export can only be downloaded
+    under its own event's URL (see fingerprint_matches).
+
+    Args:
+        event: Event with bars prefetched
+        deliverables: Selected EventDeliverables
+        assets: Selected Assets
+        renderer: Key of RENDERERS (default PDF_RENDERER)
+    """
+    summary = event.deliverables.aggregate(count=Count('pk'), last_change=Max('updated_at'))
+    theme = event.theme
+    parts = [
+        f'renderer:{get_renderer(renderer)}:{RENDERER_VERSION}:{template_version()}:{settings.PDF_IMAGE_DPI}',
+        f'event:{event.pk}:{event.updated_at.isoformat()}',
+        f'theme:{theme.pk}:{theme.updated_at.isoformat()}' if theme else 'theme:-',
+        'bars:' + ','.join(f'{bar.pk}:{bar.updated_at.isoformat()}' for bar in sorted(event.bars.all(), key=lambda b: b.pk)),
+        f"all:{summary['count']}:{summary['last_change'].isoformat() if summary['last_change'] else '-'}",
+        'deliverables:' + ','.join(f'{d.pk}:{d.updated_at.isoformat()}' for d in sorted(deliverables, key=lambda d: d.pk)),
+        'assets:' + ','.join(f'{a.pk}:{a.updated_at.isoformat()}' for a in assets),
+    ]
+    digest = hashlib.sha256('\n'.join(parts).encode()).hexdigest()[:32]
+    return f'{event.pk}-{digest}'
+
+
+def fingerprint_matches(fingerprint, event_id):
+    """Whether a fingerprint was computed for this event."""
+    return fingerprint.startswith(f'{event_id}-')
+
+
+def event_queryset():
+    """Events with everything the PDF template reads prefetched."""
+    from .models import Event
+
+    return Event.objects.select_related('theme').prefetch_related(
+        'bars',
+        'deliverables__template',
+        'deliverables__assets',
+    )
+
+
+def load_selection(event, deliverable_ids, asset_ids):
+    """
+    Resolve posted ids to (deliverables, assets) of this event.
+
+    Assets are only kept when their deliverable is selected too.
+    """
+    deliverables = event.deliverables.filter(
+        id__in=deliverable_ids
+    ).select_related('template', 'latest_asset').prefetch_related('assets')
+
+    asset_ids = {str(asset_id) for asset_id in asset_ids}
+    assets = [
+        asset
+        for deliv in deliverables
+        for asset in deliv.assets.all()
+        if str(asset.id) in asset_ids
+    ]
+    return deliverables, assets
+
+
+def prepare_images(assets):
+    """Attach `pdf_image` (path of the print-sized derivative) to image assets."""
+    for asset in assets:
+        if asset.file_type == asset.FileType.IMAGE:
+            asset.pdf_image = pdf_image_path(asset)
+
+
+def render_selection(event, deliverables, assets, fingerprint=None, on_progress=None, renderer=None):
+    """
+    Render and cache the PDF for a selection unless already cached.
+
+    Args:
+        on_progress: Optional callable receiving a percentage
+        renderer: Key of RENDERERS (default PDF_RENDERER)
+
+    Returns:
+        The fingerprint the PDF is cached under.
+    """
+    fingerprint = fingerprint or export_fingerprint(event, deliverables, assets, renderer)
+    if not get_cached(fingerprint):
+        prepare_images(assets)
+        if on_progress:
+            on_progress(50)
+        context = {
+            'event': event,
+            'deliverables': deliverables,
+            'assets': assets,
+        }
+        store(fingerprint, render_event_pdf(context, renderer))
+    return fingerprint
+
+
+def render_event_pdf(context, renderer=None):
+    """Render the event sheet to PDF bytes with the given renderer."""
+    renderer = get_renderer(renderer)
+    with metrics.pdf_render_timer(renderer):
+        if renderer == 'reportlab':
+            from . import pdf_reportlab
+
+            return pdf_reportlab.render_event_pdf(context)
+        return render_html(context)
+
+
+def render_html(context):
+    """Render the event sheet template to PDF bytes with xhtml2pdf."""
+    from xhtml2pdf import pisa
+
+    html = get_template(PDF_TEMPLATE).render(context)
+    result = BytesIO()
+    pdf = pisa.pisaDocument(BytesIO(html.encode('UTF-8')), result)
+    if pdf.err:
+        raise PDFRenderError(f'{pdf.err} errors while rendering the PDF')
+    return result.getvalue()
+
+
+# =============================================================================
+# Disk cache
+# =============================================================================
+
+def cache_path(fingerprint):
+    return os.path.join(settings.PDF_CACHE_DIR, f'{fingerprint}.pdf')
+
+
+def _retention_seconds():
+    return settings.PDF_EXPORT_RETENTION_HOURS * 3600
+
+
+def is_expired(path):
+    """Whether a cached file is older than PDF_EXPORT_RETENTION_HOURS (or gone)."""
+    try:
+        return time.time() - os.path.getmtime(path) > _retention_seconds()
+    except FileNotFoundError:
+        return True
+
+
+def get_cached(fingerprint):
+    """Return the cached file path for a fingerprint (marking it recently used), or None."""
+    path = cache_path(fingerprint)
+    if is_expired(path):
+        return None  # Expired ones are removed by the next evict()
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return path
+
+
+def store(fingerprint, data):
+    """Atomically write a rendered PDF to the cache, then evict if over budget."""
+    os.makedirs(settings.PDF_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=settings.PDF_CACHE_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    path = cache_path(fingerprint)
+    os.replace(tmp_path, path)
+    evict(keep=path)
+    return path
+
+
+def _cached_files():
+    """(mtime, size, path) of the event PDFs and of the reports (reports.report_path)."""
+    entries = []
+    for directory in (settings.PDF_CACHE_DIR, os.path.join(settings.PDF_CACHE_DIR, 'reports')):
+        try:
+            with os.scandir(directory) as it:
+                entries.extend(
+                    (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                    for entry in it if entry.name.endswith('.pdf') and entry.is_file()
+                )
+        except FileNotFoundError:
+            pass
+    return entries
+
+
+def evict(max_bytes=None, keep=None):
+    """
+    Delete expired PDFs, then least recently used ones until the cache
+    fits in max_bytes. Finished reports count in the same budget.
+
+    Returns:
+        (files_deleted, bytes_freed)
+    """
+    if max_bytes is None:
+        max_bytes = settings.PDF_CACHE_MAX_MB * 1024 * 1024
+    entries = _cached_files()
+    if not entries:
+        return 0, 0
+
+    total = sum(size for _, size, _ in entries)
+    expired_before = time.time() - _retention_seconds()
+    deleted = freed = 0
+    for mtime, size, path in sorted(entries):
+        if total <= max_bytes and mtime >= expired_before:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        deleted += 1
+        freed += size
+    return deleted, freed
@@ -0,0 +1,201 @@
+"""
+Event sheet rendered directly with ReportLab platypus.
+
+Same content as planning/event_pdf.html (header, event details with
+venues and theme, deliverables table, image grid) but built from
+flowables, skipping the HTML/CSS parsing xhtml2pdf does on every export.
+Selected with renderer='reportlab' (see pdf.RENDERERS).
+"""
+
+from io import BytesIO
+
+from django.utils import timezone
+from django.utils.html import escape
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import (
+    Image, KeepTogether, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle,
+)
+
+
+# Same box as .asset-image in event_pdf.html and derivatives.PDF_IMAGE_BOX
+IMAGE_BOX = (200, 150)
+GRID_COLUMNS = 2
+
+STATUS_COLORS = {
+    'approved': ('#d4edda', '#155724'),
+    'in_progress': ('#cce5ff', '#004085'),
+    'review': ('#fff3cd', '#856404'),
+    'changes': ('#f8d7da', '#721c24'),
+    'todo': ('#e2e3e5', '#383d41'),
+}
+
+
+def _styles():
+    base = getSampleStyleSheet()
+    return {
+        'title': ParagraphStyle('title', parent=base['Title'], fontSize=24, leading=28, spaceAfter=4),
+        'subtitle': ParagraphStyle('subtitle', parent=base['Normal'], fontSize=14, leading=18,
+                                   textColor=colors.HexColor('#666666'), alignment=1, spaceAfter=24),
+        'h2': ParagraphStyle('h2', parent=base['Heading2'], fontSize=16, leading=20, spaceBefore=18, spaceAfter=8),
+        'body': ParagraphStyle('body', parent=base['Normal'], fontSize=11, leading=15),
+        'label': ParagraphStyle('label', parent=base['Normal'], fontSize=11, leading=15,
+                                fontName='Helvetica-Bold', textColor=colors.HexColor('#555555')),
+        'small': ParagraphStyle('small', parent=base['Normal'], fontSize=9, leading=11,
+                                textColor=colors.HexColor('#666666')),
+        'brief': ParagraphStyle('brief', parent=base['Normal'], fontSize=11, leading=15,
+                                backColor=colors.HexColor('#f5f5f5'), borderPadding=10,
+                                spaceBefore=12, spaceAfter=12),
+    }
+
+
+def _swatch(hex_color):
+    """Small filled square for a theme colour."""
+    swatch = Table([['']], colWidths=14, rowHeights=14)
+    swatch.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor(hex_color)),
+        ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#cccccc')),
+    ]))
+    return swatch
+
+
+def _details(event, styles):
+    rows = [
+        ['Date', Paragraph(f'{event.date:%B %d, %Y}', styles['body'])],
+        ['Venues', Paragraph(escape(', '.join(bar.name for bar in event.bars.all())) or '—', styles['body'])],
+    ]
+    theme = event.theme
+    if theme:
+        cells = [Paragraph(escape(theme.name), styles['body'])]
+        for hex_color in (theme.primary_color, theme.accent_color):
+            if hex_color:
+                try:
+                    cells.append(_swatch(hex_color))
+                except ValueError:
+                    pass
+        theme_row = Table([cells], colWidths=[None] + [20] * (len(cells) - 1), hAlign='LEFT')
+        theme_row.setStyle(TableStyle([('LEFTPADDING', (0, 0), (-1, -1), 0), ('VALIGN', (0, 0), (-1, -1), 'MIDDLE')]))
+        rows.append(['Theme', theme_row])
+    deliverables = list(event.deliverables.all())
+    rows.append(['Status', Paragraph(
+        f'{event.health_status.title()} - {len(deliverables)} deliverables', styles['body']
+    )])
+
+    table = Table([[Paragraph(label, styles['label']), value] for label, value in rows], colWidths=[120, None])
+    table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+    ]))
+    return table
+
+
+def _deliverables_table(deliverables, styles):
+    header = ['Deliverable', 'Specs', 'Status', 'Current version']
+    header_style = ParagraphStyle('header', parent=styles['small'], textColor=colors.white)
+    rows = [[Paragraph(f'<b>{h}</b>', header_style) for h in header]]
+    style = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#333333')),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#dddddd')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]
+
+    for row, deliv in enumerate(deliverables, start=1):
+        version = ''
+        if deliv.latest_asset:
+            version = (f'{deliv.latest_asset.version_display} - {escape(deliv.latest_asset.original_filename)} '
+                       f'({deliv.version_count} file{"s" if deliv.version_count != 1 else ""})')
+        name = f'<b>{escape(deliv.template.name)}</b>'
+        if deliv.notes:
+            name += f'<br/><font size="8" color="#666666">{escape(deliv.notes)}</font>'
+        rows.append([
+            Paragraph(name, styles['body']),
+            Paragraph(escape(deliv.template.specs), styles['small']),
+            Paragraph(escape(deliv.get_status_display()), styles['small']),
+            Paragraph(version, styles['small']),
+        ])
+        background, text = STATUS_COLORS.get(deliv.status, STATUS_COLORS['todo'])
+        style.append(('BACKGROUND', (2, row), (2, row), colors.HexColor(background)))
+        style.append(('TEXTCOLOR', (2, row), (2, row), colors.HexColor(text)))
+
+    table = Table(rows, colWidths=['35%', '25%', '15%', '25%'], repeatRows=1)
+    table.setStyle(TableStyle(style))
+    return table
+
+
+def _asset_cell(asset, styles):
+    """Image (fitted into IMAGE_BOX) or a placeholder, with the filename below."""
+    caption = Paragraph(escape(asset.original_filename), styles['small'])
+    if asset.file_type == asset.FileType.IMAGE:
+        path = getattr(asset, 'pdf_image', None) or asset.file.path
+        try:
+            image = Image(path)
+            scale = min(IMAGE_BOX[0] / image.imageWidth, IMAGE_BOX[1] / image.imageHeight, 1)
+            image.drawWidth = image.imageWidth * scale
+            image.drawHeight = image.imageHeight * scale
+            return [image, caption]
+        except OSError:
+            pass
+    if asset.file_type == asset.FileType.VIDEO:
+        label = f'Video: {escape(asset.original_filename)}<br/><font size="8">{escape(asset.file.url)}</font>'
+    else:
+        label = f'File: {escape(asset.original_filename)}'
+    return [Paragraph(label, styles['body']), caption]
+
+
+def _asset_grid(assets, styles):
+    cells = [_asset_cell(asset, styles) for asset in assets]
+    rows = [cells[i:i + GRID_COLUMNS] for i in range(0, len(cells), GRID_COLUMNS)]
+    rows[-1] += [''] * (GRID_COLUMNS - len(rows[-1]))
+    table = Table(rows, colWidths=[IMAGE_BOX[0] + 20] * GRID_COLUMNS, hAlign='LEFT')
+    table.setStyle(TableStyle([
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+    ]))
+    return table
+
+
+def render_event_pdf(context):
+    """Build the event sheet for a template-style context; returns PDF bytes."""
+    event = context['event']
+    deliverables = list(context['deliverables'])
+    assets = list(context['assets'])
+    styles = _styles()
+
+    story = [
+        Paragraph(escape(event.name), styles['title']),
+        Paragraph(f'{event.date:%A, %B %d, %Y}', styles['subtitle']),
+        Paragraph('Event Details', styles['h2']),
+        _details(event, styles),
+    ]
+    if event.brief:
+        brief = escape(event.brief).replace('\n', '<br/>')
+        story.append(Paragraph(f'<b>Creative Brief:</b><br/>{brief}', styles['brief']))
+    if event.description:
+        story.append(Paragraph(f'<b>Description:</b> {escape(event.description)}', styles['body']))
+
+    if deliverables:
+        story += [Paragraph('Selected Deliverables', styles['h2']), _deliverables_table(deliverables, styles)]
+
+    if assets:
+        story += [Spacer(1, 6), KeepTogether([Paragraph('Selected Assets', styles['h2'])]), _asset_grid(assets, styles)]
+
+    generated = timezone.localtime().strftime('%B %d, %Y %H:%M')
+
+    def footer(canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 9)
+        canvas.setFillColor(colors.HexColor('#999999'))
+        canvas.drawCentredString(A4[0] / 2, 1 * cm, f'Generated on {generated} | Party Hub Event Management')
+        canvas.restoreState()
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4,
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm,
+        title=f'{event.name} - Event Report',
+    )
+    doc.build(story, onFirstPage=footer, onLaterPages=footer)
+    return buffer.getvalue()
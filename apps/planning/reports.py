@@ -0,0 +1,140 @@
+"""
+Multi-event report PDFs (all events of a month or of a theme).
+
+Each event is rendered as its own event sheet in a process pool, then
+the parts are merged with pypdf into one document with a bookmark per
+event. Parts go through the regular export cache (pdf.py), so events
+that haven't changed since the last report are not re-rendered.
+
+Memory stays bounded for 100+ events: parts are written to disk, only
+file paths travel between processes, and pool workers are replaced
+after REPORT_TASKS_PER_CHILD events each.
+
+Entry points:
+- build_report(): used by the 'planning.render_report' job
+- python manage.py render_report --year 2026 --month 5
+- "Render report PDF" actions in the Event and Theme Period admin
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connections
+
+
+def report_path(name):
+    """Where a finished report is stored."""
+    return os.path.join(settings.PDF_CACHE_DIR, 'reports', f'{name}.pdf')
+
+
+def report_events(year=None, month=None, theme=None):
+    """Events covered by a month and/or theme report, in date order."""
+    from .models import Event
+
+    events = Event.objects.order_by('date', 'name')
+    if year:
+        events = events.filter(date__year=year)
+    if month:
+        events = events.filter(date__month=month)
+    if theme:
+        events = events.filter(theme=theme)
+    return events
+
+
+def _init_worker():
+    """Pool initializer: set up Django in the fresh (spawned) process."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def _render_part(event_id, part_path):
+    """
+    Render one event sheet into part_path (runs in a pool worker).
+
+    The sheet lists every deliverable and embeds the latest version of
+    each image deliverable.
+    """
+    from . import pdf
+
+    event = pdf.event_queryset().get(pk=event_id)
+    deliverables = list(event.deliverables.all())
+    latest_ids = [d.latest_asset_id for d in deliverables if d.latest_asset_id]
+    deliverables, assets = pdf.load_selection(event, [d.pk for d in deliverables], latest_ids)
+    assets = [asset for asset in assets if asset.file_type == asset.FileType.IMAGE]
+
+    fingerprint = pdf.render_selection(event, deliverables, assets)
+    try:
+        shutil.copyfile(pdf.cache_path(fingerprint), part_path)
+    except FileNotFoundError:
+        # Evicted by a parallel worker in the meantime - render directly
+        pdf.prepare_images(assets)
+        with open(part_path, 'wb') as f:
+            f.write(pdf.render_event_pdf({'event': event, 'deliverables': deliverables, 'assets': assets}))
+    return event_id, f'{event.date:%d %b} – {event.name}'
+
+
+def build_report(event_ids, output_path, workers=None, on_progress=None):
+    """
+    Render events in parallel and merge them into one PDF.
+
+    Args:
+        event_ids: Events in report order
+        output_path: Destination file (written atomically)
+        workers: Process count (default REPORT_WORKERS)
+        on_progress: Optional callable(done, total) called as parts finish
+
+    Returns:
+        Number of events in the report.
+    """
+    from pypdf import PdfWriter
+
+    event_ids = list(event_ids)
+    total = len(event_ids)
+    if not total:
+        raise ValueError('No events to include in the report')
+
+    # Workers open their own connections; don't hand them ours
+    connections.close_all()
+
+    workers = workers or settings.REPORT_WORKERS
+    # A fresh pool per chunk recycles the workers (memory held by
+    # xhtml2pdf/Pillow is released) without relying on max_tasks_per_child
+    chunk_size = workers * settings.REPORT_TASKS_PER_CHILD
+
+    with tempfile.TemporaryDirectory(prefix='report-') as tmp_dir:
+        parts = {}
+        for start in range(0, total, chunk_size):
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            ) as pool:
+                futures = [
+                    pool.submit(_render_part, event_id, os.path.join(tmp_dir, f'{event_id}.pdf'))
+                    for event_id in event_ids[start:start + chunk_size]
+                ]
+                for future in as_completed(futures):
+                    event_id, title = future.result()
+                    parts[event_id] = title
+                    if on_progress:
+                        on_progress(len(parts), total)
+
+        writer = PdfWriter()
+        for event_id in event_ids:
+            writer.append(os.path.join(tmp_dir, f'{event_id}.pdf'), outline_item=parts[event_id])
+
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        tmp_output = f'{output_path}.tmp'
+        with open(tmp_output, 'wb') as f:
+            writer.write(f)
+        writer.close()
+        os.replace(tmp_output, output_path)
+
+    return total
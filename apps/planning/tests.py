@@ -1,3 +1,164 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import io
+import time
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.jobs.models import Job
+from . import pdf, reports
+from .models import Event, EventDeliverable
+
+
+class ExportEventPdfTests(TestCase):
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        self.enterContext(override_settings(PDF_CACHE_DIR=cache_dir))
+
+        self.user = User.objects.create_user('planner', password='pw')
+        self.client.force_login(self.user)
+        self.event = Event.objects.create(name='Launch Night', date=date(2026, 11, 20))
+
+    def queue_export(self):
+        self.client.post(reverse('planning:export_event_pdf', args=[self.event.pk]), HTTP_HX_REQUEST='true')
+        return Job.objects.get(name='planning.render_event_pdf')
+
+    def status(self, job):
+        return self.client.get(reverse('planning:export_status', args=[self.event.pk, job.pk]))
+
+    def test_waits_for_worker_by_default(self):
+        job = self.queue_export()
+        Job.objects.filter(pk=job.pk).update(created_at=job.created_at - timedelta(hours=1))
+
+        response = self.status(job)
+
+        self.assertContains(response, 'Waiting for a worker')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+
+    @override_settings(PDF_JOB_CLAIM_TIMEOUT=15)
+    def test_waits_for_worker_within_timeout(self):
+        job = self.queue_export()
+
+        response = self.status(job)
+
+        self.assertContains(response, 'Waiting for a worker')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+
+    @override_settings(PDF_JOB_CLAIM_TIMEOUT=15)
+    def test_renders_inline_when_no_worker_claims_job(self):
+        job = self.queue_export()
+        Job.objects.filter(pk=job.pk).update(created_at=job.created_at - timedelta(seconds=16))
+
+        response = self.status(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.DONE)
+        download_url = reverse('planning:download_event_pdf', args=[self.event.pk, job.result['fingerprint']])
+        self.assertContains(response, download_url)
+        self.assertEqual(self.client.get(download_url)['Content-Type'], 'application/pdf')
+
+    @override_settings(PDF_JOB_CLAIM_TIMEOUT=15)
+    def test_download_only_under_own_event(self):
+        self.event.name = 'Launch "VIP" / Night'
+        self.event.save()
+        job = self.queue_export()
+        Job.objects.filter(pk=job.pk).update(created_at=job.created_at - timedelta(seconds=16))
+        self.status(job)
+        fingerprint = Job.objects.get(pk=job.pk).result['fingerprint']
+        other = Event.objects.create(name='Other', date=date(2026, 12, 1))
+
+        response = self.client.get(reverse('planning:download_event_pdf', args=[other.pk, fingerprint]))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse('planning:download_event_pdf', args=[self.event.pk, fingerprint]))
+        self.assertEqual(
+            response['Content-Disposition'], 'attachment; filename="Launch_VIP__Night_2026-11-20.pdf"'
+        )
+
+
+class ReportRetentionTests(TestCase):
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        self.enterContext(override_settings(PDF_CACHE_DIR=cache_dir, PDF_EXPORT_RETENTION_HOURS=72))
+
+        self.client.force_login(User.objects.create_user('planner', password='pw'))
+
+    def finished_report(self, age_hours=0):
+        job = Job.objects.create(name='planning.render_report', status=Job.Status.DONE)
+        path = reports.report_path(f'job_{job.pk}')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'%PDF-1.4 report')
+        mtime = time.time() - age_hours * 3600
+        os.utime(path, (mtime, mtime))
+        job.result = {'title': 'May', 'path': path}
+        job.save()
+        return job, path
+
+    def download(self, job):
+        return self.client.get(reverse('planning:download_report', args=[job.pk]))
+
+    def test_expired_report_is_evicted(self):
+        old_job, old_path = self.finished_report(age_hours=73)
+        new_job, new_path = self.finished_report()
+
+        self.assertEqual(self.download(old_job).status_code, 404)
+        self.assertEqual(self.download(new_job).status_code, 200)
+        self.assertEqual(pdf.evict(), (1, len(b'%PDF-1.4 report')))
+        self.assertFalse(os.path.exists(old_path))
+        self.assertTrue(os.path.exists(new_path))
+
+    def test_reports_count_in_cache_size(self):
+        _, older = self.finished_report(age_hours=2)
+        _, newer = self.finished_report(age_hours=1)
+
+        pdf.evict(max_bytes=20)
+
+        self.assertFalse(os.path.exists(older))
+        self.assertTrue(os.path.exists(newer))
+
+
+class SyntheticDataTests(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+    def generate(self, current_day):
+        class Today(date):
+            @classmethod
+            def today(cls):
+                return current_day
+
+        with mock.patch('apps.planning.management.commands.generate_synthetic_data.date', Today):
+            call_command(
+                'generate_synthetic_data', bars=3, events_per_year=20, years=1, templates=3, users=2,
+                seed=7, today=date(2026, 6, 1), stdout=io.StringIO(),
+            )
+        dataset = list(
+            EventDeliverable.objects.order_by('event__date', 'event__name', 'template__name')
+            .values_list('event__date', 'event__name', 'template__name', 'status', 'version_count')
+        )
+        call_command('generate_synthetic_data', clear=True, stdout=io.StringIO())
+        return dataset
+
+    def test_same_seed_and_today_give_same_dataset_on_any_day(self):
+        first = self.generate(date(2026, 6, 1))
+        second = self.generate(date(2027, 3, 15))
+
+        self.assertEqual(len(first), 60)
+        self.assertEqual(first, second)
+        self.assertEqual({row[0].year for row in first}, {2025})
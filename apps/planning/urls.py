@@ -15,5 +15,8 @@ urlpatterns = [
     path('events/', views.event_list, name='event_list'),
     path('events/<int:pk>/', views.event_detail, name='event_detail'),
     path('events/<int:pk>/export/', views.export_event_pdf, name='export_event_pdf'),
+    path('events/<int:pk>/export/jobs/<int:job_id>/', views.export_status, name='export_status'),
+    path('events/<int:pk>/export/<slug:fingerprint>/', views.download_event_pdf, name='download_event_pdf'),
+    path('reports/<int:job_id>/', views.download_report, name='download_report'),
 ]
 
@@ -7,10 +7,21 @@ Handles calendar views, events, and deliverables.
 import calendar
 from datetime import date, timedelta
 
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import get_object_or_404, render
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.text import get_valid_filename, slugify
+from django.views.decorators.http import condition, require_GET
 
+from apps.jobs import registry
+from apps.jobs.models import Job
 from apps.venues.models import Bar
+from . import pdf
 from .models import Event, ThemePeriod
 
 
@@ -40,7 +51,7 @@ def calendar_view(request):
     events = Event.objects.filter(
         date__gte=first_day,
         date__lte=last_day
-    ).prefetch_related('bars', 'deliverables')
+    ).with_health().prefetch_related('bars')
     
     # Build events by day dict
     events_by_day = {}
@@ -88,7 +99,7 @@ def event_list(request):
     """
     events = Event.objects.filter(
         date__gte=date.today()
-    ).prefetch_related('bars', 'deliverables').order_by('date')
+    ).with_health().prefetch_related('bars', 'deliverables').order_by('date')
     
     context = {
         'page_title': 'Events',
@@ -104,7 +115,12 @@ def event_detail(request, pk):
     Detail view for a single event with deliverables.
     """
     event = get_object_or_404(
-        Event.objects.prefetch_related('bars', 'deliverables__template'),
+        Event.objects.select_related('theme').prefetch_related(
+            'bars',
+            'deliverables__template',
+            'deliverables__latest_asset',
+            'deliverables__assets',
+        ),
         pk=pk
     )
     
@@ -122,63 +138,133 @@ def export_event_pdf(request, pk):
     Export event details and selected assets as PDF.
     
     GET: Show asset selection form
-    POST: Generate and download PDF
+    POST: Queue a render job and return a status panel that polls until
+          the PDF is ready (served straight away when already cached)
     """
-    from io import BytesIO
-    from django.http import HttpResponse
-    from django.template.loader import get_template
-    from xhtml2pdf import pisa
-    
-    event = get_object_or_404(
-        Event.objects.prefetch_related(
-            'bars', 
-            'deliverables__template',
-            'deliverables__assets'
-        ),
-        pk=pk
-    )
+    event = get_object_or_404(pdf.event_queryset(), pk=pk)
     
     if request.method == 'POST':
-        # Get selected deliverable IDs
-        selected_ids = request.POST.getlist('deliverables')
-        selected_deliverables = event.deliverables.filter(id__in=selected_ids)
-        
-        # Collect selected assets
-        selected_assets = []
-        for deliv in selected_deliverables:
-            for asset in deliv.assets.all():
-                if str(asset.id) in request.POST.getlist('assets'):
-                    selected_assets.append(asset)
+        deliverable_ids = request.POST.getlist('deliverables')
+        asset_ids = request.POST.getlist('assets')
+        renderer = pdf.get_renderer(request.POST.get('renderer'))
+        deliverables, assets = pdf.load_selection(event, deliverable_ids, asset_ids)
+        fingerprint = pdf.export_fingerprint(event, deliverables, assets, renderer)
         
-        # Render PDF template
-        template = get_template('planning/event_pdf.html')
-        context = {
-            'event': event,
-            'deliverables': selected_deliverables,
-            'assets': selected_assets,
-            'request': request,
-        }
-        html = template.render(context)
+        job = None
+        if not pdf.get_cached(fingerprint):
+            # A profiled export request also profiles the render job
+            profile = getattr(request, 'profile_mode', None)
+            job = Job.enqueue(
+                'planning.render_event_pdf',
+                key=f'pdf:{fingerprint}',
+                created_by=request.user,
+                event_id=event.pk,
+                deliverable_ids=[d.pk for d in deliverables],
+                asset_ids=[a.pk for a in assets],
+                renderer=renderer,
+                **({'_profile': profile} if profile else {}),
+            )
         
-        # Generate PDF
-        result = BytesIO()
-        pdf = pisa.pisaDocument(BytesIO(html.encode('UTF-8')), result)
-        
-        if not pdf.err:
-            response = HttpResponse(result.getvalue(), content_type='application/pdf')
-            filename = f"{event.name.replace(' ', '_')}_{event.date}.pdf"
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            return response
-        
-        # Error fallback
-        return HttpResponse('Error generating PDF', status=500)
+        context = _export_status_context(event, job, fingerprint)
+        if request.headers.get('HX-Request'):
+            return render(request, 'planning/_export_status.html', context)
+        if job is None:
+            return redirect('planning:download_event_pdf', pk=event.pk, fingerprint=fingerprint)
+        context.update({
+            'page_title': f'Export: {event.name}',
+            'page_subtitle': 'Generating PDF',
+        })
+        return render(request, 'planning/export_status.html', context)
     
     # GET: Show selection form
     context = {
         'page_title': f'Export: {event.name}',
         'page_subtitle': 'Select items to include in PDF',
         'event': event,
+        'renderers': pdf.RENDERERS.items(),
+        'default_renderer': pdf.get_renderer(),
     }
     return render(request, 'planning/export_select.html', context)
 
 
+def _export_status_context(event, job, fingerprint=None):
+    """Context for the export status panel (fingerprint is known once done)."""
+    if job is not None and job.status == Job.Status.DONE:
+        fingerprint = job.result['fingerprint']
+    ready = job is None or job.status == Job.Status.DONE
+    return {
+        'event': event,
+        'job': job,
+        'download_url': reverse('planning:download_event_pdf', args=[event.pk, fingerprint]) if ready else None,
+    }
+
+
+@login_required
+@require_GET
+def export_status(request, pk, job_id):
+    """
+    Status panel for a queued PDF export, polled by HTMX until done.
+    
+    Without a run_jobs worker the export would never finish: if
+    PDF_JOB_CLAIM_TIMEOUT is set, a job still queued after that many
+    seconds is rendered in this request.
+    """
+    event = get_object_or_404(Event, pk=pk)
+    job = get_object_or_404(Job, pk=job_id, name='planning.render_event_pdf', kwargs__event_id=event.pk)
+    
+    timeout = settings.PDF_JOB_CLAIM_TIMEOUT
+    if (
+        timeout and job.status == Job.Status.QUEUED
+        and timezone.now() - job.created_at > timedelta(seconds=timeout)
+    ):
+        claimed = Job.claim(job.pk)
+        if claimed:
+            registry.run(claimed)
+        job.refresh_from_db()
+    
+    return render(request, 'planning/_export_status.html', _export_status_context(event, job))
+
+
+def _cached_pdf_etag(request, pk, fingerprint):
+    """The fingerprint is the ETag, as long as the file is still cached."""
+    if not pdf.fingerprint_matches(fingerprint, pk):
+        return None
+    return fingerprint if pdf.get_cached(fingerprint) else None
+
+
+@login_required
+@require_GET
+@condition(etag_func=_cached_pdf_etag)
+def download_event_pdf(request, pk, fingerprint):
+    """
+    Download a generated event PDF from the export cache.
+    
+    The URL is stable for a given set of inputs; If-None-Match with the
+    fingerprint ETag gets a 304. Evicted files send the user back to the
+    export form.
+    """
+    event = get_object_or_404(Event, pk=pk)
+    if not pdf.fingerprint_matches(fingerprint, event.pk):
+        raise Http404('No such export for this event')
+    path = pdf.get_cached(fingerprint)
+    if path is None:
+        messages.warning(request, 'That PDF export has expired, please export it again')
+        return redirect('planning:export_event_pdf', pk=event.pk)
+    
+    filename = get_valid_filename(f'{event.name}_{event.date}.pdf')
+    response = FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type='application/pdf')
+    patch_cache_control(response, private=True, max_age=3600)
+    return response
+
+
+@login_required
+@require_GET
+def download_report(request, job_id):
+    """Download a finished month/theme report PDF (see reports.py)."""
+    job = get_object_or_404(Job, pk=job_id, name='planning.render_report', status=Job.Status.DONE)
+    path = job.result.get('path')
+    if not path or pdf.is_expired(path):
+        raise Http404('Report file no longer exists')
+    
+    filename = f"report_{slugify(job.result.get('title') or job.pk)}.pdf"
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename, content_type='application/pdf')
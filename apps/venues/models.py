@@ -6,6 +6,8 @@ Contains Bar and HardwareItem models for venue/location management.
 
 from django.db import models
 
+from apps.assets.media import parse_specs
+
 
 class HardwareItem(models.Model):
     """
@@ -26,6 +28,28 @@ class HardwareItem(models.Model):
         help_text="Optional specs (e.g., '960x192 mp4')"
     )
     
+    # Structured specs (parsed from the free-text specs on save)
+    spec_width = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Required pixel width parsed from specs"
+    )
+    
+    spec_height = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Required pixel height parsed from specs"
+    )
+    
+    spec_format = models.CharField(
+        max_length=10,
+        blank=True,
+        editable=False,
+        help_text="Required file format parsed from specs (e.g., 'mp4', 'jpeg')"
+    )
+    
     notes = models.TextField(
         blank=True,
         help_text="Additional notes"
@@ -40,6 +64,12 @@ class HardwareItem(models.Model):
         if self.specs:
             return f"{self.name} ({self.specs})"
         return self.name
+    
+    def save(self, *args, **kwargs):
+        """Parse the free-text specs into structured fields."""
+        for field, value in parse_specs(self.specs).items():
+            setattr(self, field, value)
+        super().save(*args, **kwargs)
 
 
 class Bar(models.Model):
@@ -4,19 +4,37 @@ Development settings for Marketing Event Planner.
 Uses SQLite and TailwindCSS CDN for quick local development.
 """
 
+import sys
+
 from .base import *  # noqa: F401, F403
 
 DEBUG = True
 
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
-# Database - SQLite for development simplicity
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database - PostgreSQL when DATABASE_URL is set, SQLite otherwise (see base.py)
+if DATABASE_URL:
+    DATABASES = {'default': POSTGRES_DATABASE}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # atomic() takes the write lock up front (see apps/core/db.py)
+                'transaction_mode': 'IMMEDIATE',
+            },
+            # A file, not :memory:, so the pragmas and concurrent writers are tested
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+        }
     }
-}
+
+# N+1 queries: logged while developing, failures under `manage.py test`.
+# Only `manage.py test` is recognized; with another runner (pytest...)
+# set NPLUSONE_DETECTION=raise in its environment.
+NPLUSONE_DETECTION = env(
+    'NPLUSONE_DETECTION', default='raise' if 'test' in sys.argv[1:] else 'log'
+)
 
 # Debug Toolbar (optional, add to requirements if needed)
 # INSTALLED_APPS += ['debug_toolbar']
@@ -16,13 +16,24 @@ ALLOWED_HOSTS = env.list('DJANGO_ALLOWED_HOSTS', default=[
     'localhost',
 ])
 
-# Database - Use absolute path for SQLite (important for PythonAnywhere!)
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database - PostgreSQL when DATABASE_URL is set (see base.py), else SQLite
+# with an absolute path (important for PythonAnywhere!)
+if DATABASE_URL:
+    DATABASES = {'default': POSTGRES_DATABASE}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            # Keep connections open between requests
+            'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=600),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # atomic() takes the write lock up front (see apps/core/db.py)
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
     }
-}
 
 # Security settings for HTTPS
 SECURE_SSL_REDIRECT = True
@@ -65,6 +76,14 @@ LOGGING = {
             'filename': os.path.join(BASE_DIR, 'logs', 'django_errors.log'),
             'formatter': 'verbose',
         },
+        'slow_requests': {
+            'level': 'WARNING',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.path.join(BASE_DIR, 'logs', 'slow_requests.log'),
+            'maxBytes': 5 * 1024 * 1024,
+            'backupCount': 3,
+            'formatter': 'verbose',
+        },
     },
     'loggers': {
         'django': {
@@ -72,5 +91,10 @@ LOGGING = {
             'level': 'ERROR',
             'propagate': True,
         },
+        'apps.core.timing': {
+            'handlers': ['slow_requests'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
@@ -3,7 +3,8 @@ URL configuration for Marketing Event Planner.
 
 Routes are organized by app:
 - /accounts/ - Authentication (login, logout)
-- /admin/ - Django Admin
+- /admin/ - Django Admin (+ /admin/profiles/ request profiles)
+- /metrics - Prometheus metrics
 - / - Planning (calendar, events)
 """
 
@@ -13,14 +14,20 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import RedirectView
 
+from apps.core import views as core_views
+
 urlpatterns = [
     # Admin
+    path('admin/profiles/', admin.site.admin_view(core_views.profile_list), name='profile_list'),
+    path('admin/profiles/<str:name>', admin.site.admin_view(core_views.profile_download), name='profile_download'),
+    path('admin/profiles/<str:name>/stats', admin.site.admin_view(core_views.profile_stats), name='profile_stats'),
     path('admin/', admin.site.urls),
     
     # Apps
     path('accounts/', include('apps.accounts.urls')),
     path('venues/', include('apps.venues.urls')),
     path('assets/', include('apps.assets.urls')),
+    path('metrics', core_views.metrics, name='metrics'),
     path('', include('apps.planning.urls')),
 ]
 